@@ -1,16 +1,30 @@
 from flask import Flask
 from .config import Config
 from app.extensions import db, migrate
-from app.models import *
+from . import models  # noqa: F401  registers every model with db
 from .auth import auth_bp
 from .attendance import attendance_bp
 from .classes import classes_bp
+from .attendance.live_sessions import live_sessions
+from .attendance.group_commit import group_commit
+from .attendance.async_submit import async_submissions
+from .attendance.spatial import geo_index
+from .attendance.devices import device_index
+from .attendance.rosters import rosters
+from .attendance.live_feed import live_feed
+from .attendance.lifecycle import session_scheduler
+from .versions import versions
+from .metrics import metrics
+from .replicas import replicas
+from .profiling import request_profiler
+from .auth.hashing import password_hasher
+from .auth.principals import principals
 from flask_cors import CORS
 import os
 
-def create_app():
+def create_app(config_class=Config):
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(config_class)
     app.config['SECRET_KEY'] = os.getenv("SECRET_KEY")
 
     app.config["SESSION_COOKIE_SAMESITE"] = "Lax"
@@ -22,8 +36,22 @@ def create_app():
     supports_credentials=True
 )
 
+    replicas.init_app(app)
     db.init_app(app)
     migrate.init_app(app, db)
+    metrics.init_app(app)
+    request_profiler.init_app(app)
+    versions.init_app(app)
+    password_hasher.init_app(app)
+    principals.init_app(app)
+    live_sessions.init_app(app)
+    group_commit.init_app(app)
+    async_submissions.init_app(app)
+    geo_index.init_app(app)
+    device_index.init_app(app)
+    rosters.init_app(app)
+    live_feed.init_app(app)
+    session_scheduler.init_app(app)
 
     app.register_blueprint(auth_bp, url_prefix='/auth')
 
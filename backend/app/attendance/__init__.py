@@ -2,4 +2,4 @@ from flask import Blueprint
 
 attendance_bp = Blueprint('attendance', __name__)
 
-from . import routes
+from . import routes, commands
@@ -0,0 +1,122 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import os
+import secrets
+import threading
+import time
+
+from flask import current_app, request
+
+
+class SubmissionQueueFull(Exception):
+    """Raised when too many async submissions are already waiting for a worker."""
+
+
+class _Pool:
+    def __init__(self, app):
+        self.app = app
+        self.workers = app.config["ATTENDANCE_ASYNC_WORKERS"]
+        self.max_pending = app.config["ATTENDANCE_ASYNC_MAX_PENDING"]
+        self.ttl = app.config["ATTENDANCE_TICKET_TTL"]
+        # Insertion order is expiry order because every ticket lives for the
+        # same ttl from creation.
+        self.tickets = OrderedDict()
+        self.pending = 0
+        self.lock = threading.Lock()
+        self.executor = None
+        self.pid = None
+
+    def submit(self, fn, user_id, data):
+        now = time.monotonic()
+        with self.lock:
+            if self.pending >= self.max_pending:
+                raise SubmissionQueueFull("too many pending submissions")
+            self._expire(now)
+
+            ticket = secrets.token_urlsafe(16)
+            self.tickets[ticket] = {
+                "user_id": user_id,
+                "status": "pending",
+                "expires": now + self.ttl,
+            }
+            self.pending += 1
+            executor = self._executor()
+
+        executor.submit(self._run, ticket, fn, user_id, data)
+        return ticket
+
+    def get(self, ticket, user_id):
+        with self.lock:
+            entry = self.tickets.get(ticket)
+            if entry is None or entry["user_id"] != user_id:
+                return None
+            if entry["expires"] < time.monotonic():
+                return None
+
+            result = {"ticket": ticket, "status": entry["status"]}
+            if entry["status"] == "done":
+                result["http_status"] = entry["http_status"]
+                result["result"] = entry["result"]
+            return result
+
+    def _run(self, ticket, fn, user_id, data):
+        try:
+            with self.app.app_context():
+                body, status = fn(user_id, data)
+        except Exception:
+            self.app.logger.exception("async attendance submission failed")
+            body, status = {"error": "Internal server error"}, 500
+
+        with self.lock:
+            self.pending -= 1
+            entry = self.tickets.get(ticket)
+            if entry is not None:
+                entry.update(status="done", http_status=status, result=body)
+
+    def _executor(self):
+        # Created lazily (and again after a fork) so each worker process gets
+        # its own threads.
+        if self.executor is None or self.pid != os.getpid():
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="attendance-submit"
+            )
+            self.pid = os.getpid()
+        return self.executor
+
+    def _expire(self, now):
+        while self.tickets:
+            ticket, entry = next(iter(self.tickets.items()))
+            if entry["expires"] >= now:
+                break
+            del self.tickets[ticket]
+
+
+class AsyncSubmissions:
+    """Worker pool and ticket store for ``Prefer: respond-async`` submissions.
+
+    Tickets are kept in process memory for ``ATTENDANCE_TICKET_TTL`` seconds
+    and can only be read by the student who created them. With several worker
+    processes, status lookups need to reach the process that issued the ticket
+    (sticky sessions), since nothing is shared through an external broker.
+    """
+
+    def init_app(self, app):
+        if app.config.get("ATTENDANCE_ASYNC_WORKERS", 0) > 0:
+            app.extensions["async_submissions"] = _Pool(app)
+
+    def requested(self):
+        if "async_submissions" not in current_app.extensions:
+            return False
+        return "respond-async" in request.headers.get("Prefer", "").lower()
+
+    def submit(self, fn, user_id, data):
+        return current_app.extensions["async_submissions"].submit(fn, user_id, data)
+
+    def get(self, ticket, user_id):
+        pool = current_app.extensions.get("async_submissions")
+        if pool is None:
+            return None
+        return pool.get(ticket, user_id)
+
+
+async_submissions = AsyncSubmissions()
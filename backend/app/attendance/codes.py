@@ -0,0 +1,43 @@
+import hashlib
+import hmac
+import secrets
+import struct
+import time
+
+
+CODE_DIGITS = 6
+
+
+def new_secret():
+    """Random per-session secret for rotating attendance codes."""
+    return secrets.token_hex(20)
+
+
+def code_at(secret, counter):
+    """The code of time step ``counter`` (RFC 6238 truncation, HMAC-SHA1)."""
+    digest = hmac.new(bytes.fromhex(secret), struct.pack(">Q", counter), hashlib.sha1).digest()
+    offset = digest[-1] & 0x0F
+    value = struct.unpack(">I", digest[offset:offset + 4])[0] & 0x7FFFFFFF
+    return str(value % 10 ** CODE_DIGITS).zfill(CODE_DIGITS)
+
+
+def current_code(secret, step, now=None):
+    """Return (code, seconds until it rotates) for the current time step."""
+    now = time.time() if now is None else now
+    counter = int(now // step)
+    return code_at(secret, counter), round((counter + 1) * step - now, 1)
+
+
+def verify(secret, code, step, drift, now=None):
+    """True when ``code`` matches the current step or one within ``drift`` steps.
+
+    Pure computation: no database access and nothing to rotate.
+    """
+    if not isinstance(code, str) or len(code) != CODE_DIGITS:
+        return False
+    now = time.time() if now is None else now
+    counter = int(now // step)
+    return any(
+        hmac.compare_digest(code_at(secret, counter + delta), code)
+        for delta in range(-drift, drift + 1)
+    )
@@ -0,0 +1,58 @@
+import click
+
+from app.extensions import db
+from . import attendance_bp
+from .geofence import reverify
+from .devices import backfill
+from .lifecycle import close_expired
+from .rollups import rebuild
+
+
+@attendance_bp.cli.command("reverify")
+@click.option("--session-id", type=int, help="Only records of this attendance session.")
+@click.option("--class-id", type=int, help="Only records of this class.")
+@click.option("--since", type=click.DateTime(), help="Sessions starting at or after this time.")
+@click.option("--until", type=click.DateTime(), help="Sessions starting before this time.")
+@click.option("--store", is_flag=True, help="Write stale distances and verdicts back to attendance_records.")
+def reverify_command(session_id, class_id, since, until, store):
+    """Re-check stored attendance locations against the current geofences."""
+    with db.engine.begin() as conn:
+        summary = reverify(
+            conn, session_id=session_id, class_id=class_id, since=since, until=until, store=store
+        )
+
+    click.echo(
+        f"checked={summary['checked']} inside={summary['inside']} outside={summary['outside']} "
+        f"changed={summary['changed']} updated={summary['updated']} skipped={summary['skipped']} stored={store}"
+    )
+    for record_id in summary["outside_record_ids"]:
+        click.echo(f"outside record_id={record_id}")
+
+
+@attendance_bp.cli.command("flag-devices")
+@click.option("--session-id", type=int, help="Only this attendance session.")
+@click.option("--since-session-id", type=int, help="Sessions with this id or later.")
+def flag_devices_command(session_id, since_session_id):
+    """Flag records that share a device signature within a session."""
+    with db.engine.begin() as conn:
+        sessions, flagged = backfill(conn, session_id=session_id, since_session_id=since_session_id)
+
+    click.echo(f"sessions={sessions} records_in_collisions={flagged}")
+
+
+@attendance_bp.cli.command("rebuild-rollups")
+@click.option("--class-id", type=int, help="Only this class.")
+def rebuild_rollups_command(class_id):
+    """Recompute the per-student attendance rollups from the records."""
+    with db.engine.begin() as conn:
+        rows = rebuild(conn, class_id=class_id)
+
+    click.echo(f"rollups={rows}")
+
+
+@attendance_bp.cli.command("close-expired")
+def close_expired_command():
+    """Close every active attendance session whose end time has passed."""
+    closed = close_expired()
+
+    click.echo(f"closed={len(closed)}")
@@ -0,0 +1,202 @@
+from collections import defaultdict
+import hashlib
+import threading
+
+from flask import current_app
+from sqlalchemy import func, select, update
+
+from app.extensions import db
+from app.models.attendance_record import AttendanceRecord
+
+
+def generate_device_hash(user_agent, screen_size, timezone, language, ip_subnet):
+    hash_input = f"{user_agent}|{screen_size}|{timezone}|{language}|{ip_subnet}"
+    return hashlib.sha256(hash_input.encode()).hexdigest()
+
+
+# Submissions without any device info all hash to this; sharing it says
+# nothing about the device, so it never counts as a collision.
+EMPTY_SIGNATURE = generate_device_hash("", "", "", "", "")
+
+# Keeps IN lists under SQLite's bound-parameter limit.
+UPDATE_CHUNK = 5000
+
+
+class _SessionDevices:
+    __slots__ = ("by_signature", "by_ip_prefix")
+
+    def __init__(self):
+        self.by_signature = defaultdict(set)
+        self.by_ip_prefix = defaultdict(set)
+
+    def add(self, student_id, signature, ip_prefix):
+        """Index one record; return the students now sharing its signature."""
+        if ip_prefix:
+            self.by_ip_prefix[ip_prefix].add(student_id)
+        if not signature or signature == EMPTY_SIGNATURE:
+            return set()
+        students = self.by_signature[signature]
+        students.add(student_id)
+        return students if len(students) > 1 else set()
+
+
+class DeviceIndex:
+    """Per-session index of device_signature -> students and ip_prefix -> students.
+
+    Updated as records are inserted, so one phone marking attendance for
+    several students is caught in O(1) at insert time and the records are
+    flagged right away. A session is loaded from the database the first time
+    this process sees it, which covers records inserted by other processes up
+    to that point; ``backfill`` repairs anything older or missed.
+    """
+
+    def init_app(self, app):
+        app.extensions["device_index"] = {"sessions": {}, "lock": threading.Lock()}
+
+    def _state(self):
+        return current_app.extensions["device_index"]
+
+    def record_inserted(self, rows):
+        """Index freshly committed rows and flag any device collisions.
+
+        Returns the (session_id, device_signature) pairs that were flagged.
+        """
+        to_flag = []
+        state = self._state()
+        with state["lock"]:
+            for row in rows:
+                devices = self._session(state, row["session_id"])
+                shared = devices.add(row["student_id"], row["device_signature"], row["ip_prefix"])
+                if shared:
+                    to_flag.append((row["session_id"], row["device_signature"]))
+
+        to_flag = set(to_flag)
+        if to_flag:
+            with db.engine.begin() as conn:
+                for session_id, signature in to_flag:
+                    flag_shared_signature(conn, session_id, signature)
+        return to_flag
+
+    def discard(self, session_id):
+        state = self._state()
+        with state["lock"]:
+            state["sessions"].pop(session_id, None)
+
+    def _session(self, state, session_id):
+        devices = state["sessions"].get(session_id)
+        if devices is None:
+            devices = _SessionDevices()
+            # Its own short connection: this also runs on the group-commit
+            # thread, whose db.session would otherwise hold one transaction
+            # open for the life of the thread.
+            with db.engine.connect() as conn:
+                rows = conn.execute(
+                    select(AttendanceRecord.student_id, AttendanceRecord.device_signature, AttendanceRecord.ip_prefix)
+                    .where(AttendanceRecord.session_id == session_id)
+                )
+                for student_id, signature, ip_prefix in rows:
+                    devices.add(student_id, signature, ip_prefix)
+            state["sessions"][session_id] = devices
+        return devices
+
+
+def flag_shared_signature(conn, session_id, signature):
+    records = AttendanceRecord.__table__
+    conn.execute(
+        update(records)
+        .where(
+            records.c.session_id == session_id,
+            records.c.device_signature == signature,
+            records.c.status == "present"
+        )
+        .values(status="flagged")
+    )
+
+
+def collision_flags(session_id, records, conn=None):
+    """Per-student collision report for some of one session's records.
+
+    ``records`` yields (student_id, device_signature, ip_prefix), e.g. one
+    page of the records listing. Only the session's rows sharing those
+    signatures and a count per ip_prefix are read, not the whole session.
+    Reads on ``conn`` when given, else on the request's session.
+    Returns {student_id: {"shared_device_with": [...], "ip_prefix_shared_by": n}}.
+    """
+    conn = db.session if conn is None else conn
+    records = list(records)
+    signatures = {sig for _, sig, _ in records if sig and sig != EMPTY_SIGNATURE}
+    prefixes = {prefix for _, _, prefix in records if prefix}
+
+    by_signature = defaultdict(set)
+    if signatures:
+        rows = conn.execute(
+            select(AttendanceRecord.student_id, AttendanceRecord.device_signature).where(
+                AttendanceRecord.session_id == session_id,
+                AttendanceRecord.device_signature.in_(signatures)
+            )
+        )
+        for student_id, signature in rows:
+            by_signature[signature].add(student_id)
+
+    prefix_counts = {}
+    if prefixes:
+        prefix_counts = dict(conn.execute(
+            select(AttendanceRecord.ip_prefix, func.count(AttendanceRecord.id))
+            .where(AttendanceRecord.session_id == session_id, AttendanceRecord.ip_prefix.in_(prefixes))
+            .group_by(AttendanceRecord.ip_prefix)
+        ).all())
+
+    return {
+        student_id: {
+            "shared_device_with": sorted(by_signature.get(signature, set()) - {student_id}),
+            "ip_prefix_shared_by": prefix_counts.get(ip_prefix, 0),
+        }
+        for student_id, signature, ip_prefix in records
+    }
+
+
+def backfill(conn, session_id=None, since_session_id=None, chunk_size=50000):
+    """Flag device collisions for historical sessions in one streaming pass.
+
+    Records are read ordered by session, so only one session's signatures are
+    held in memory at a time. Returns (sessions_scanned, records_in_collisions).
+    """
+    stmt = (
+        select(AttendanceRecord.id, AttendanceRecord.session_id, AttendanceRecord.device_signature)
+        .where(AttendanceRecord.device_signature.is_not(None))
+        .order_by(AttendanceRecord.session_id, AttendanceRecord.id)
+    )
+    if session_id is not None:
+        stmt = stmt.where(AttendanceRecord.session_id == session_id)
+    if since_session_id is not None:
+        stmt = stmt.where(AttendanceRecord.session_id >= since_session_id)
+
+    to_flag = []
+    sessions = 0
+    current, by_signature = None, defaultdict(list)
+
+    def finish():
+        for signature, record_ids in by_signature.items():
+            if signature != EMPTY_SIGNATURE and len(record_ids) > 1:
+                to_flag.extend(record_ids)
+
+    result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(stmt)
+    for record_id, record_session, signature in result:
+        if record_session != current:
+            finish()
+            sessions += 1
+            current, by_signature = record_session, defaultdict(list)
+        by_signature[signature].append(record_id)
+    finish()
+
+    records = AttendanceRecord.__table__
+    for start in range(0, len(to_flag), UPDATE_CHUNK):
+        conn.execute(
+            update(records)
+            .where(records.c.id.in_(to_flag[start:start + UPDATE_CHUNK]), records.c.status == "present")
+            .values(status="flagged")
+        )
+    return sessions, len(to_flag)
+
+
+device_index = DeviceIndex()
@@ -0,0 +1,111 @@
+import csv
+from datetime import datetime
+import io
+import json
+
+from sqlalchemy import select
+
+from app.replicas import read_engine
+from app.models.attendance_record import AttendanceRecord
+from app.models.attendance_session import AttendanceSession
+from app.models.class_model import Class
+
+
+# Rows fetched per round trip and written per chunk of the response.
+EXPORT_CHUNK = 5000
+
+EXPORT_COLUMNS = (
+    "record_id",
+    "session_id",
+    "class_id",
+    "student_id",
+    "status",
+    "marked_at",
+    "device_signature",
+    "ip_prefix",
+    "submitted_latitude",
+    "submitted_longitude",
+    "distance_meters",
+    "location_verified",
+)
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def export_query(teacher_id, session_id=None, class_id=None, since=None, until=None):
+    """Records of ``teacher_id``'s classes as flat tuples in EXPORT_COLUMNS order.
+
+    ``since`` / ``until`` bound the session start. Ordered by session and
+    check-in time, which ix_attendance_records_session_marked serves.
+    """
+    stmt = (
+        select(
+            AttendanceRecord.id,
+            AttendanceRecord.session_id,
+            AttendanceSession.class_id,
+            AttendanceRecord.student_id,
+            AttendanceRecord.status,
+            AttendanceRecord.marked_at,
+            AttendanceRecord.device_signature,
+            AttendanceRecord.ip_prefix,
+            AttendanceRecord.submitted_latitude,
+            AttendanceRecord.submitted_longitude,
+            AttendanceRecord.distance_meters,
+            AttendanceRecord.location_verified,
+        )
+        .join(AttendanceSession, AttendanceSession.id == AttendanceRecord.session_id)
+        .join(Class, Class.id == AttendanceSession.class_id)
+        .where(Class.teacher_id == teacher_id)
+        .order_by(AttendanceRecord.session_id, AttendanceRecord.marked_at, AttendanceRecord.id)
+    )
+    if session_id is not None:
+        stmt = stmt.where(AttendanceRecord.session_id == session_id)
+    if class_id is not None:
+        stmt = stmt.where(AttendanceSession.class_id == class_id)
+    if since is not None:
+        stmt = stmt.where(AttendanceSession.starts_at >= since)
+    if until is not None:
+        stmt = stmt.where(AttendanceSession.starts_at < until)
+    return stmt
+
+
+def stream_export(stmt, fmt):
+    """Yield the export body chunk by chunk.
+
+    Rows come from a server-side cursor on a connection of its own (to the
+    request's replica, when it has one), so memory depends on EXPORT_CHUNK and
+    not on the size of the export. The connection is released when the
+    generator finishes or the client disconnects.
+    """
+    write = _csv_chunk if fmt == "csv" else _ndjson_chunk
+    if fmt == "csv":
+        yield _csv_chunk([EXPORT_COLUMNS])
+
+    with read_engine().connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=EXPORT_CHUNK).execute(stmt)
+        for rows in result.partitions(EXPORT_CHUNK):
+            yield write(rows)
+
+
+def _csv_chunk(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(v.isoformat() if isinstance(v, datetime) else v for v in row)
+    return buffer.getvalue()
+
+
+def _ndjson_chunk(rows):
+    return "".join(
+        json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=_isoformat) + "\n"
+        for row in rows
+    )
+
+
+def _isoformat(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
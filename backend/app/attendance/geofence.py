@@ -0,0 +1,122 @@
+from math import radians, cos, sin, asin, sqrt
+
+from sqlalchemy import bindparam, func, select, update
+
+from app.models.attendance_record import AttendanceRecord
+from app.models.attendance_session import AttendanceSession
+from app.models.class_model import Class
+
+
+EARTH_RADIUS_M = 6371000
+
+
+def distance_meters(lat1, lon1, lat2, lon2):
+    dlat = radians(lat2 - lat1)
+    dlon = radians(lon2 - lon1)
+    a = sin(dlat/2)**2 + cos(radians(lat1))*cos(radians(lat2))*sin(dlon/2)**2
+    c = 2 * asin(sqrt(a))
+    return EARTH_RADIUS_M * c
+
+
+def distances_meters(lat1, lon1, lat2, lon2):
+    """Vectorized ``distance_meters`` over equal-length arrays."""
+    # numpy is only needed for batch re-verification, so keep it off the
+    # import path of the request handlers.
+    import numpy as np
+
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype=np.float64)) for a in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return EARTH_RADIUS_M * 2 * np.arcsin(np.sqrt(a))
+
+
+def reverify(conn, session_id=None, class_id=None, since=None, until=None, store=False, chunk_size=100000):
+    """Re-check stored submissions against the class's current geofence.
+
+    Scope is any combination of a session, a class and a term (``since`` /
+    ``until`` on the session start). Rows are streamed in chunks of
+    ``chunk_size`` and each chunk is checked in one array pass. ``changed``
+    counts the rows whose verdict flipped and ``updated`` the rows whose stored
+    distance or verdict is stale (a moved or resized geofence changes every
+    distance, not only the verdicts near the edge). With ``store=True`` the
+    recomputed distance and verdict are written back for the ``updated`` rows.
+    Records submitted without coordinates are counted as skipped.
+    """
+    import numpy as np
+
+    stmt = (
+        select(
+            AttendanceRecord.id,
+            AttendanceRecord.submitted_latitude,
+            AttendanceRecord.submitted_longitude,
+            AttendanceRecord.location_verified,
+            AttendanceRecord.distance_meters,
+            Class.latitude,
+            Class.longitude,
+            Class.radius_meters,
+        )
+        .join(AttendanceSession, AttendanceSession.id == AttendanceRecord.session_id)
+        .join(Class, Class.id == AttendanceSession.class_id)
+        .where(AttendanceRecord.submitted_latitude.is_not(None))
+        .where(AttendanceRecord.submitted_longitude.is_not(None))
+    )
+    stmt = _scoped(stmt, session_id, class_id, since, until)
+
+    summary = {"checked": 0, "inside": 0, "outside": 0, "changed": 0, "updated": 0, "outside_record_ids": []}
+    writes = []
+
+    result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(stmt)
+    for chunk in result.partitions(chunk_size):
+        ids, lat, lon, verified, stored, clat, clon, radius = (np.asarray(col) for col in zip(*chunk))
+        distance = distances_meters(lat, lon, clat, clon)
+        # None (never computed) becomes NaN, which compares as stale.
+        stored = stored.astype(np.float64)
+        inside = distance <= radius.astype(np.float64)
+
+        summary["checked"] += len(ids)
+        summary["inside"] += int(inside.sum())
+        summary["outside"] += int((~inside).sum())
+        summary["outside_record_ids"].extend(ids[~inside].tolist())
+
+        flipped = inside != (verified == True)  # noqa: E712 (None counts as changed)
+        # Within a centimetre: the stored value came from the scalar formula.
+        moved = ~np.isclose(distance, stored, rtol=0, atol=0.01)
+        stale = np.flatnonzero(flipped | moved)
+        summary["changed"] += int(flipped.sum())
+        summary["updated"] += len(stale)
+        if store:
+            writes.extend(
+                {"record_id": int(ids[i]), "distance": float(distance[i]), "verified": bool(inside[i])}
+                for i in stale
+            )
+
+    if store and writes:
+        table = AttendanceRecord.__table__
+        conn.execute(
+            update(table)
+            .where(table.c.id == bindparam("record_id"))
+            .values(distance_meters=bindparam("distance"), location_verified=bindparam("verified")),
+            writes,
+        )
+
+    summary["skipped"] = conn.execute(_scoped(
+        select(func.count(AttendanceRecord.id))
+        .join(AttendanceSession, AttendanceSession.id == AttendanceRecord.session_id)
+        .where(
+            AttendanceRecord.submitted_latitude.is_(None)
+            | AttendanceRecord.submitted_longitude.is_(None)
+        ),
+        session_id, class_id, since, until
+    )).scalar()
+    return summary
+
+
+def _scoped(stmt, session_id, class_id, since, until):
+    if session_id is not None:
+        stmt = stmt.where(AttendanceRecord.session_id == session_id)
+    if class_id is not None:
+        stmt = stmt.where(AttendanceSession.class_id == class_id)
+    if since is not None:
+        stmt = stmt.where(AttendanceSession.starts_at >= since)
+    if until is not None:
+        stmt = stmt.where(AttendanceSession.starts_at < until)
+    return stmt
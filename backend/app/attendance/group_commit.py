@@ -0,0 +1,137 @@
+import os
+import queue
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from .recording import DUPLICATE, INSERTED, after_commit, record_attendance_batch
+
+
+class WriterBusy(Exception):
+    """Raised when the write-behind queue is full or a batch did not commit in time."""
+
+
+class _Pending:
+    __slots__ = ("row", "done", "outcome", "error")
+
+    def __init__(self, row):
+        self.row = row
+        self.done = threading.Event()
+        self.outcome = None
+        self.error = None
+
+
+class _Flusher:
+    def __init__(self, app):
+        self.app = app
+        self.flush_size = app.config["ATTENDANCE_FLUSH_SIZE"]
+        self.flush_interval = app.config["ATTENDANCE_FLUSH_INTERVAL_MS"] / 1000.0
+        self.timeout = app.config["ATTENDANCE_WRITE_TIMEOUT"]
+        self.queue = queue.Queue(maxsize=app.config["ATTENDANCE_QUEUE_SIZE"])
+        self.lock = threading.Lock()
+        self.thread = None
+        self.pid = None
+
+    def write(self, row):
+        self._ensure_started()
+        pending = _Pending(row)
+        try:
+            self.queue.put_nowait(pending)
+        except queue.Full:
+            raise WriterBusy("attendance write queue is full")
+
+        # Only return once the batch holding this row has committed, so the
+        # HTTP response means the same thing as with a direct commit.
+        if not pending.done.wait(self.timeout):
+            raise WriterBusy("attendance write did not commit in time")
+        if pending.error is not None:
+            raise pending.error
+        return pending.outcome
+
+    def _ensure_started(self):
+        # Started lazily (and restarted after a fork) so pre-forking servers
+        # get one flusher per worker process.
+        if self.pid == os.getpid() and self.thread.is_alive():
+            return
+        with self.lock:
+            if self.pid == os.getpid() and self.thread.is_alive():
+                return
+            self.thread = threading.Thread(
+                target=self._run, name="attendance-group-commit", daemon=True
+            )
+            self.pid = os.getpid()
+            self.thread.start()
+
+    def _run(self):
+        with self.app.app_context():
+            while True:
+                batch = [self.queue.get()]
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.flush_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self.queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+                self._flush(batch)
+
+    def _flush(self, batch):
+        try:
+            outcomes = self._commit([p.row for p in batch])
+        except Exception as exc:
+            for pending in batch:
+                pending.error = exc
+                pending.done.set()
+            return
+
+        after_commit([p.row for p, outcome in zip(batch, outcomes) if outcome == INSERTED])
+
+        for pending, outcome in zip(batch, outcomes):
+            pending.outcome = outcome
+            pending.done.set()
+
+    def _commit(self, rows):
+        try:
+            with db.engine.begin() as conn:
+                return record_attendance_batch(conn, rows)
+        except IntegrityError:
+            pass
+
+        # Another process inserted one of these rows between our duplicate
+        # check and the INSERT; retry row by row so only that row fails.
+        outcomes = []
+        for row in rows:
+            try:
+                with db.engine.begin() as conn:
+                    outcomes.extend(record_attendance_batch(conn, [row]))
+            except IntegrityError:
+                outcomes.append(DUPLICATE)
+        return outcomes
+
+
+class GroupCommitWriter:
+    """Opt-in write-behind queue that commits attendance records in batches.
+
+    Verified rows are queued and a background thread writes them as multi-row
+    INSERTs every ``ATTENDANCE_FLUSH_INTERVAL_MS`` or ``ATTENDANCE_FLUSH_SIZE``
+    rows, whichever comes first. ``write`` blocks until the row's batch has
+    committed and returns its outcome.
+    """
+
+    def init_app(self, app):
+        if app.config.get("ATTENDANCE_GROUP_COMMIT"):
+            app.extensions["group_commit"] = _Flusher(app)
+
+    def enabled(self):
+        return "group_commit" in current_app.extensions
+
+    def write(self, row):
+        return current_app.extensions["group_commit"].write(row)
+
+
+group_commit = GroupCommitWriter()
@@ -0,0 +1,198 @@
+from datetime import datetime
+import heapq
+import os
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models.attendance_session import AttendanceSession
+from app.versions import versions
+from .devices import device_index
+from .live_feed import live_feed
+from .live_sessions import live_sessions
+from .rollups import close_sessions
+from .rosters import rosters
+from .spatial import geo_index
+
+
+START = "start"
+END = "end"
+
+
+def evict_closed(session_id, class_id):
+    """Drop a just-closed session from every per-process cache."""
+    live_sessions.discard(session_id)
+    geo_index.session_ended(session_id)
+    device_index.discard(session_id)
+    rosters.discard_session(session_id)
+    live_feed.session_ended(session_id)
+    versions.bump("class_sessions", class_id)
+
+
+def close_expired(now=None):
+    """Close every active session whose ``ends_at`` has passed.
+
+    Returns the (session_id, class_id) pairs closed by this call. Served by
+    ix_attendance_sessions_active_ends, so the cost follows the number of
+    active sessions, not the size of the table.
+    """
+    now = now or datetime.now()
+    with db.engine.begin() as conn:
+        expired = conn.execute(
+            select(AttendanceSession.id).where(
+                AttendanceSession.is_active.is_(True),
+                AttendanceSession.ends_at <= now
+            )
+        ).scalars().all()
+        closed = close_sessions(conn, expired)
+    for session_id, class_id in closed:
+        evict_closed(session_id, class_id)
+    return closed
+
+
+def _transitions(session_id, class_id, starts_at, ends_at):
+    """Heap entries for a session: its start if still ahead, and its end."""
+    entries = []
+    if starts_at and starts_at > datetime.now():
+        entries.append((starts_at, START, session_id, class_id))
+    if ends_at:
+        entries.append((ends_at, END, session_id, class_id))
+    return entries
+
+
+class _Scheduler:
+    def __init__(self, app):
+        self.app = app
+        self.rescan = app.config["SESSION_SCHEDULER_RESCAN_SECONDS"]
+        self.cond = threading.Condition()
+        self.heap = []
+        self.thread = None
+        self.pid = None
+
+    def ensure_started(self):
+        # Started lazily (and again after a fork) like the group-commit
+        # flusher, so CLI commands never start it and each worker runs one.
+        if self.pid == os.getpid() and self.thread.is_alive():
+            return
+        with self.cond:
+            if self.pid == os.getpid() and self.thread.is_alive():
+                return
+            self.heap = []
+            self.thread = threading.Thread(target=self._run, name="attendance-session-scheduler", daemon=True)
+            self.pid = os.getpid()
+            self.thread.start()
+
+    def schedule(self, session_id, class_id, starts_at, ends_at):
+        with self.cond:
+            for entry in _transitions(session_id, class_id, starts_at, ends_at):
+                heapq.heappush(self.heap, entry)
+            # Wake the thread in case this is now the earliest transition.
+            self.cond.notify()
+
+    def _run(self):
+        with self.app.app_context():
+            next_sweep = 0
+            while True:
+                try:
+                    if time.monotonic() >= next_sweep:
+                        self._sweep()
+                        next_sweep = time.monotonic() + self.rescan
+                    starts, ends = self._wait(next_sweep)
+                    for session_id in starts:
+                        self._open(session_id)
+                    if ends:
+                        self._close(ends)
+                except Exception:
+                    current_app.logger.exception("session scheduler pass failed")
+                    time.sleep(1)
+
+    def _wait(self, next_sweep):
+        """Sleep until the earliest transition (or the next sweep) and pop what is due."""
+        with self.cond:
+            timeout = next_sweep - time.monotonic()
+            if self.heap:
+                timeout = min(timeout, (self.heap[0][0] - datetime.now()).total_seconds())
+            if timeout > 0:
+                self.cond.wait(timeout)
+
+            now = datetime.now()
+            starts, ends = [], []
+            while self.heap and self.heap[0][0] <= now:
+                _, kind, session_id, _ = heapq.heappop(self.heap)
+                (starts if kind == START else ends).append(session_id)
+            return starts, ends
+
+    def _sweep(self):
+        # Recovery: close whatever expired while no scheduler was running (or
+        # was started by another process), then queue the rest.
+        close_expired()
+        with db.engine.connect() as conn:
+            active = conn.execute(
+                select(
+                    AttendanceSession.id,
+                    AttendanceSession.class_id,
+                    AttendanceSession.starts_at,
+                    AttendanceSession.ends_at
+                ).where(AttendanceSession.is_active.is_(True))
+            ).all()
+        # Merged into the heap rather than replacing it: a schedule() call
+        # made since the SELECT above must not be lost until the next sweep.
+        # Entries of sessions closed elsewhere stay until they fall due,
+        # when closing them again is a no-op.
+        with self.cond:
+            queued = set(self.heap)
+            for row in active:
+                for entry in _transitions(*row):
+                    if entry not in queued:
+                        heapq.heappush(self.heap, entry)
+            self.cond.notify()
+
+    def _open(self, session_id):
+        # Load the caches a check-in burst needs before the first student does.
+        entry = live_sessions.get(session_id)
+        if entry is not None:
+            rosters.members(entry.class_id)
+
+    def _close(self, session_ids):
+        with db.engine.begin() as conn:
+            closed = close_sessions(conn, session_ids)
+        for session_id, class_id in closed:
+            evict_closed(session_id, class_id)
+
+
+class SessionScheduler:
+    """Opt-in background closing of attendance sessions at their ``ends_at``.
+
+    Each worker process keeps a min-heap of upcoming session transitions and
+    sleeps until the earliest one. At ``ends_at`` the session is closed (in
+    one bulk UPDATE with whatever else is due) and evicted from the caches,
+    as /attendance/end would; at ``starts_at`` the caches are warmed. On
+    start-up and every ``SESSION_SCHEDULER_RESCAN_SECONDS`` a sweep closes
+    anything overdue and re-reads the active sessions, which picks up
+    sessions started by other processes. Closing is guarded, so several
+    processes racing on one session count it once.
+    """
+
+    def init_app(self, app):
+        if app.config.get("SESSION_SCHEDULER"):
+            app.extensions["session_scheduler"] = _Scheduler(app)
+            app.before_request(self._ensure_started)
+
+    def _ensure_started(self):
+        current_app.extensions["session_scheduler"].ensure_started()
+
+    def schedule(self, attendance_session):
+        scheduler = current_app.extensions.get("session_scheduler")
+        if scheduler is not None:
+            scheduler.schedule(
+                attendance_session.id,
+                attendance_session.class_id,
+                attendance_session.starts_at,
+                attendance_session.ends_at
+            )
+
+
+session_scheduler = SessionScheduler()
@@ -0,0 +1,306 @@
+from collections import deque
+from itertools import islice
+import json
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.models.attendance_record import AttendanceRecord
+from app.models.attendance_session import AttendanceSession
+from .records import records_json
+
+
+# Event types: a record new to the session, and a later change to one
+RECORD = "record"
+UPDATE = "update"
+
+
+def _feed_query(session_id):
+    return select(AttendanceRecord.__table__).where(AttendanceRecord.session_id == session_id)
+
+
+def _events(conn, session_id, rows):
+    """(record_id, data) pairs, serialized as the records listing does."""
+    rows = list(rows)
+    return [(row.id, data) for row, data in zip(rows, records_json(session_id, rows, conn=conn))]
+
+
+def format_event(record_id, data, event=RECORD):
+    # Without an id line the client's Last-Event-ID stays where it was, so
+    # updates to older records never move a reconnect's resume point back.
+    head = f"id: {record_id}\n" if record_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class _Sent:
+    """Record ids already sent to one watcher, in bounded memory.
+
+    A high-water id, plus the ids sent within ``window`` below it: records
+    can commit out of id order, so a lower id may still arrive after a
+    higher one. Ids further below are taken as sent.
+    """
+
+    def __init__(self, high_water, window):
+        self.high_water = high_water
+        self.window = window
+        self.recent = set()
+
+    def add(self, record_id):
+        """Mark ``record_id`` sent; returns False if it already was."""
+        if record_id <= self.high_water - self.window or record_id in self.recent:
+            return False
+        self.recent.add(record_id)
+        if record_id > self.high_water:
+            self.high_water = record_id
+            if len(self.recent) > 2 * self.window:
+                floor = self.high_water - self.window
+                self.recent = {i for i in self.recent if i > floor}
+        return True
+
+
+class _Channel:
+    """Recent events of one session, shared by every watcher in this process.
+
+    Events carry a channel sequence number; a watcher remembers the last one
+    it sent and waits on the condition for newer ones, so publishing is one
+    notify no matter how many watchers there are. New records are published
+    once each; updates every time a record changes.
+    """
+
+    def __init__(self, session_id, size):
+        self.session_id = session_id
+        self.size = size
+        self.cond = threading.Condition()
+        self.events = deque()
+        self.seen = set()
+        self.seq = 0
+        self.watchers = 0
+        self.ended = False
+        self.high_water = 0
+        self.sync_floor = 0
+        self.synced_at = time.monotonic()
+        self.sync_lock = threading.Lock()
+
+    def publish(self, events, event=RECORD):
+        with self.cond:
+            for record_id, data in events:
+                if event == RECORD:
+                    if record_id in self.seen:
+                        continue
+                    self.seen.add(record_id)
+                    self.high_water = max(self.high_water, record_id)
+                self.seq += 1
+                self.events.append((self.seq, event, record_id, data))
+                if len(self.events) > self.size:
+                    _, dropped_event, dropped, _ = self.events.popleft()
+                    if dropped_event == RECORD:
+                        self.seen.discard(dropped)
+            self.cond.notify_all()
+
+    def end(self):
+        with self.cond:
+            self.ended = True
+            self.cond.notify_all()
+
+    def read(self, after_seq, timeout):
+        """Return (events, last_seq, missed) for events newer than ``after_seq``.
+
+        Blocks up to ``timeout`` seconds when there is nothing new. ``missed``
+        means the watcher fell further behind than the buffer holds.
+        """
+        with self.cond:
+            if self.seq == after_seq and not self.ended:
+                self.cond.wait(timeout)
+            if not self.events or self.seq == after_seq:
+                return [], self.seq, False
+            first = self.events[0][0]
+            missed = first > after_seq + 1
+            events = list(islice(self.events, max(0, after_seq + 1 - first), None))
+            return events, self.seq, missed
+
+
+class LiveFeed:
+    """In-process pub/sub of newly inserted attendance records, per session.
+
+    The insert paths call ``publish_inserted`` after commit, and code that
+    changes stored records (device flagging, re-verification) calls
+    ``publish_changed``. Sessions nobody is watching cost nothing; for
+    watched ones the records are read once, in the records listing's shape,
+    and fanned out to every watcher from memory. Records inserted by other
+    processes are picked up by one catch-up query per channel every
+    ``LIVE_FEED_SYNC_SECONDS``, not by each watcher; changes made by other
+    processes show on the next reload of the listing.
+    """
+
+    def init_app(self, app):
+        app.extensions["live_feed"] = {"channels": {}, "lock": threading.Lock()}
+
+    def _state(self):
+        return current_app.extensions["live_feed"]
+
+    def publish_inserted(self, rows):
+        """Publish freshly committed record rows (as built by ``build_row``)."""
+        channels = self._state()["channels"]
+        by_session = {}
+        for row in rows:
+            if row["session_id"] in channels:
+                by_session.setdefault(row["session_id"], []).append(row["student_id"])
+        if not by_session:
+            return
+
+        with db.engine.connect() as conn:
+            for session_id, student_ids in by_session.items():
+                channel = channels.get(session_id)
+                if channel is None:
+                    continue
+                found = conn.execute(
+                    _feed_query(session_id)
+                    .where(AttendanceRecord.student_id.in_(student_ids))
+                    .order_by(AttendanceRecord.id)
+                )
+                channel.publish(_events(conn, session_id, found))
+
+    def publish_changed(self, session_id, *criteria):
+        """Push the current state of a watched session's changed records.
+
+        ``criteria`` narrow the session's records to the changed ones; with
+        none, every record of the session is sent again.
+        """
+        channel = self._state()["channels"].get(session_id)
+        if channel is None:
+            return
+        with db.engine.connect() as conn:
+            found = conn.execute(_feed_query(session_id).where(*criteria).order_by(AttendanceRecord.id))
+            channel.publish(_events(conn, session_id, found), event=UPDATE)
+
+    def session_ended(self, session_id):
+        channel = self._state()["channels"].get(session_id)
+        if channel is not None:
+            channel.end()
+
+    def stream(self, session_id, last_event_id=None):
+        """Generate the SSE body for one watcher of ``session_id``.
+
+        With ``last_event_id`` the records after it are replayed from the
+        database first, then the stream continues from memory.
+        """
+        config = current_app.config
+        keepalive = config["LIVE_FEED_KEEPALIVE_SECONDS"]
+        sync = config["LIVE_FEED_SYNC_SECONDS"]
+        wait = min(keepalive, sync) if sync else keepalive
+
+        channel = self._subscribe(session_id)
+        try:
+            position = channel.seq
+            yield f"retry: {config['LIVE_FEED_RETRY_MS']}\n\n"
+
+            sent = _Sent(
+                channel.high_water if last_event_id is None else last_event_id, config["LIVE_FEED_BUFFER"]
+            )
+            if last_event_id is not None:
+                for record_id, data in self._backfill(session_id, last_event_id):
+                    if sent.add(record_id):
+                        yield format_event(record_id, data)
+
+            written_at = time.monotonic()
+            while True:
+                events, position, missed = channel.read(position, wait)
+                if missed:
+                    # Fell behind the buffer; fill the hole from the database.
+                    # Updates in the hole are lost; the records keep their
+                    # current values, which the next reload shows.
+                    for record_id, data in self._backfill(session_id, sent.high_water):
+                        if sent.add(record_id):
+                            yield format_event(record_id, data)
+
+                for _, event, record_id, data in events:
+                    if event == UPDATE:
+                        yield format_event(None, data, event=UPDATE)
+                    elif sent.add(record_id):
+                        yield format_event(record_id, data)
+                    else:
+                        continue
+                    written_at = time.monotonic()
+
+                if channel.ended and channel.seq == position:
+                    yield format_event(sent.high_water, {"attendance_session_id": session_id}, event="ended")
+                    return
+
+                if time.monotonic() - written_at >= keepalive:
+                    written_at = time.monotonic()
+                    yield ": keepalive\n\n"
+
+                if sync:
+                    self._sync(channel, sync)
+        finally:
+            self._unsubscribe(channel)
+
+    def _subscribe(self, session_id):
+        state = self._state()
+        with state["lock"]:
+            channel = state["channels"].get(session_id)
+            if channel is None:
+                channel = _Channel(session_id, current_app.config["LIVE_FEED_BUFFER"])
+                # Start catch-up syncs from what is already in the database,
+                # and end straight away for a session that is already over.
+                with db.engine.connect() as conn:
+                    high_water = conn.execute(
+                        select(func.max(AttendanceRecord.id)).where(AttendanceRecord.session_id == session_id)
+                    ).scalar() or 0
+                    is_active = conn.execute(
+                        select(AttendanceSession.is_active).where(AttendanceSession.id == session_id)
+                    ).scalar()
+                channel.high_water = channel.sync_floor = high_water
+                channel.ended = not is_active
+                state["channels"][session_id] = channel
+            channel.watchers += 1
+            return channel
+
+    def _unsubscribe(self, channel):
+        state = self._state()
+        with state["lock"]:
+            channel.watchers -= 1
+            if channel.watchers == 0 and state["channels"].get(channel.session_id) is channel:
+                del state["channels"][channel.session_id]
+
+    def _backfill(self, session_id, after_id):
+        with db.engine.connect() as conn:
+            rows = conn.execute(
+                _feed_query(session_id)
+                .where(AttendanceRecord.id > after_id)
+                .order_by(AttendanceRecord.id)
+            ).all()
+            return _events(conn, session_id, rows)
+
+    def _sync(self, channel, interval):
+        # One watcher per channel runs the catch-up; the rest skip it.
+        if time.monotonic() - channel.synced_at < interval or not channel.sync_lock.acquire(blocking=False):
+            return
+        try:
+            floor = channel.sync_floor
+            # Looking back to the previous high-water mark also catches
+            # records whose ids were allocated before a later commit.
+            channel.sync_floor = channel.high_water
+            with db.engine.connect() as conn:
+                rows = conn.execute(
+                    _feed_query(channel.session_id)
+                    .where(AttendanceRecord.id > floor)
+                    .order_by(AttendanceRecord.id)
+                ).all()
+                # Only the ones this process has not published need flags read.
+                events = _events(conn, channel.session_id, (r for r in rows if r.id not in channel.seen))
+                is_active = conn.execute(
+                    select(AttendanceSession.is_active).where(AttendanceSession.id == channel.session_id)
+                ).scalar()
+            channel.publish(events)
+            if not is_active:
+                channel.end()
+        finally:
+            channel.synced_at = time.monotonic()
+            channel.sync_lock.release()
+
+
+live_feed = LiveFeed()
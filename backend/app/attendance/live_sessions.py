@@ -0,0 +1,114 @@
+from collections import namedtuple
+from datetime import datetime
+import threading
+
+from flask import current_app
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models.attendance_session import AttendanceSession
+from app.models.class_model import Class
+
+
+# Everything submit_attendance needs to verify a submission without touching
+# the database: the session window, its code (or rotating-code secret) and
+# the class geofence.
+LiveSession = namedtuple("LiveSession", [
+    "id",
+    "class_id",
+    "created_by",
+    "starts_at",
+    "ends_at",
+    "attendance_code",
+    "code_secret",
+    "latitude",
+    "longitude",
+    "radius_meters",
+])
+
+
+class LiveSessionCache:
+    """Per-process cache of live attendance sessions, keyed by session id.
+
+    Entries are filled by start_attendance (or lazily on a miss), dropped by
+    end_attendance and expire on their ``ends_at``. Each worker process holds
+    its own copy, so a session ended by another process can still be cached
+    here; that is fine because the INSERT that records attendance re-checks
+    ``is_active`` and the caller evicts the entry when it fails.
+    """
+
+    def init_app(self, app):
+        app.extensions["live_sessions"] = {
+            "entries": {},
+            "lock": threading.Lock(),
+        }
+
+    def _state(self):
+        return current_app.extensions["live_sessions"]
+
+    def get(self, session_id, now=None):
+        now = now or datetime.now()
+        entry = self._state()["entries"].get(session_id)
+        if entry is not None:
+            if now <= entry.ends_at:
+                return entry
+            self.discard(session_id)
+
+        entry = self._load(session_id)
+        # Expired sessions are still returned so the caller can report the
+        # closed window, but they are not cached.
+        if entry is not None and now <= entry.ends_at:
+            self.put(entry)
+        return entry
+
+    def put(self, entry):
+        state = self._state()
+        with state["lock"]:
+            state["entries"][entry.id] = entry
+
+    def discard(self, session_id):
+        state = self._state()
+        with state["lock"]:
+            state["entries"].pop(session_id, None)
+
+    def _load(self, session_id):
+        row = db.session.execute(
+            select(
+                AttendanceSession.id,
+                AttendanceSession.class_id,
+                AttendanceSession.created_by,
+                AttendanceSession.starts_at,
+                AttendanceSession.ends_at,
+                AttendanceSession.attendance_code,
+                AttendanceSession.code_secret,
+                Class.latitude,
+                Class.longitude,
+                Class.radius_meters,
+            )
+            .join(Class, Class.id == AttendanceSession.class_id)
+            .where(
+                AttendanceSession.id == session_id,
+                AttendanceSession.is_active.is_(True),
+            )
+        ).first()
+        if row is None:
+            return None
+        return LiveSession(*row)
+
+    @staticmethod
+    def from_models(attendance_session, class_obj):
+        return LiveSession(
+            id=attendance_session.id,
+            class_id=attendance_session.class_id,
+            created_by=attendance_session.created_by,
+            starts_at=attendance_session.starts_at,
+            ends_at=attendance_session.ends_at,
+            attendance_code=attendance_session.attendance_code,
+            code_secret=attendance_session.code_secret,
+            latitude=class_obj.latitude,
+            longitude=class_obj.longitude,
+            radius_meters=class_obj.radius_meters,
+        )
+
+
+live_sessions = LiveSessionCache()
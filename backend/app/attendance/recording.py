@@ -0,0 +1,202 @@
+from flask import current_app
+from sqlalchemy import Boolean, Float, String, insert, literal, select, tuple_
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models.enrollment import Enrollment
+from app.models.attendance_session import AttendanceSession
+from app.models.attendance_record import AttendanceRecord
+from .live_sessions import live_sessions
+from .devices import device_index
+from .rosters import rosters
+from .rollups import record_attended
+from .live_feed import live_feed
+
+
+INSERTED = "inserted"
+DUPLICATE = "duplicate"
+INACTIVE = "inactive"
+NOT_ENROLLED = "not_enrolled"
+
+OUTCOME_RESPONSES = {
+    INSERTED: ({"message": "Attendance recorded successfully"}, 201),
+    DUPLICATE: ({"error": "Attendance already submitted"}, 400),
+    INACTIVE: ({"error": "Attendance session not found or inactive"}, 404),
+    NOT_ENROLLED: ({"error": "Student not enrolled in this class"}, 403),
+}
+
+# Columns written for every record; rows are plain dicts with these keys plus
+# "class_id", which is only used for the enrollment check.
+RECORD_COLUMNS = [
+    "student_id",
+    "session_id",
+    "status",
+    "device_signature",
+    "ip_prefix",
+    "submitted_latitude",
+    "submitted_longitude",
+    "distance_meters",
+    "location_verified",
+]
+
+
+def build_row(user_id, attendance_session, device_hash, ip_subnet, latitude=None, longitude=None, distance=None):
+    return {
+        "student_id": user_id,
+        "session_id": attendance_session.id,
+        "class_id": attendance_session.class_id,
+        "status": "present",
+        "device_signature": device_hash,
+        "ip_prefix": ip_subnet,
+        "submitted_latitude": latitude,
+        "submitted_longitude": longitude,
+        "distance_meters": distance,
+        # Rows are only built after the geofence check passed
+        "location_verified": True if distance is not None else None,
+    }
+
+
+def record_attendance(row):
+    """Insert one verified record and return its outcome.
+
+    Enrollment and is_active are checked by the INSERT ... SELECT itself and
+    duplicates are rejected by uq_session_student, so an accepted submission is
+    a single INSERT plus the rollup increment, committed together.
+    """
+    sessions = AttendanceSession.__table__
+    enrolled = select(Enrollment.id).where(
+        Enrollment.student_id == row["student_id"],
+        Enrollment.class_id == row["class_id"]
+    ).exists()
+
+    source = select(
+        literal(row["student_id"]),
+        sessions.c.id,
+        literal(row["status"], String),
+        literal(row["device_signature"], String),
+        literal(row["ip_prefix"], String),
+        literal(row["submitted_latitude"], Float),
+        literal(row["submitted_longitude"], Float),
+        literal(row["distance_meters"], Float),
+        literal(row["location_verified"], Boolean)
+    ).where(
+        sessions.c.id == row["session_id"],
+        sessions.c.is_active.is_(True),
+        enrolled
+    )
+
+    try:
+        result = db.session.execute(
+            insert(AttendanceRecord.__table__).from_select(RECORD_COLUMNS, source)
+        )
+        if result.rowcount == 1:
+            record_attended(db.session, [row])
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return DUPLICATE
+
+    if result.rowcount == 1:
+        after_commit([row])
+        return INSERTED
+
+    # Only reached when the INSERT matched nothing, so this lookup is off the
+    # hot path.
+    is_active = db.session.execute(
+        select(AttendanceSession.is_active).where(AttendanceSession.id == row["session_id"])
+    ).scalar()
+    if not is_active:
+        # Ended by another process since we cached it.
+        live_sessions.discard(row["session_id"])
+        return INACTIVE
+    return NOT_ENROLLED
+
+
+def after_commit(rows):
+    """Update the in-process caches for freshly committed records.
+
+    Never raises: the records are committed, so a failure here must not turn
+    into an error for the submitter (whose retry would then be refused as a
+    duplicate) or kill the group-commit flusher. Each cache recovers on its
+    own, as noted below.
+    """
+    try:
+        rosters.record_inserted(rows)
+    except Exception:
+        # Absentee lists catch up when the roster reloads (ROSTER_MAX_AGE_SECONDS).
+        current_app.logger.exception("roster update failed")
+    flagged = ()
+    try:
+        flagged = device_index.record_inserted(rows)
+    except Exception:
+        # A missed flag is repaired by "flask attendance flag-devices".
+        current_app.logger.exception("device collision check failed")
+    try:
+        live_feed.publish_inserted(rows)
+        # Earlier records that now share a device were flagged just now.
+        for session_id, signature in flagged:
+            live_feed.publish_changed(session_id, AttendanceRecord.device_signature == signature)
+    except Exception:
+        # Watchers catch up on their next sync.
+        current_app.logger.exception("live feed publish failed")
+
+
+def record_attendance_batch(conn, rows):
+    """Insert a batch of verified records on ``conn`` and return one outcome per row.
+
+    Runs a fixed number of statements per batch (active sessions, enrollments,
+    existing records, one multi-row INSERT, one rollup UPDATE per class)
+    instead of one round trip per row.
+    An IntegrityError means another writer raced us on uq_session_student; the
+    caller owns the transaction and decides how to retry.
+    """
+    session_ids = {r["session_id"] for r in rows}
+    student_ids = {r["student_id"] for r in rows}
+    class_ids = {r["class_id"] for r in rows}
+
+    active = set(conn.execute(
+        select(AttendanceSession.id).where(
+            AttendanceSession.id.in_(session_ids),
+            AttendanceSession.is_active.is_(True)
+        )
+    ).scalars())
+    enrolled = set(conn.execute(
+        select(Enrollment.student_id, Enrollment.class_id).where(
+            Enrollment.class_id.in_(class_ids),
+            Enrollment.student_id.in_(student_ids)
+        )
+    ).tuples())
+    marked = set(conn.execute(
+        select(AttendanceRecord.session_id, AttendanceRecord.student_id).where(
+            tuple_(AttendanceRecord.session_id, AttendanceRecord.student_id).in_(
+                [(r["session_id"], r["student_id"]) for r in rows]
+            )
+        )
+    ).tuples())
+
+    outcomes = []
+    accepted = []
+    for row in rows:
+        key = (row["session_id"], row["student_id"])
+        if row["session_id"] not in active:
+            live_sessions.discard(row["session_id"])
+            outcomes.append(INACTIVE)
+        elif (row["student_id"], row["class_id"]) not in enrolled:
+            outcomes.append(NOT_ENROLLED)
+        elif key in marked:
+            outcomes.append(DUPLICATE)
+        else:
+            marked.add(key)
+            accepted.append(row)
+            outcomes.append(INSERTED)
+
+    if not accepted:
+        return outcomes
+
+    conn.execute(
+        insert(AttendanceRecord.__table__).values(
+            [{c: row[c] for c in RECORD_COLUMNS} for row in accepted]
+        )
+    )
+    record_attended(conn, accepted)
+    return outcomes
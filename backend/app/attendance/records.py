@@ -0,0 +1,29 @@
+from .devices import collision_flags
+
+
+def records_json(session_id, records, conn=None):
+    """One session's records as the records listing and the live feed show them.
+
+    ``records`` are AttendanceRecord objects or rows with the same columns.
+    The collision flags are read for all of them in one pass.
+    """
+    records = list(records)
+    flags = collision_flags(
+        session_id, ((r.student_id, r.device_signature, r.ip_prefix) for r in records), conn=conn
+    )
+    return [
+        {
+            "id": r.id,
+            "student_id": r.student_id,
+            "status": r.status,
+            "device_signature": r.device_signature,
+            "ip_prefix": r.ip_prefix,
+            "submitted_latitude": r.submitted_latitude,
+            "submitted_longitude": r.submitted_longitude,
+            "distance_meters": r.distance_meters,
+            "location_verified": r.location_verified,
+            "flags": flags[r.student_id],
+            "marked_at": r.marked_at.isoformat() if r.marked_at else None
+        }
+        for r in records
+    ]
@@ -0,0 +1,197 @@
+from collections import defaultdict
+
+from sqlalchemy import delete, func, insert, select, update
+
+from app.models.enrollment import Enrollment
+from app.models.attendance_session import AttendanceSession
+from app.models.attendance_record import AttendanceRecord
+from app.models.attendance_rollup import AttendanceRollup
+
+
+def percentage(sessions_attended, sessions_held):
+    if not sessions_held:
+        return None
+    return round(100.0 * sessions_attended / sessions_held, 1)
+
+
+def record_attended(conn, rows):
+    """Count freshly inserted attendance records, on the inserting transaction.
+
+    ``rows`` are record rows as built by ``recording.build_row``. Rollup rows
+    are created on enrollment, so this is normally one UPDATE per class; rows
+    missing for any other reason are created here.
+    """
+    rollups = AttendanceRollup.__table__
+    by_class = defaultdict(set)
+    for row in rows:
+        by_class[row["class_id"]].add(row["student_id"])
+
+    for class_id, student_ids in by_class.items():
+        result = conn.execute(
+            update(rollups)
+            .where(rollups.c.class_id == class_id, rollups.c.student_id.in_(student_ids))
+            .values(
+                sessions_attended=rollups.c.sessions_attended + 1,
+                last_attended_at=func.now()
+            )
+        )
+        if result.rowcount == len(student_ids):
+            continue
+
+        existing = set(conn.execute(
+            select(rollups.c.student_id)
+            .where(rollups.c.class_id == class_id, rollups.c.student_id.in_(student_ids))
+        ).scalars())
+        held = held_sessions(conn, class_id)
+        conn.execute(
+            insert(rollups).values(sessions_held=held, sessions_attended=1, last_attended_at=func.now()),
+            [{"student_id": s, "class_id": class_id} for s in student_ids - existing]
+        )
+
+
+def session_started(conn, class_id):
+    """Count a new session as held for every student enrolled in its class.
+
+    Runs in the transaction that creates the session. A session is held from
+    the moment it starts, the same point from which records for it can be
+    counted as attended, so the two counters never disagree.
+    """
+    rollups = AttendanceRollup.__table__
+    conn.execute(
+        update(rollups)
+        .where(rollups.c.class_id == class_id)
+        .values(sessions_held=rollups.c.sessions_held + 1)
+    )
+
+
+def close_session(conn, session_id):
+    """Mark a session inactive.
+
+    The UPDATE only matches while the session is still active, so concurrent
+    ends agree on a single closer. Returns whether this call closed it.
+    """
+    sessions = AttendanceSession.__table__
+    result = conn.execute(
+        update(sessions)
+        .where(sessions.c.id == session_id, sessions.c.is_active.is_(True))
+        .values(is_active=False)
+    )
+    return result.rowcount == 1
+
+
+def close_sessions(conn, session_ids, chunk=5000):
+    """Bulk ``close_session``: close the still-active sessions among ``session_ids``.
+
+    The active rows are locked (FOR UPDATE where supported) before one
+    guarded UPDATE per chunk, so a session closed concurrently by
+    /attendance/end is reported by only one of the two. Returns the
+    (session_id, class_id) pairs this call closed.
+    """
+    sessions = AttendanceSession.__table__
+    session_ids = list(session_ids)
+    closed = []
+    for start in range(0, len(session_ids), chunk):
+        rows = conn.execute(
+            select(sessions.c.id, sessions.c.class_id)
+            .where(sessions.c.id.in_(session_ids[start:start + chunk]), sessions.c.is_active.is_(True))
+            .with_for_update()
+        ).all()
+        if not rows:
+            continue
+        conn.execute(
+            update(sessions)
+            .where(sessions.c.id.in_([r.id for r in rows]), sessions.c.is_active.is_(True))
+            .values(is_active=False)
+        )
+        closed.extend((r.id, r.class_id) for r in rows)
+    return closed
+
+
+def held_sessions(conn, class_id):
+    return conn.execute(
+        select(func.count(AttendanceSession.id)).where(AttendanceSession.class_id == class_id)
+    ).scalar()
+
+
+def add_enrollment(conn, student_id, class_id):
+    """Create the rollup row for a new enrollment, if it does not exist yet."""
+    rollups = AttendanceRollup.__table__
+    exists = conn.execute(
+        select(rollups.c.student_id).where(rollups.c.student_id == student_id, rollups.c.class_id == class_id)
+    ).first()
+    if exists is None:
+        conn.execute(insert(rollups).values(
+            student_id=student_id,
+            class_id=class_id,
+            sessions_held=held_sessions(conn, class_id),
+            sessions_attended=0
+        ))
+
+
+def add_enrollments(conn, class_id, student_ids, chunk=5000):
+    """Bulk ``add_enrollment`` for many new students of one class."""
+    rollups = AttendanceRollup.__table__
+    existing = set(conn.execute(
+        select(rollups.c.student_id).where(rollups.c.class_id == class_id)
+    ).scalars())
+    missing = [sid for sid in dict.fromkeys(student_ids) if sid not in existing]
+    if not missing:
+        return
+
+    held = held_sessions(conn, class_id)
+    for start in range(0, len(missing), chunk):
+        conn.execute(insert(rollups), [
+            {"student_id": sid, "class_id": class_id, "sessions_held": held, "sessions_attended": 0}
+            for sid in missing[start:start + chunk]
+        ])
+
+
+def rebuild(conn, class_id=None):
+    """Recompute rollups from enrollments, sessions and records.
+
+    Replaces the rows of one class, or of every class. Returns the number of
+    rollup rows written.
+    """
+    rollups = AttendanceRollup.__table__
+    sessions = AttendanceSession.__table__
+    records = AttendanceRecord.__table__
+
+    pairs = select(Enrollment.student_id, Enrollment.class_id).distinct()
+    if class_id is not None:
+        pairs = pairs.where(Enrollment.class_id == class_id)
+    pairs = pairs.subquery()
+
+    held = (
+        select(func.count(sessions.c.id))
+        .where(sessions.c.class_id == pairs.c.class_id)
+        .scalar_subquery()
+    )
+
+    def per_student(column):
+        return (
+            select(column)
+            .join(sessions, sessions.c.id == records.c.session_id)
+            .where(sessions.c.class_id == pairs.c.class_id, records.c.student_id == pairs.c.student_id)
+            .scalar_subquery()
+        )
+
+    source = select(
+        pairs.c.student_id,
+        pairs.c.class_id,
+        held,
+        per_student(func.count(records.c.id)),
+        per_student(func.max(records.c.marked_at)),
+    )
+
+    stmt = delete(rollups)
+    if class_id is not None:
+        stmt = stmt.where(rollups.c.class_id == class_id)
+    conn.execute(stmt)
+
+    result = conn.execute(
+        insert(rollups).from_select(
+            ["student_id", "class_id", "sessions_held", "sessions_attended", "last_attended_at"],
+            source
+        )
+    )
+    return result.rowcount
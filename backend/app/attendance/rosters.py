@@ -0,0 +1,138 @@
+from array import array
+from bisect import bisect_left
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models.attendance_record import AttendanceRecord
+from app.models.enrollment import Enrollment
+
+
+class _IdSet:
+    __slots__ = ("ids", "loaded_at")
+
+    def __init__(self, ids):
+        # Sorted, de-duplicated, 4 bytes per id.
+        self.ids = array("i", sorted(set(ids)))
+        self.loaded_at = time.monotonic()
+
+    def __contains__(self, id_):
+        ids = self.ids
+        i = bisect_left(ids, id_)
+        return i < len(ids) and ids[i] == id_
+
+    def add(self, ids):
+        # Copy on write: readers keep iterating the array they already hold.
+        new = [i for i in set(ids) if i not in self]
+        if new:
+            self.ids = array("i", sorted(self.ids.tolist() + new))
+
+
+def difference(a, b):
+    """Ids in sorted ``a`` that are not in sorted ``b``, by one merge pass."""
+    out = array("i")
+    j, n = 0, len(b)
+    for x in a:
+        while j < n and b[j] < x:
+            j += 1
+        if j == n or b[j] != x:
+            out.append(x)
+    return out
+
+
+class RosterCache:
+    """Per-process sorted id arrays: students enrolled per class, and students
+    with a record per attendance session.
+
+    Both are loaded the first time they are asked about and kept as sorted
+    ``array('i')``, so a membership check is a binary search and "enrolled
+    minus marked" is one merge pass with no SQL. Enrollments and records
+    made in this process are added as they commit. A membership check that
+    misses is confirmed against the database (and the roster patched), since
+    the student may have enrolled through another process; nothing
+    un-enrolls, so a hit never needs confirming. ``members`` and ``marked``
+    reload arrays older than ``ROSTER_MAX_AGE_SECONDS``, which bounds what
+    they can miss from other processes.
+    """
+
+    def init_app(self, app):
+        app.extensions["rosters"] = {"classes": {}, "sessions": {}, "lock": threading.Lock()}
+
+    def _state(self):
+        return current_app.extensions["rosters"]
+
+    def is_enrolled(self, class_id, student_id):
+        if student_id in self._load("classes", class_id):
+            return True
+
+        with db.engine.connect() as conn:
+            found = conn.execute(
+                select(Enrollment.id).where(
+                    Enrollment.class_id == class_id,
+                    Enrollment.student_id == student_id
+                ).limit(1)
+            ).first()
+        if found is None:
+            return False
+        self.add(class_id, [student_id])
+        return True
+
+    def members(self, class_id):
+        """Sorted ``array('i')`` of the class's student ids; treat it as read-only."""
+        return self._fresh("classes", class_id).ids
+
+    def marked(self, session_id):
+        """Sorted ``array('i')`` of students with a record in the session."""
+        return self._fresh("sessions", session_id).ids
+
+    def add(self, class_id, student_ids):
+        """Record committed enrollments; a class not loaded yet is left alone."""
+        self._add("classes", class_id, student_ids)
+
+    def record_inserted(self, rows):
+        """Record freshly committed attendance rows (as built by ``build_row``)."""
+        by_session = {}
+        for row in rows:
+            by_session.setdefault(row["session_id"], []).append(row["student_id"])
+        for session_id, student_ids in by_session.items():
+            self._add("sessions", session_id, student_ids)
+
+    def discard_session(self, session_id):
+        state = self._state()
+        with state["lock"]:
+            state["sessions"].pop(session_id, None)
+
+    def _add(self, kind, key, ids):
+        state = self._state()
+        with state["lock"]:
+            entry = state[kind].get(key)
+            if entry is not None:
+                entry.add(ids)
+
+    def _fresh(self, kind, key):
+        entry = self._load(kind, key)
+        if time.monotonic() - entry.loaded_at > current_app.config["ROSTER_MAX_AGE_SECONDS"]:
+            entry = self._load(kind, key, reload=True)
+        return entry
+
+    def _load(self, kind, key, reload=False):
+        state = self._state()
+        entry = state[kind].get(key)
+        if entry is None or reload:
+            if kind == "classes":
+                query = select(Enrollment.student_id).where(Enrollment.class_id == key)
+            else:
+                query = select(AttendanceRecord.student_id).where(AttendanceRecord.session_id == key)
+            # A short connection of its own: process_submission also runs on
+            # the async worker threads.
+            with db.engine.connect() as conn:
+                entry = _IdSet(conn.execute(query).scalars())
+            with state["lock"]:
+                state[kind][key] = entry
+        return entry
+
+
+rosters = RosterCache()
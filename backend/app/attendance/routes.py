@@ -1,110 +1,180 @@
-from flask import request, jsonify, session
+from flask import Response, current_app, request, jsonify, stream_with_context, url_for
 from . import attendance_bp
 from app.models.user import User
 from app.models.class_model import Class  # if needed
-from app.models.enrollment import Enrollment
 from app.models.attendance_session import AttendanceSession
 from app.models.attendance_record import AttendanceRecord
 from app.extensions import db
-from math import radians, cos, sin, asin, sqrt
+from .live_sessions import live_sessions
+from .recording import NOT_ENROLLED, OUTCOME_RESPONSES, build_row, record_attendance
+from .group_commit import WriterBusy, group_commit
+from .async_submit import SubmissionQueueFull, async_submissions
+from .geofence import distance_meters, reverify
+from .spatial import geo_index
+from .devices import generate_device_hash
+from .rosters import difference, rosters
+from . import codes
+from .rollups import close_session, percentage, session_started
+from .export import EXPORT_FORMATS, export_query, stream_export
+from .live_feed import live_feed
+from .records import records_json
+from .lifecycle import evict_closed, session_scheduler
+from app.auth.principals import current_principal
+from app.pagination import InvalidPage, page_args, split_page
+from app.versions import conditional, versions
+from app.replicas import read_replica
+from sqlalchemy import or_
+from app.models.attendance_rollup import AttendanceRollup
 from datetime import datetime
-import hashlib
-
-def distance_meters(lat1, lon1, lat2, lon2):
-    R = 6371000  # Earth radius in meters
-    dlat = radians(lat2 - lat1)
-    dlon = radians(lon2 - lon1)
-    a = sin(dlat/2)**2 + cos(radians(lat1))*cos(radians(lat2))*sin(dlon/2)**2
-    c = 2 * asin(sqrt(a))
-    return R * c
-
-def generate_device_hash(user_agent, screen_size, timezone, language, ip_subnet):
-    hash_input = f"{user_agent}|{screen_size}|{timezone}|{language}|{ip_subnet}"
-    return hashlib.sha256(hash_input.encode()).hexdigest()
 
 @attendance_bp.route('/submit', methods=['POST'])
 def submit_attendance():
     # 1️⃣ Check if user is logged in
-    if 'user_id' not in session:
+    principal = current_principal()
+    if principal is None:
         return jsonify({"error": "Not logged in"}), 401
     
-    if session.get("role") != "student":
+    if principal.role != "student":
         return jsonify({"error": "Only students can submit attendance"}), 403
 
-    user_id = session['user_id']
-    data = request.get_json()
+    user_id = principal.id
+    data = request.get_json(silent=True)
+
+    # 2️⃣ Check payload shape (cheap, no database)
+    error = check_submission_shape(data)
+    if error:
+        return jsonify({"error": error}), 400
+
+    # Clients that send "Prefer: respond-async" get a ticket right away and
+    # the verification runs in the worker pool.
+    if async_submissions.requested():
+        try:
+            ticket = async_submissions.submit(process_submission, user_id, data)
+        except SubmissionQueueFull:
+            return jsonify({"error": "Server busy, please retry"}), 503
+
+        status_url = url_for("attendance.get_submission_status", ticket=ticket)
+        return jsonify({
+            "ticket": ticket,
+            "status": "pending",
+            "status_url": status_url
+        }), 202, {"Location": status_url}
+
+    body, status = process_submission(user_id, data)
+    return jsonify(body), status
+
+
+@attendance_bp.route('/submit/<ticket>', methods=['GET'])
+def get_submission_status(ticket):
+    principal = current_principal()
+    if principal is None:
+        return jsonify({"error": "Not logged in"}), 401
+
+    result = async_submissions.get(ticket, principal.id)
+    if result is None:
+        return jsonify({"error": "Ticket not found"}), 404
+
+    return jsonify(result), 200
+
+
+def check_submission_shape(data):
+    if not isinstance(data, dict):
+        return "Request body must be a JSON object"
+
+    if not data.get('attendance_session_id') or data.get('attendance_code') is None:
+        return "attendance_session_id and attendance_code are required"
+
+    for field in ('latitude', 'longitude'):
+        value = data.get(field)
+        if value is None:
+            continue
+        try:
+            float(value)
+        except (TypeError, ValueError):
+            return f"{field} must be a number"
+
+    if not isinstance(data.get('device_info', {}), dict):
+        return "device_info must be an object"
 
-    # 2️⃣ Extract request data
+    return None
+
+
+def process_submission(user_id, data):
+    """Verify a shape-checked submission and record it.
+
+    Returns ``(body, status)``. Uses no request state so the async worker pool
+    can run it too.
+    """
+    # 3️⃣ Extract request data
     session_id = data.get('attendance_session_id')
     submitted_lat = data.get('latitude')
     submitted_lon = data.get('longitude')
     attendance_code = data.get('attendance_code')
 
-    if not session_id or attendance_code is None:
-        return jsonify({"error": "attendance_session_id and attendance_code are required"}), 400
-
     # Device info from frontend
-    device_info = data.get('device_info', {})
+    device_info = data.get('device_info') or {}
     user_agent = device_info.get('user_agent')
     screen_size = device_info.get('screen_size')
     timezone = device_info.get('timezone')
     language = device_info.get('language')
     ip_subnet = device_info.get('ip_subnet')
 
-    # 3️⃣ Fetch attendance session
-    attendance_session = AttendanceSession.query.get(session_id)
-    if not attendance_session or not attendance_session.is_active:
-        return jsonify({"error": "Attendance session not found or inactive"}), 404
-    
-    # Time window check (optional but good)
-    #now = datetime.utcnow()
-    #if getattr(attendance_session, "starts_at", None) and now < attendance_session.starts_at:
-        #return jsonify({"error": "Attendance window not started"}), 400
-    #if getattr(attendance_session, "ends_at", None) and now > attendance_session.ends_at:
-        #return jsonify({"error": "Attendance window ended"}), 400
-    
+    try:
+        session_id = int(session_id)
+    except (TypeError, ValueError):
+        return {"error": "Attendance session not found or inactive"}, 404
+
+    # 4️⃣ Fetch attendance session (served from the live-session cache)
+    attendance_session = live_sessions.get(session_id)
+    if not attendance_session:
+        return {"error": "Attendance session not found or inactive"}, 404
 
     now = datetime.now()  # ✅ local time (matches your Postman inputs)
 
-    if getattr(attendance_session, "starts_at", None) and now < attendance_session.starts_at:
-        return jsonify({
+    if attendance_session.starts_at and now < attendance_session.starts_at:
+        return {
             "error": "Attendance window not started",
             "now": now.isoformat(),
-            "starts_at": attendance_session.starts_at.isoformat() if attendance_session.starts_at else None
-        }), 400
+            "starts_at": attendance_session.starts_at.isoformat()
+        }, 400
 
-    if getattr(attendance_session, "ends_at", None) and now > attendance_session.ends_at:
-        return jsonify({
+    if attendance_session.ends_at and now > attendance_session.ends_at:
+        return {
             "error": "Attendance window ended",
             "now": now.isoformat(),
-            "ends_at": attendance_session.ends_at.isoformat() if attendance_session.ends_at else None
-        }), 400
-
-    # 4️⃣ Check if student is enrolled in the class
-    enrollment = Enrollment.query.filter_by(
-        student_id=user_id,
-        class_id=attendance_session.class_id
-    ).first()
-    if not enrollment:
-        return jsonify({"error": "Student not enrolled in this class"}), 403
+            "ends_at": attendance_session.ends_at.isoformat()
+        }, 400
+
+    # 5️⃣ Verify attendance code (rotating codes are derived, not looked up)
+    if attendance_session.code_secret:
+        valid = codes.verify(
+            attendance_session.code_secret,
+            attendance_code,
+            current_app.config["ATTENDANCE_CODE_STEP_SECONDS"],
+            current_app.config["ATTENDANCE_CODE_DRIFT_STEPS"]
+        )
+    else:
+        valid = attendance_session.attendance_code == attendance_code
+    if not valid:
+        return {"error": "Invalid attendance code"}, 400
 
-    # 5️⃣ Verify attendance code
-    if attendance_session.attendance_code != attendance_code:
-        return jsonify({"error": "Invalid attendance code"}), 400
+    # Early out for students outside the class (the INSERT re-checks)
+    if not rosters.is_enrolled(attendance_session.class_id, user_id):
+        return OUTCOME_RESPONSES[NOT_ENROLLED]
 
     # 6️⃣ Verify location (if coordinates provided)
+    distance = None
     if submitted_lat is not None and submitted_lon is not None:
-        class_obj = Class.query.get(attendance_session.class_id)
-        if not class_obj:
-            return jsonify({"error": "Class not found"}), 404
+        submitted_lat = float(submitted_lat)
+        submitted_lon = float(submitted_lon)
         distance = distance_meters(
-            float(submitted_lat),
-            float(submitted_lon),
-            float(class_obj.latitude),
-            float(class_obj.longitude)
+            submitted_lat,
+            submitted_lon,
+            float(attendance_session.latitude),
+            float(attendance_session.longitude)
         )
-        if distance > float(class_obj.radius_meters):
-            return jsonify({"error": "You are outside the allowed radius"}), 400
+        if distance > float(attendance_session.radius_meters):
+            return {"error": "You are outside the allowed radius"}, 400
 
     # 7️⃣ Generate device hash
     device_hash = generate_device_hash(
@@ -115,40 +185,33 @@ def submit_attendance():
         ip_subnet or ""
     )
 
-    # 8️⃣ Check if student already submitted attendance for this session
-    existing_record = AttendanceRecord.query.filter_by(
-        student_id=user_id,
-        session_id=session_id
-    ).first()
-    if existing_record:
-        return jsonify({"error": "Attendance already submitted"}), 400
-
-    # 9️⃣ Create attendance record
-    attendance_record = AttendanceRecord(
-        #session_id=session_id,
-        #student_id=user_id,
-        #device_hash=device_hash,
-        #submitted_latitude=submitted_lat,
-        #submitted_longitude=submitted_lon
-        student_id=user_id,
-        session_id=session_id,
-        device_signature=device_hash,   # ✅ use this name
-        ip_prefix=ip_subnet   
+    # 8️⃣ Create attendance record
+    row = build_row(
+        user_id, attendance_session, device_hash, ip_subnet,
+        latitude=submitted_lat if distance is not None else None,
+        longitude=submitted_lon if distance is not None else None,
+        distance=distance
     )
-    db.session.add(attendance_record)
-    db.session.commit()
+    if group_commit.enabled():
+        try:
+            outcome = group_commit.write(row)
+        except WriterBusy:
+            return {"error": "Server busy, please retry"}, 503
+    else:
+        outcome = record_attendance(row)
 
-    return jsonify({"message": "Attendance recorded successfully"}), 201
+    return OUTCOME_RESPONSES[outcome]
 
 
 @attendance_bp.route('/start', methods=['POST'])
 def start_attendance():
     # 1️⃣ Verify user is logged in
-    if 'user_id' not in session:
+    principal = current_principal()
+    if principal is None:
         return jsonify({"error": "Not logged in"}), 401
 
-    user_id = session['user_id']
-    user_role = session.get('role')
+    user_id = principal.id
+    user_role = principal.role
 
     # 2️⃣ Verify user is a teacher
     if user_role != 'teacher':
@@ -158,6 +221,7 @@ def start_attendance():
     data = request.get_json()
     class_id = data.get('class_id')
     attendance_code = data.get('attendance_code')
+    rotating_code = bool(data.get('rotating_code'))
     starts_at = data.get('starts_at')
     ends_at = data.get('ends_at')
     # latitude = data.get('latitude')
@@ -169,6 +233,9 @@ def start_attendance():
     if not class_obj:
         return jsonify({"error": "Class not found"}), 404
     
+    if not rotating_code and not attendance_code:
+        return jsonify({"error": "attendance_code is required unless rotating_code is set"}), 400
+
     starts_at_dt = parse_iso(starts_at)
     ends_at_dt = parse_iso(ends_at)
     
@@ -178,7 +245,8 @@ def start_attendance():
         created_by=user_id,
         starts_at=starts_at_dt,
         ends_at=ends_at_dt,
-        attendance_code=attendance_code,
+        attendance_code=None if rotating_code else attendance_code,
+        code_secret=codes.new_secret() if rotating_code else None,
         #latitude=latitude,
         #longitude=longitude,
         #radius_meters=radius_meters,
@@ -186,11 +254,18 @@ def start_attendance():
     )
 
     db.session.add(attendance_session)
+    session_started(db.session, class_obj.id)
     db.session.commit()
 
+    live_sessions.put(live_sessions.from_models(attendance_session, class_obj))
+    geo_index.session_started(attendance_session)
+    session_scheduler.schedule(attendance_session)
+    versions.bump("class_sessions", attendance_session.class_id)
+
     return jsonify({
         "message": "Attendance session started",
-        "attendance_session_id": attendance_session.id
+        "attendance_session_id": attendance_session.id,
+        "rotating_code": rotating_code
     }), 201
 
 def parse_iso(dt_str):
@@ -198,13 +273,23 @@ def parse_iso(dt_str):
     return datetime.fromisoformat(dt_str)
 
 
+def active_session_scope():
+    class_id = request.args.get("class_id", type=int)
+    if current_principal() is None or not class_id:
+        return None
+    return [("class_sessions", class_id)]
+
+
 @attendance_bp.route("/active", methods=["GET"])
+@conditional(active_session_scope)
+@read_replica
 def get_active_session():
-    if "user_id" not in session:
+    principal = current_principal()
+    if principal is None:
         return jsonify({"error": "Not logged in"}), 401
 
-    user_id = session["user_id"]
-    role = session.get("role")
+    user_id = principal.id
+    role = principal.role
 
     class_id = request.args.get("class_id", type=int)
     if not class_id:
@@ -212,8 +297,7 @@ def get_active_session():
 
     # If student: must be enrolled
     if role == "student":
-        enrollment = Enrollment.query.filter_by(student_id=user_id, class_id=class_id).first()
-        if not enrollment:
+        if not rosters.is_enrolled(class_id, user_id):
             return jsonify({"error": "Student not enrolled in this class"}), 403
 
     # If teacher: must own the class
@@ -246,15 +330,54 @@ def get_active_session():
     }), 200
 
 
+@attendance_bp.route("/nearby", methods=["GET"])
+def get_nearby_sessions():
+    principal = current_principal()
+    if principal is None:
+        return jsonify({"error": "Not logged in"}), 401
+
+    user_id = principal.id
+    role = principal.role
+
+    latitude = request.args.get("latitude", type=float)
+    longitude = request.args.get("longitude", type=float)
+    if latitude is None or longitude is None:
+        return jsonify({"error": "latitude and longitude are required"}), 400
+
+    hits = geo_index.locate(latitude, longitude)
+
+    # Narrow to the caller's own classes. Usually there are no hits at all, so
+    # the roster check only runs for the few classes that matched.
+    if role == "teacher":
+        hits = [h for h in hits if h[0].teacher_id == user_id]
+    else:
+        hits = [h for h in hits if rosters.is_enrolled(h[0].id, user_id)]
+
+    return jsonify({
+        "sessions": [
+            {
+                "attendance_session_id": entry.session_id,
+                "class_id": place.id,
+                "class_name": place.name,
+                "starts_at": entry.starts_at.isoformat() if entry.starts_at else None,
+                "ends_at": entry.ends_at.isoformat() if entry.ends_at else None,
+                "distance_meters": round(distance, 1)
+            }
+            for place, entry, distance in sorted(hits, key=lambda h: h[2])
+        ]
+    }), 200
+
+
 @attendance_bp.route("/end", methods=["POST"])
 def end_attendance():
-    if "user_id" not in session:
+    principal = current_principal()
+    if principal is None:
         return jsonify({"error": "Not logged in"}), 401
 
-    if session.get("role") != "teacher":
+    if principal.role != "teacher":
         return jsonify({"error": "Only teachers can end attendance"}), 403
 
-    user_id = session["user_id"]
+    user_id = principal.id
     data = request.get_json() or {}
 
     attendance_session_id = data.get("attendance_session_id")
@@ -269,21 +392,25 @@ def end_attendance():
     if s.created_by != user_id:
         return jsonify({"error": "Not allowed"}), 403
 
-    s.is_active = False
+    # Guarded close: a session ended twice is only closed once.
+    close_session(db.session, s.id)
     db.session.commit()
+    evict_closed(s.id, s.class_id)
 
     return jsonify({"message": "Attendance session ended"}), 200
 
 
 @attendance_bp.route("/session/<int:attendance_session_id>/records", methods=["GET"])
+@read_replica
 def get_attendance_records(attendance_session_id):
-    if "user_id" not in session:
+    principal = current_principal()
+    if principal is None:
         return jsonify({"error": "Not logged in"}), 401
 
-    if session.get("role") != "teacher":
+    if principal.role != "teacher":
         return jsonify({"error": "Only teachers can view attendance records"}), 403
 
-    user_id = session["user_id"]
+    user_id = principal.id
 
     s = AttendanceSession.query.get(attendance_session_id)
     if not s:
@@ -292,20 +419,263 @@ def get_attendance_records(attendance_session_id):
     if s.created_by != user_id:
         return jsonify({"error": "Not allowed"}), 403
 
-    records = AttendanceRecord.query.filter_by(session_id=attendance_session_id).order_by(AttendanceRecord.marked_at.asc()).all()
+    try:
+        limit, after = page_args((int,))
+    except InvalidPage as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Keyset page in (marked_at, id) order, served by
+    # ix_attendance_records_session_marked. The cursor is the last record's
+    # id; its marked_at is read back so the comparison uses the stored value
+    # exactly (SQLite keeps CURRENT_TIMESTAMP at whole seconds).
+    query = AttendanceRecord.query.filter_by(session_id=attendance_session_id)
+    if after:
+        after_id = after[0]
+        after_marked_at = (
+            db.session.query(AttendanceRecord.marked_at)
+            .filter(AttendanceRecord.id == after_id)
+            .scalar_subquery()
+        )
+        # The >= bound on its own lets the index seek straight to the cursor
+        query = query.filter(
+            AttendanceRecord.marked_at >= after_marked_at,
+            or_(AttendanceRecord.marked_at > after_marked_at, AttendanceRecord.id > after_id)
+        )
+    rows = query.order_by(AttendanceRecord.marked_at.asc(), AttendanceRecord.id.asc()).limit(limit + 1).all()
+    records, next_cursor = split_page(rows, limit, lambda r: (r.id,))
 
     return jsonify({
         "attendance_session_id": attendance_session_id,
         "count": len(records),
-        "records": [
+        "records": records_json(attendance_session_id, records),
+        "next_cursor": next_cursor
+    }), 200
+
+
+@attendance_bp.route("/session/<int:attendance_session_id>/code", methods=["GET"])
+def get_current_code(attendance_session_id):
+    principal = current_principal()
+    if principal is None:
+        return jsonify({"error": "Not logged in"}), 401
+
+    if principal.role != "teacher":
+        return jsonify({"error": "Only teachers can view attendance codes"}), 403
+
+    # Served from the live-session cache; rotating codes are computed
+    live = live_sessions.get(attendance_session_id)
+    if not live:
+        return jsonify({"error": "Attendance session not found or inactive"}), 404
+
+    if live.created_by != principal.id:
+        return jsonify({"error": "Not allowed"}), 403
+
+    if not live.code_secret:
+        return jsonify({
+            "attendance_session_id": attendance_session_id,
+            "rotating": False,
+            "code": live.attendance_code
+        }), 200
+
+    step = current_app.config["ATTENDANCE_CODE_STEP_SECONDS"]
+    code, expires_in = codes.current_code(live.code_secret, step)
+    return jsonify({
+        "attendance_session_id": attendance_session_id,
+        "rotating": True,
+        "code": code,
+        "step_seconds": step,
+        "expires_in": expires_in
+    }), 200, {"Cache-Control": "no-store"}
+
+
+@attendance_bp.route("/session/<int:attendance_session_id>/absentees", methods=["GET"])
+@read_replica
+def get_absentees(attendance_session_id):
+    principal = current_principal()
+    if principal is None:
+        return jsonify({"error": "Not logged in"}), 401
+
+    if principal.role != "teacher":
+        return jsonify({"error": "Only teachers can view absentees"}), 403
+
+    s = AttendanceSession.query.get(attendance_session_id)
+    if not s:
+        return jsonify({"error": "Attendance session not found"}), 404
+
+    if s.created_by != principal.id:
+        return jsonify({"error": "Not allowed"}), 403
+
+    # Enrolled minus marked, merged from the two cached sorted id arrays.
+    # Flagged records count as marked; only students with no record are absent.
+    enrolled = rosters.members(s.class_id)
+    marked = rosters.marked(attendance_session_id)
+    absent = difference(enrolled, marked)
+
+    return jsonify({
+        "attendance_session_id": attendance_session_id,
+        "class_id": s.class_id,
+        "enrolled": len(enrolled),
+        "marked": len(marked),
+        "absentees": absent.tolist()
+    }), 200
+
+
+@attendance_bp.route("/session/<int:attendance_session_id>/stream", methods=["GET"])
+def stream_attendance_records(attendance_session_id):
+    principal = current_principal()
+    if principal is None:
+        return jsonify({"error": "Not logged in"}), 401
+
+    if principal.role != "teacher":
+        return jsonify({"error": "Only teachers can view attendance records"}), 403
+
+    user_id = principal.id
+
+    s = AttendanceSession.query.get(attendance_session_id)
+    if not s:
+        return jsonify({"error": "Attendance session not found"}), 404
+
+    if s.created_by != user_id:
+        return jsonify({"error": "Not allowed"}), 403
+
+    # EventSource sends Last-Event-ID on reconnect; the query parameter is for
+    # a client resuming from a records listing it already has.
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    if last_event_id is not None:
+        try:
+            last_event_id = int(last_event_id)
+        except ValueError:
+            return jsonify({"error": "Last-Event-ID must be a record id"}), 400
+
+    # Don't hold a pooled connection (and its transaction) for the life of
+    # the stream.
+    db.session.close()
+
+    return Response(
+        stream_with_context(live_feed.stream(attendance_session_id, last_event_id)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@attendance_bp.route("/export", methods=["GET"])
+@read_replica
+def export_attendance():
+    principal = current_principal()
+    if principal is None:
+        return jsonify({"error": "Not logged in"}), 401
+
+    if principal.role != "teacher":
+        return jsonify({"error": "Only teachers can export attendance"}), 403
+
+    user_id = principal.id
+
+    fmt = request.args.get("format", "csv")
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": "format must be csv or ndjson"}), 400
+
+    try:
+        since = parse_iso(request.args["since"]) if "since" in request.args else None
+        until = parse_iso(request.args["until"]) if "until" in request.args else None
+    except ValueError:
+        return jsonify({"error": "since and until must be ISO 8601 datetimes"}), 400
+
+    # A scope that doesn't parse must not silently widen the export to
+    # everything the teacher owns.
+    try:
+        session_id = int(request.args["session_id"]) if "session_id" in request.args else None
+        class_id = int(request.args["class_id"]) if "class_id" in request.args else None
+    except ValueError:
+        return jsonify({"error": "session_id and class_id must be integers"}), 400
+
+    if session_id is not None:
+        s = AttendanceSession.query.get(session_id)
+        if not s:
+            return jsonify({"error": "Attendance session not found"}), 404
+        if s.created_by != user_id:
+            return jsonify({"error": "Not allowed"}), 403
+
+    if class_id is not None:
+        class_obj = Class.query.get(class_id)
+        if not class_obj:
+            return jsonify({"error": "Class not found"}), 404
+        if class_obj.teacher_id != user_id:
+            return jsonify({"error": "Not allowed"}), 403
+
+    # Only the teacher's own classes are ever exported, whatever the scope
+    stmt = export_query(
+        user_id,
+        session_id=session_id,
+        class_id=class_id,
+        since=since,
+        until=until
+    )
+
+    return Response(
+        stream_with_context(stream_export(stmt, fmt)),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f"attachment; filename=attendance.{fmt}"}
+    )
+
+
+@attendance_bp.route("/session/<int:attendance_session_id>/reverify", methods=["POST"])
+def reverify_session_locations(attendance_session_id):
+    principal = current_principal()
+    if principal is None:
+        return jsonify({"error": "Not logged in"}), 401
+
+    if principal.role != "teacher":
+        return jsonify({"error": "Only teachers can re-verify attendance"}), 403
+
+    user_id = principal.id
+
+    s = AttendanceSession.query.get(attendance_session_id)
+    if not s:
+        return jsonify({"error": "Attendance session not found"}), 404
+
+    if s.created_by != user_id:
+        return jsonify({"error": "Not allowed"}), 403
+
+    data = request.get_json(silent=True) or {}
+    store = bool(data.get("store", False))
+
+    summary = reverify(db.session.connection(), session_id=attendance_session_id, store=store)
+    db.session.commit()
+    if store and summary["updated"]:
+        try:
+            live_feed.publish_changed(attendance_session_id)
+        except Exception:
+            # Committed either way; watchers see the new values on reload.
+            current_app.logger.exception("live feed publish failed")
+
+    return jsonify({
+        "attendance_session_id": attendance_session_id,
+        "stored": store,
+        **summary
+    }), 200
+
+
+@attendance_bp.route("/summary", methods=["GET"])
+@read_replica
+def get_my_attendance_summary():
+    principal = current_principal()
+    if principal is None:
+        return jsonify({"error": "Not logged in"}), 401
+
+    if principal.role != "student":
+        return jsonify({"error": "Only students can view their attendance summary"}), 403
+
+    # Reads only the rollup rows, one per enrolled class
+    rollups = AttendanceRollup.query.filter_by(student_id=principal.id).all()
+
+    return jsonify({
+        "classes": [
             {
-                "id": r.id,
-                "student_id": r.student_id,
-                "status": r.status,
-                "device_signature": r.device_signature,
-                "ip_prefix": r.ip_prefix,
-                "marked_at": r.marked_at.isoformat() if r.marked_at else None
+                "class_id": r.class_id,
+                "sessions_held": r.sessions_held,
+                "sessions_attended": r.sessions_attended,
+                "percentage": percentage(r.sessions_attended, r.sessions_held),
+                "last_attended_at": r.last_attended_at.isoformat() if r.last_attended_at else None
             }
-            for r in records
+            for r in rollups
         ]
     }), 200
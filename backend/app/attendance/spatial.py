@@ -0,0 +1,194 @@
+from collections import namedtuple
+from datetime import datetime
+from math import cos, floor, radians
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models.attendance_session import AttendanceSession
+from app.models.class_model import Class
+from .geofence import distance_meters
+
+
+METERS_PER_DEGREE = 111320.0
+
+Place = namedtuple("Place", [
+    "id", "name", "teacher_id", "latitude", "longitude", "radius_meters",
+    "min_lat", "max_lat", "min_lon", "max_lon",
+])
+
+LiveEntry = namedtuple("LiveEntry", ["session_id", "starts_at", "ends_at"])
+
+
+def make_place(class_id, name, teacher_id, latitude, longitude, radius_meters):
+    latitude, longitude, radius_meters = float(latitude), float(longitude), float(radius_meters)
+    dlat = radius_meters / METERS_PER_DEGREE
+    # Clamp so the box stays finite close to the poles.
+    dlon = radius_meters / (METERS_PER_DEGREE * max(cos(radians(latitude)), 0.01))
+    return Place(
+        class_id, name, teacher_id, latitude, longitude, radius_meters,
+        latitude - dlat, latitude + dlat, longitude - dlon, longitude + dlon,
+    )
+
+
+class _Snapshot:
+    """Grid of class geofences plus the live sessions of each class.
+
+    Readers never lock: every update replaces the affected cell set or live
+    tuple instead of mutating it in place.
+    """
+
+    def __init__(self, cell_degrees):
+        self.cell_degrees = cell_degrees
+        self.places = {}
+        self.cells = {}
+        self.live = {}
+        self.session_class = {}
+        self.built_at = time.monotonic()
+
+    def cell(self, latitude, longitude):
+        return floor(latitude / self.cell_degrees), floor(longitude / self.cell_degrees)
+
+    def add_place(self, place):
+        old = self.places.get(place.id)
+        if old is not None:
+            self._remove_from_cells(old)
+        self.places[place.id] = place
+
+        row_lo, col_lo = self.cell(place.min_lat, place.min_lon)
+        row_hi, col_hi = self.cell(place.max_lat, place.max_lon)
+        for row in range(row_lo, row_hi + 1):
+            for col in range(col_lo, col_hi + 1):
+                self.cells[(row, col)] = self.cells.get((row, col), frozenset()) | {place.id}
+
+    def _remove_from_cells(self, place):
+        row_lo, col_lo = self.cell(place.min_lat, place.min_lon)
+        row_hi, col_hi = self.cell(place.max_lat, place.max_lon)
+        for row in range(row_lo, row_hi + 1):
+            for col in range(col_lo, col_hi + 1):
+                remaining = self.cells.get((row, col), frozenset()) - {place.id}
+                if remaining:
+                    self.cells[(row, col)] = remaining
+                else:
+                    self.cells.pop((row, col), None)
+
+    def add_live(self, class_id, entry):
+        current = tuple(e for e in self.live.get(class_id, ()) if e.session_id != entry.session_id)
+        self.live[class_id] = current + (entry,)
+        self.session_class[entry.session_id] = class_id
+
+    def remove_live(self, session_id):
+        class_id = self.session_class.pop(session_id, None)
+        if class_id is None:
+            return
+        remaining = tuple(e for e in self.live.get(class_id, ()) if e.session_id != session_id)
+        if remaining:
+            self.live[class_id] = remaining
+        else:
+            self.live.pop(class_id, None)
+
+    def locate(self, latitude, longitude, now):
+        hits = []
+        for class_id in self.cells.get(self.cell(latitude, longitude), ()):
+            entries = self.live.get(class_id)
+            if not entries:
+                continue
+            place = self.places[class_id]
+            # Cheap bounding-box reject before the haversine.
+            if not (place.min_lat <= latitude <= place.max_lat and place.min_lon <= longitude <= place.max_lon):
+                continue
+            distance = distance_meters(latitude, longitude, place.latitude, place.longitude)
+            if distance > place.radius_meters:
+                continue
+            for entry in entries:
+                if entry.ends_at is None or now <= entry.ends_at:
+                    hits.append((place, entry, distance))
+        return hits
+
+
+class GeoIndex:
+    """In-memory grid index answering "which live sessions cover this point".
+
+    Class geofences are bucketed into ``GEO_INDEX_CELL_DEGREES`` cells, so a
+    lookup only looks at the classes overlapping the caller's cell. The index
+    is updated in place when classes are created and sessions start or end in
+    this process, and rebuilt from the database every
+    ``GEO_INDEX_REFRESH_SECONDS`` to pick up changes made by other processes.
+    """
+
+    def init_app(self, app):
+        app.extensions["geo_index"] = {"snapshot": None, "lock": threading.Lock()}
+
+    def _state(self):
+        return current_app.extensions["geo_index"]
+
+    def locate(self, latitude, longitude, now=None):
+        return self._snapshot().locate(float(latitude), float(longitude), now or datetime.now())
+
+    def add_class(self, class_obj):
+        if not class_obj.is_active:
+            return
+        self._update(lambda snap: snap.add_place(make_place(
+            class_obj.id, class_obj.name, class_obj.teacher_id,
+            class_obj.latitude, class_obj.longitude, class_obj.radius_meters,
+        )))
+
+    def session_started(self, attendance_session):
+        entry = LiveEntry(attendance_session.id, attendance_session.starts_at, attendance_session.ends_at)
+        self._update(lambda snap: snap.add_live(attendance_session.class_id, entry))
+
+    def session_ended(self, session_id):
+        self._update(lambda snap: snap.remove_live(session_id))
+
+    def _update(self, change):
+        # Nothing to do before the first build; it will read the change from
+        # the database.
+        state = self._state()
+        with state["lock"]:
+            if state["snapshot"] is not None:
+                change(state["snapshot"])
+
+    def _snapshot(self):
+        state = self._state()
+        snapshot = state["snapshot"]
+        max_age = current_app.config["GEO_INDEX_REFRESH_SECONDS"]
+        if snapshot is not None and time.monotonic() - snapshot.built_at < max_age:
+            return snapshot
+
+        # While one request rebuilds, the others keep answering from the old
+        # snapshot instead of queueing behind the lock.
+        if not state["lock"].acquire(blocking=snapshot is None):
+            return snapshot
+        try:
+            snapshot = state["snapshot"]
+            if snapshot is None or time.monotonic() - snapshot.built_at >= max_age:
+                snapshot = self._build()
+                state["snapshot"] = snapshot
+            return snapshot
+        finally:
+            state["lock"].release()
+
+    def _build(self):
+        snapshot = _Snapshot(current_app.config["GEO_INDEX_CELL_DEGREES"])
+
+        classes = db.session.execute(
+            select(Class.id, Class.name, Class.teacher_id, Class.latitude, Class.longitude, Class.radius_meters)
+            .where(Class.is_active.is_(True))
+        )
+        for row in classes:
+            snapshot.add_place(make_place(*row))
+
+        sessions = db.session.execute(
+            select(AttendanceSession.id, AttendanceSession.class_id, AttendanceSession.starts_at, AttendanceSession.ends_at)
+            .where(AttendanceSession.is_active.is_(True))
+        )
+        for session_id, class_id, starts_at, ends_at in sessions:
+            snapshot.add_live(class_id, LiveEntry(session_id, starts_at, ends_at))
+
+        return snapshot
+
+
+geo_index = GeoIndex()
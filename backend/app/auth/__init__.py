@@ -2,4 +2,4 @@ from flask import Blueprint
 
 auth_bp = Blueprint('auth', __name__)
 
-from . import routes
+from . import routes, commands
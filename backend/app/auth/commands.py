@@ -0,0 +1,30 @@
+import os
+
+import click
+from flask import current_app
+
+from . import auth_bp
+from .provisioning import provision, read_users
+
+
+@auth_bp.cli.command("provision")
+@click.argument("csv_file", type=click.File("r", encoding="utf-8-sig"))
+@click.option("--workers", type=int, default=os.cpu_count(), show_default=True,
+              help="Hashing processes.")
+def provision_command(csv_file, workers):
+    """Create accounts from a CSV with columns name,email,password[,role]."""
+    try:
+        rows = read_users(csv_file)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+
+    created, errors = provision(
+        rows,
+        current_app.config["PASSWORD_HASH_METHOD"],
+        workers,
+        progress=lambda n: click.echo(f"created={n}", err=True)
+    )
+
+    click.echo(f"rows={len(rows)} created={created} failed={len(errors)}")
+    for line, email, message in errors:
+        click.echo(f"line={line} email={email} error={message}")
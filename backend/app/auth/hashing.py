@@ -0,0 +1,121 @@
+from concurrent.futures import TimeoutError
+from itertools import repeat
+import os
+import threading
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HasherBusy(Exception):
+    """Raised when the hashing pool is saturated or a hash did not finish in time."""
+
+
+def _spawn_pool(workers):
+    # Imported here: multiprocessing is only needed once hashing leaves the
+    # request thread, and importing it slows every worker's start-up.
+    from concurrent.futures import ProcessPoolExecutor
+    import multiprocessing
+
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+class _ProcessPool:
+    def __init__(self, app):
+        self.workers = app.config["PASSWORD_HASH_WORKERS"]
+        self.timeout = app.config["PASSWORD_HASH_TIMEOUT"]
+        self.slots = threading.BoundedSemaphore(app.config["PASSWORD_HASH_MAX_PENDING"])
+        self.lock = threading.Lock()
+        self.executor = None
+        self.pid = None
+
+    def run(self, fn, *args):
+        # Admission control: refuse instead of queueing without bound.
+        if not self.slots.acquire(blocking=False):
+            raise HasherBusy("password hashing queue is full")
+        try:
+            future = self._executor().submit(fn, *args)
+        except Exception:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+
+        try:
+            return future.result(self.timeout)
+        except TimeoutError:
+            future.cancel()
+            raise HasherBusy("password hashing timed out")
+
+    def _executor(self):
+        # Created lazily (and again after a fork) so each web worker process
+        # owns its hashing processes. Spawned rather than forked: forking a
+        # threaded server can copy held locks into the children.
+        if self.executor is None or self.pid != os.getpid():
+            with self.lock:
+                if self.executor is None or self.pid != os.getpid():
+                    self.executor = _spawn_pool(self.workers)
+                    self.pid = os.getpid()
+        return self.executor
+
+
+class PasswordHasher:
+    """Hashes and verifies passwords with ``PASSWORD_HASH_METHOD``.
+
+    With ``PASSWORD_HASH_WORKERS`` > 0 the KDF runs in a bounded process
+    pool, so a burst of logins cannot pin every request thread; callers get
+    HasherBusy (answered with 503) when ``PASSWORD_HASH_MAX_PENDING`` hashes
+    are already waiting or one takes longer than ``PASSWORD_HASH_TIMEOUT``.
+    Otherwise hashing runs inline as before.
+    """
+
+    def init_app(self, app):
+        app.extensions["password_hasher"] = {
+            "pool": _ProcessPool(app) if app.config.get("PASSWORD_HASH_WORKERS") else None,
+            "method": app.config["PASSWORD_HASH_METHOD"],
+            "prefix": None,
+        }
+
+    def _state(self):
+        return current_app.extensions["password_hasher"]
+
+    def _run(self, fn, *args):
+        pool = self._state()["pool"]
+        if pool is None:
+            return fn(*args)
+        return pool.run(fn, *args)
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self._state()["method"])
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True when ``password_hash`` was made with other KDF parameters."""
+        return password_hash.split("$", 1)[0] != self._method_prefix()
+
+    def _method_prefix(self):
+        # Werkzeug fills in default parameters ("scrypt" -> "scrypt:32768:8:1"),
+        # so read the full form off a real hash once.
+        state = self._state()
+        if state["prefix"] is None:
+            state["prefix"] = generate_password_hash("", state["method"]).split("$", 1)[0]
+        return state["prefix"]
+
+
+password_hasher = PasswordHasher()
+
+
+def hash_passwords(passwords, method, workers):
+    """Yield the hash of each password, in order, using ``workers`` processes.
+
+    For bulk jobs outside a request; unlike ``password_hasher`` there is no
+    admission limit or timeout.
+    """
+    if workers <= 1:
+        for password in passwords:
+            yield generate_password_hash(password, method)
+        return
+
+    with _spawn_pool(workers) as pool:
+        yield from pool.map(generate_password_hash, passwords, repeat(method), chunksize=8)
@@ -0,0 +1,123 @@
+from collections import OrderedDict, namedtuple
+import threading
+import time
+
+from flask import current_app, g, has_app_context, session
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, object_session
+
+from app.extensions import db
+from app.models.user import User
+from app.versions import versions
+
+
+Principal = namedtuple("Principal", ["id", "name", "email", "role", "is_active"])
+
+
+class PrincipalCache:
+    """Per-process LRU of the users behind logged-in sessions.
+
+    Entries live for ``PRINCIPAL_CACHE_TTL_SECONDS`` and the least recently
+    used are evicted past ``PRINCIPAL_CACHE_SIZE``. ORM updates and deletes
+    of a user drop its entry at flush and again after commit. Changes made
+    by other processes, or by bulk/Core UPDATEs, are picked up when the
+    entry expires, so the TTL bounds how long a deactivated account keeps
+    working.
+    """
+
+    def init_app(self, app):
+        app.extensions["principals"] = {
+            "entries": OrderedDict(),
+            "lock": threading.Lock(),
+            "size": app.config["PRINCIPAL_CACHE_SIZE"],
+            "ttl": app.config["PRINCIPAL_CACHE_TTL_SECONDS"],
+        }
+
+    def _state(self):
+        return current_app.extensions["principals"]
+
+    def get(self, user_id):
+        """The Principal for ``user_id``, or None when there is no such user."""
+        state = self._state()
+        now = time.monotonic()
+        with state["lock"]:
+            entry = state["entries"].get(user_id)
+            if entry is not None and entry[1] > now:
+                state["entries"].move_to_end(user_id)
+                return entry[0]
+
+        # Always the primary, even in @read_replica views: a lagging replica
+        # must not make a new or just-reactivated user look gone and log them out.
+        row = db.session.execute(
+            select(User.id, User.name, User.email, User.role, User.is_active).where(User.id == user_id),
+            bind_arguments={"bind": db.engine},
+        ).first()
+        if row is None:
+            return None
+        principal = Principal(row.id, row.name, row.email, row.role, bool(row.is_active))
+        self._store(principal)
+        return principal
+
+    def prime(self, user):
+        """Cache a freshly loaded User, e.g. right after login."""
+        self._store(Principal(user.id, user.name, user.email, user.role, bool(user.is_active)))
+
+    def invalidate(self, user_id):
+        state = self._state()
+        with state["lock"]:
+            state["entries"].pop(user_id, None)
+
+    def _store(self, principal):
+        state = self._state()
+        if not state["size"]:
+            return
+        with state["lock"]:
+            state["entries"][principal.id] = (principal, time.monotonic() + state["ttl"])
+            state["entries"].move_to_end(principal.id)
+            while len(state["entries"]) > state["size"]:
+                state["entries"].popitem(last=False)
+
+
+principals = PrincipalCache()
+
+
+def current_principal():
+    """The logged-in user for this request, or None.
+
+    Looked up once per request. A session whose user no longer exists or
+    has been deactivated is cleared, which logs the browser out.
+    """
+    if "principal" not in g:
+        user_id = session.get("user_id")
+        principal = principals.get(user_id) if user_id else None
+        if principal is not None and not principal.is_active:
+            principal = None
+        if principal is None and user_id:
+            session.clear()
+        g.principal = principal
+    return g.principal
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper, connection, target):
+    if not has_app_context() or "principals" not in current_app.extensions:
+        return
+    principals.invalidate(target.id)
+    # Again after commit: a request may have re-read the old row meanwhile.
+    object_session(target).info.setdefault("changed_user_ids", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _users_committed(session):
+    user_ids = session.info.pop("changed_user_ids", None)
+    if not user_ids or not has_app_context() or "principals" not in current_app.extensions:
+        return
+    for user_id in user_ids:
+        principals.invalidate(user_id)
+        versions.bump("user", user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _users_rolled_back(session):
+    session.info.pop("changed_user_ids", None)
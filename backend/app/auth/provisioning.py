@@ -0,0 +1,119 @@
+import csv
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models.user import User
+from .hashing import hash_passwords
+
+
+# Emails per uniqueness query and users per INSERT transaction
+PROVISION_CHUNK = 1000
+
+ROLES = ("student", "teacher")
+
+
+def read_users(stream):
+    """Parse a users CSV with columns name,email,password[,role].
+
+    Returns a list of (line_number, row) with stripped values.
+    """
+    reader = csv.DictReader(stream)
+    missing = {"name", "email", "password"} - set(reader.fieldnames or [])
+    if missing:
+        raise ValueError(f"CSV is missing columns: {', '.join(sorted(missing))}")
+    return [
+        (reader.line_num, {key: (value or "").strip() for key, value in row.items() if key})
+        for row in reader
+    ]
+
+
+def _existing_emails(emails):
+    found = set()
+    # A short connection per chunk; nothing is held while hashing.
+    for start in range(0, len(emails), PROVISION_CHUNK):
+        with db.engine.connect() as conn:
+            found.update(conn.execute(
+                select(User.email).where(User.email.in_(emails[start:start + PROVISION_CHUNK]))
+            ).scalars())
+    return found
+
+
+def _insert(batch, errors):
+    """Insert one batch of user rows; returns how many were created."""
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(insert(User), [user for _, user in batch])
+        return len(batch)
+    except IntegrityError:
+        pass
+
+    # Someone registered one of these emails meanwhile; redo the batch row
+    # by row so only the conflicting rows fail.
+    created = 0
+    for line, user in batch:
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(insert(User), [user])
+            created += 1
+        except IntegrityError:
+            errors.append((line, user["email"], "Email already registered"))
+    return created
+
+
+def provision(rows, method, workers, progress=None):
+    """Create users from ``read_users`` rows.
+
+    Rows are validated and their emails checked against the database in
+    chunked IN queries before any hashing. Passwords are hashed with
+    ``method`` across ``workers`` processes and the users inserted
+    PROVISION_CHUNK at a time as hashes arrive, each batch in its own short
+    transaction, so at most one pooled connection is in use. Returns
+    (created, errors) where errors are (line_number, email, message).
+    """
+    errors = []
+    valid = []
+    seen = set()
+    for line, row in rows:
+        name, email, password = row.get("name"), row.get("email"), row.get("password")
+        role = row.get("role") or "student"
+        if not name or not email or not password:
+            errors.append((line, email, "Missing required fields"))
+        elif role not in ROLES:
+            errors.append((line, email, "Invalid role"))
+        elif email in seen:
+            errors.append((line, email, "Duplicate email in file"))
+        else:
+            seen.add(email)
+            valid.append((line, name, email, password, role))
+
+    taken = _existing_emails([email for _, _, email, _, _ in valid])
+    pending = []
+    for line, name, email, password, role in valid:
+        if email in taken:
+            errors.append((line, email, "Email already registered"))
+        else:
+            pending.append((line, name, email, password, role))
+
+    created = 0
+    batch = []
+    hashes = hash_passwords([password for _, _, _, password, _ in pending], method, workers)
+    for (line, name, email, _, role), password_hash in zip(pending, hashes):
+        batch.append((line, {
+            "name": name,
+            "email": email,
+            "password_hash": password_hash,
+            "role": role,
+            "is_active": True,
+        }))
+        if len(batch) == PROVISION_CHUNK:
+            created += _insert(batch, errors)
+            batch = []
+            if progress:
+                progress(created)
+    if batch:
+        created += _insert(batch, errors)
+
+    errors.sort(key=lambda error: error[0])
+    return created, errors
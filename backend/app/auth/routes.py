@@ -2,7 +2,9 @@ from flask import request, jsonify, session
 from . import auth_bp
 from app.models.user import User
 from app.extensions import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.versions import conditional
+from .hashing import HasherBusy, password_hasher
+from .principals import current_principal, principals
 
 @auth_bp.route('/signup', methods=['POST'])
 def signup():
@@ -24,13 +26,18 @@ def signup():
         return jsonify({"error": "Email already registered"}), 400
 
     # 2. Create new user
+    try:
+        password_hash = password_hasher.hash(password)
+    except HasherBusy:
+        return busy_response()
+
     user = User(
         name=name,
         email=email,
         role=role,
-        is_active=True
+        is_active=True,
+        password_hash=password_hash
     )
-    user.set_password(password)
 
     # 3. Add to DB
     db.session.add(user)
@@ -52,16 +59,29 @@ def login():
         return jsonify({"error": "Invalid email or password"}), 401
 
     # 2. Verify password
-    if not user.check_password(password):
+    try:
+        valid = password_hasher.verify(user.password_hash, password)
+    except HasherBusy:
+        return busy_response()
+    if not valid:
         return jsonify({"error": "Invalid email or password"}), 401
 
     # 3. Check if active
     if not user.is_active:
         return jsonify({"error": "Account inactive"}), 403
 
+    # Upgrade hashes made with older KDF parameters while we have the password
+    if password_hasher.needs_rehash(user.password_hash):
+        try:
+            user.password_hash = password_hasher.hash(password)
+            db.session.commit()
+        except HasherBusy:
+            pass  # Retried on a later login
+
     # 4. Create session
     session['user_id'] = user.id
     session['role'] = user.role
+    principals.prime(user)
 
     return jsonify({
         "message": "Login successful",
@@ -74,25 +94,33 @@ def login():
     }), 200
 
 
+def busy_response():
+    return jsonify({"error": "Server busy, please try again"}), 503, {"Retry-After": "1"}
+
+
 @auth_bp.route('/logout', methods=['POST'])
 def logout():
     session.clear()  # destroys all session data
     return jsonify({"message": "Logout successful"}), 200
 
 
+def me_scope():
+    principal = current_principal()
+    if principal is None:
+        return None
+    return [("user", principal.id)]
+
+
 @auth_bp.route('/me', methods=['GET'])
+@conditional(me_scope)
 def me():
-    user_id = session.get('user_id')
-    if not user_id:
+    principal = current_principal()
+    if principal is None:
         return jsonify({"error": "Not logged in"}), 401
 
-    user = User.query.get(user_id)
-    if not user:
-        return jsonify({"error": "User not found"}), 404
-
     return jsonify({
-        "id": user.id,
-        "name": user.name,
-        "email": user.email,
-        "role": user.role
+        "id": principal.id,
+        "name": principal.name,
+        "email": principal.email,
+        "role": principal.role
     }), 200
@@ -0,0 +1,132 @@
+import csv
+import io
+import json
+
+from sqlalchemy import insert, select
+
+from app.attendance.rollups import add_enrollments
+from app.models.enrollment import Enrollment
+from app.models.user import User
+
+
+# Rows per IN list and per multi-row INSERT; keeps statements under SQLite's
+# bound-parameter limit.
+IMPORT_CHUNK = 5000
+
+ENROLLED = "enrolled"
+ALREADY_ENROLLED = "already_enrolled"
+DUPLICATE = "duplicate"
+NOT_FOUND = "not_found"
+NOT_A_STUDENT = "not_a_student"
+INVALID = "invalid"
+
+
+class InvalidRoster(ValueError):
+    """Raised when an uploaded roster cannot be read at all."""
+
+
+def parse_roster(content_type, body):
+    """Return the list of student references in an uploaded roster.
+
+    JSON is a list, or an object with a ``students`` list, of student ids
+    and/or emails. CSV (``text/csv``) takes the first column of each
+    non-empty line; a header line such as ``email`` or ``student_id`` is
+    skipped.
+    """
+    if content_type == "text/csv":
+        try:
+            text = body.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise InvalidRoster("CSV must be UTF-8")
+        values = [row[0].strip() for row in csv.reader(io.StringIO(text)) if row and row[0].strip()]
+        if values and parse_reference(values[0]) is None:
+            values = values[1:]
+        return values
+
+    try:
+        data = json.loads(body)
+    except ValueError:
+        raise InvalidRoster("Body must be JSON or text/csv")
+    if isinstance(data, dict):
+        data = data.get("students")
+    if not isinstance(data, list):
+        raise InvalidRoster("Expected a list of student ids or emails")
+    return data
+
+
+def parse_reference(value):
+    """("id", int) or ("email", str) for one roster entry, or None."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return ("id", value) if value > 0 else None
+    if isinstance(value, str):
+        value = value.strip()
+        if value.isdigit():
+            return ("id", int(value)) if int(value) > 0 else None
+        if "@" in value:
+            return ("email", value)
+    return None
+
+
+def _chunked_lookup(conn, column, values):
+    found = {}
+    values = list(values)
+    for start in range(0, len(values), IMPORT_CHUNK):
+        rows = conn.execute(
+            select(column, User.id, User.role).where(column.in_(values[start:start + IMPORT_CHUNK]))
+        )
+        for key, user_id, role in rows:
+            found[key] = (user_id, role)
+    return found
+
+
+def import_roster(conn, class_id, values):
+    """Enroll the referenced students in ``class_id`` on ``conn``.
+
+    Runs a fixed number of statements per IMPORT_CHUNK rows: the references
+    are resolved with chunked IN queries, the class's current enrollments
+    are read once, and the new ones are written with multi-row INSERTs
+    (rollup rows included). The caller commits. Returns (results, enrolled)
+    where ``results`` has one report per input row and ``enrolled`` lists
+    the newly enrolled student ids.
+    """
+    refs = [parse_reference(value) for value in values]
+    by_id = _chunked_lookup(conn, User.id, {v for kind, v in filter(None, refs) if kind == "id"})
+    by_email = _chunked_lookup(conn, User.email, {v for kind, v in filter(None, refs) if kind == "email"})
+    existing = set(conn.execute(
+        select(Enrollment.student_id).where(Enrollment.class_id == class_id)
+    ).scalars())
+
+    results = []
+    enrolled = []
+    seen = set()
+    for row, (value, ref) in enumerate(zip(values, refs), start=1):
+        student_id = None
+        if ref is None:
+            status = INVALID
+        else:
+            user = (by_id if ref[0] == "id" else by_email).get(ref[1])
+            if user is None:
+                status = NOT_FOUND
+            else:
+                student_id = user[0]
+                if user[1] != "student":
+                    status = NOT_A_STUDENT
+                elif student_id in seen:
+                    status = DUPLICATE
+                elif student_id in existing:
+                    status = ALREADY_ENROLLED
+                else:
+                    status = ENROLLED
+                    enrolled.append(student_id)
+                seen.add(student_id)
+        results.append({"row": row, "value": value, "status": status, "student_id": student_id})
+
+    for start in range(0, len(enrolled), IMPORT_CHUNK):
+        conn.execute(insert(Enrollment.__table__), [
+            {"student_id": student_id, "class_id": class_id, "is_active": True}
+            for student_id in enrolled[start:start + IMPORT_CHUNK]
+        ])
+    add_enrollments(conn, class_id, enrolled, chunk=IMPORT_CHUNK)
+    return results, enrolled
@@ -1,19 +1,33 @@
-from flask import request, jsonify, session
+from collections import Counter
+
+from flask import current_app, request, jsonify
 from app.models.class_model import Class
 from app.models.enrollment import Enrollment
+from app.models.user import User
+from app.models.attendance_rollup import AttendanceRollup
 from app.extensions import db
+from app.auth.principals import current_principal
+from app.pagination import InvalidPage, page_args, split_page
+from app.versions import conditional, versions
+from app.replicas import read_replica
+from sqlalchemy import select
+from app.attendance.spatial import geo_index
+from app.attendance.rollups import add_enrollment, percentage
+from app.attendance.rosters import rosters
+from .roster_import import InvalidRoster, import_roster, parse_roster
 from . import classes_bp
 
 
 @classes_bp.route("", methods=["POST"])
 def create_class():
     # 1. Must be logged in
-    user_id = session.get("user_id")
-    role = session.get("role")
-
-    if not user_id:
+    principal = current_principal()
+    if principal is None:
         return jsonify({"error": "Not logged in"}), 401
 
+    user_id = principal.id
+    role = principal.role
+
     # 2. Must be a teacher
     if role != "teacher":
         return jsonify({"error": "Only teachers can create classes"}), 403
@@ -44,6 +58,9 @@ def create_class():
     db.session.add(new_class)
     db.session.commit()
 
+    geo_index.add_class(new_class)
+    versions.bump("teacher_classes", user_id)
+
     return jsonify({
         "message": "Class created successfully",
         "class_id": new_class.id
@@ -53,12 +70,13 @@ def create_class():
 @classes_bp.route("/<int:class_id>/enroll", methods=["POST"])
 def enroll_in_class(class_id):
     # Must be logged in
-    user_id = session.get("user_id")
-    role = session.get("role")
-
-    if not user_id:
+    principal = current_principal()
+    if principal is None:
         return jsonify({"error": "Not logged in"}), 401
 
+    user_id = principal.id
+    role = principal.role
+
     # Must be a student
     if role != "student":
         return jsonify({"error": "Only students can enroll"}), 403
@@ -69,71 +87,217 @@ def enroll_in_class(class_id):
         return jsonify({"error": "Class not found"}), 404
 
     # Already enrolled?
-    existing = Enrollment.query.filter_by(
-        student_id=user_id,
-        class_id=class_id
-    ).first()
-
-    if existing:
+    if rosters.is_enrolled(class_id, user_id):
         return jsonify({"message": "Already enrolled", "class_id": class_id}), 200
 
     enrollment = Enrollment(student_id=user_id, class_id=class_id)
     db.session.add(enrollment)
+    add_enrollment(db.session, user_id, class_id)
     db.session.commit()
 
+    rosters.add(class_id, [user_id])
+    versions.bump("student_classes", user_id)
+
     return jsonify({"message": "Enrolled successfully", "class_id": class_id}), 201
 
 
+def class_list_scope():
+    principal = current_principal()
+    if principal is None or principal.role not in ("teacher", "student"):
+        return None
+    return [(f"{principal.role}_classes", principal.id)]
+
+
 @classes_bp.route("", methods=["GET"])
+@conditional(class_list_scope)
+@read_replica
 def list_classes():
-    user_id = session.get("user_id")
-    role = session.get("role")
-
-    if not user_id:
+    principal = current_principal()
+    if principal is None:
         return jsonify({"error": "Not logged in"}), 401
 
+    user_id = principal.id
+    role = principal.role
+
+    if role not in ("teacher", "student"):
+        return jsonify({"error": "Invalid role"}), 400
+
+    try:
+        limit, after = page_args((int,))
+    except InvalidPage as e:
+        return jsonify({"error": str(e)}), 400
+    after_id = after[0] if after else 0
+
     # Teacher: classes they created
     if role == "teacher":
-        classes = Class.query.filter_by(teacher_id=user_id).all()
-
-        return jsonify({
-            "classes": [
-                {
-                    "id": c.id,
-                    "name": c.name,
-                    "teacher_id": c.teacher_id,
-                    "latitude": float(c.latitude),
-                    "longitude": float(c.longitude),
-                    "radius_meters": float(c.radius_meters),
-                    "is_active": bool(c.is_active)
-                }
-                for c in classes
-            ]
-        }), 200
+        classes = (
+            Class.query.filter(Class.teacher_id == user_id, Class.id > after_id)
+            .order_by(Class.id.asc())
+            .limit(limit + 1)
+            .all()
+        )
 
     # Student: classes they enrolled in
-    elif role == "student":
-        enrollments = Enrollment.query.filter_by(student_id=user_id).all()
-        class_ids = [e.class_id for e in enrollments]
+    else:
+        class_ids = [
+            class_id for (class_id,) in
+            db.session.query(Enrollment.class_id)
+            .filter(Enrollment.student_id == user_id, Enrollment.class_id > after_id)
+            .distinct()
+            .order_by(Enrollment.class_id.asc())
+            .limit(limit + 1)
+        ]
 
         if not class_ids:
-            return jsonify({"classes": []}), 200
-
-        classes = Class.query.filter(Class.id.in_(class_ids)).all()
-
-        return jsonify({
-            "classes": [
-                {
-                    "id": c.id,
-                    "name": c.name,
-                    "teacher_id": c.teacher_id,
-                    "latitude": float(c.latitude),
-                    "longitude": float(c.longitude),
-                    "radius_meters": float(c.radius_meters),
-                    "is_active": bool(c.is_active)
-                }
-                for c in classes
-            ]
-        }), 200
-
-    return jsonify({"error": "Invalid role"}), 400
\ No newline at end of file
+            return jsonify({"classes": [], "next_cursor": None}), 200
+
+        classes = Class.query.filter(Class.id.in_(class_ids)).order_by(Class.id.asc()).all()
+
+    classes, next_cursor = split_page(classes, limit, lambda c: (c.id,))
+
+    return jsonify({
+        "classes": [
+            {
+                "id": c.id,
+                "name": c.name,
+                "teacher_id": c.teacher_id,
+                "latitude": float(c.latitude),
+                "longitude": float(c.longitude),
+                "radius_meters": float(c.radius_meters),
+                "is_active": bool(c.is_active)
+            }
+            for c in classes
+        ],
+        "next_cursor": next_cursor
+    }), 200
+
+
+@classes_bp.route("/<int:class_id>/enrollments", methods=["GET"])
+@read_replica
+def list_enrollments(class_id):
+    principal = current_principal()
+    if principal is None:
+        return jsonify({"error": "Not logged in"}), 401
+
+    user_id = principal.id
+    role = principal.role
+
+    if role != "teacher":
+        return jsonify({"error": "Only teachers can view enrollments"}), 403
+
+    class_obj = Class.query.get(class_id)
+    if not class_obj:
+        return jsonify({"error": "Class not found"}), 404
+
+    if class_obj.teacher_id != user_id:
+        return jsonify({"error": "Not allowed"}), 403
+
+    try:
+        limit, after = page_args((int,))
+    except InvalidPage as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Keyset page on enrollment id, served by ix_enrollments_class_id
+    rows = db.session.execute(
+        select(Enrollment.id, Enrollment.student_id, User.name, User.email, Enrollment.is_active, Enrollment.enrolled_at)
+        .join(User, User.id == Enrollment.student_id)
+        .where(Enrollment.class_id == class_id, Enrollment.id > (after[0] if after else 0))
+        .order_by(Enrollment.id.asc())
+        .limit(limit + 1)
+    ).all()
+    enrollments, next_cursor = split_page(rows, limit, lambda e: (e.id,))
+
+    return jsonify({
+        "class_id": class_id,
+        "enrollments": [
+            {
+                "id": e.id,
+                "student_id": e.student_id,
+                "name": e.name,
+                "email": e.email,
+                "is_active": bool(e.is_active),
+                "enrolled_at": e.enrolled_at.isoformat() if e.enrolled_at else None
+            }
+            for e in enrollments
+        ],
+        "next_cursor": next_cursor
+    }), 200
+
+
+@classes_bp.route("/<int:class_id>/enrollments", methods=["POST"])
+def import_enrollments(class_id):
+    principal = current_principal()
+    if principal is None:
+        return jsonify({"error": "Not logged in"}), 401
+
+    if principal.role != "teacher":
+        return jsonify({"error": "Only teachers can import enrollments"}), 403
+
+    class_obj = Class.query.get(class_id)
+    if not class_obj:
+        return jsonify({"error": "Class not found"}), 404
+
+    if class_obj.teacher_id != principal.id:
+        return jsonify({"error": "Not allowed"}), 403
+
+    try:
+        values = parse_roster(request.mimetype, request.get_data())
+    except InvalidRoster as e:
+        return jsonify({"error": str(e)}), 400
+
+    max_rows = current_app.config["ENROLLMENT_IMPORT_MAX_ROWS"]
+    if len(values) > max_rows:
+        return jsonify({"error": f"At most {max_rows} rows per import"}), 413
+
+    # One transaction for the whole roster
+    results, enrolled = import_roster(db.session, class_id, values)
+    db.session.commit()
+
+    rosters.add(class_id, enrolled)
+    for student_id in enrolled:
+        versions.bump("student_classes", student_id)
+
+    counts = Counter(r["status"] for r in results)
+    return jsonify({
+        "class_id": class_id,
+        "counts": counts,
+        "results": results
+    }), 200
+
+
+@classes_bp.route("/<int:class_id>/attendance-summary", methods=["GET"])
+@read_replica
+def get_class_attendance_summary(class_id):
+    principal = current_principal()
+    if principal is None:
+        return jsonify({"error": "Not logged in"}), 401
+
+    user_id = principal.id
+    role = principal.role
+
+    if role != "teacher":
+        return jsonify({"error": "Only teachers can view class attendance summaries"}), 403
+
+    class_obj = Class.query.get(class_id)
+    if not class_obj:
+        return jsonify({"error": "Class not found"}), 404
+
+    if class_obj.teacher_id != user_id:
+        return jsonify({"error": "Not allowed"}), 403
+
+    # Reads only the rollup rows, one per enrolled student
+    rollups = AttendanceRollup.query.filter_by(class_id=class_id).all()
+
+    return jsonify({
+        "class_id": class_id,
+        "students": [
+            {
+                "student_id": r.student_id,
+                "sessions_held": r.sessions_held,
+                "sessions_attended": r.sessions_attended,
+                "percentage": percentage(r.sessions_attended, r.sessions_held),
+                "last_attended_at": r.last_attended_at.isoformat() if r.last_attended_at else None
+            }
+            for r in rollups
+        ]
+    }), 200
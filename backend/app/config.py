@@ -1,5 +1,91 @@
 import os
+import tempfile
 
 class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Connection pools, applied to the primary and every replica
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() == "true"
+
+    # Read replicas for dashboard reads (comma-separated URLs; none by default);
+    # a user's reads stay on the primary for a while after their own writes
+    REPLICA_DATABASE_URLS = [url.strip() for url in os.getenv("REPLICA_DATABASE_URLS", "").split(",") if url.strip()]
+    REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "10"))
+
+    # Write-behind group commit for /attendance/submit (off by default)
+    ATTENDANCE_GROUP_COMMIT = os.getenv("ATTENDANCE_GROUP_COMMIT", "false").lower() == "true"
+    ATTENDANCE_FLUSH_SIZE = int(os.getenv("ATTENDANCE_FLUSH_SIZE", "200"))
+    ATTENDANCE_FLUSH_INTERVAL_MS = int(os.getenv("ATTENDANCE_FLUSH_INTERVAL_MS", "20"))
+    ATTENDANCE_QUEUE_SIZE = int(os.getenv("ATTENDANCE_QUEUE_SIZE", "5000"))
+    ATTENDANCE_WRITE_TIMEOUT = float(os.getenv("ATTENDANCE_WRITE_TIMEOUT", "10"))
+
+    # Async submissions for "Prefer: respond-async" clients (0 workers = off)
+    ATTENDANCE_ASYNC_WORKERS = int(os.getenv("ATTENDANCE_ASYNC_WORKERS", "0"))
+    ATTENDANCE_ASYNC_MAX_PENDING = int(os.getenv("ATTENDANCE_ASYNC_MAX_PENDING", "10000"))
+    ATTENDANCE_TICKET_TTL = int(os.getenv("ATTENDANCE_TICKET_TTL", "600"))
+
+    # Grid index behind /attendance/nearby
+    GEO_INDEX_CELL_DEGREES = float(os.getenv("GEO_INDEX_CELL_DEGREES", "0.002"))
+    GEO_INDEX_REFRESH_SECONDS = int(os.getenv("GEO_INDEX_REFRESH_SECONDS", "30"))
+
+    # Cached class rosters; the age bounds how stale absentee lists can be
+    ROSTER_MAX_AGE_SECONDS = int(os.getenv("ROSTER_MAX_AGE_SECONDS", "60"))
+
+    # Close sessions at their ends_at in a background thread (off by default);
+    # the rescan closes overdue sessions and picks up ones started elsewhere
+    SESSION_SCHEDULER = os.getenv("SESSION_SCHEDULER", "false").lower() == "true"
+    SESSION_SCHEDULER_RESCAN_SECONDS = int(os.getenv("SESSION_SCHEDULER_RESCAN_SECONDS", "60"))
+
+    # Rotating attendance codes: seconds per code, and how many steps either
+    # side of the current one are still accepted (clock skew, slow typing)
+    ATTENDANCE_CODE_STEP_SECONDS = int(os.getenv("ATTENDANCE_CODE_STEP_SECONDS", "30"))
+    ATTENDANCE_CODE_DRIFT_STEPS = int(os.getenv("ATTENDANCE_CODE_DRIFT_STEPS", "1"))
+
+    # Keyset pagination of list endpoints
+    PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", "100"))
+    PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "500"))
+
+    # Rows accepted by one POST /classes/<id>/enrollments roster import
+    ENROLLMENT_IMPORT_MAX_ROWS = int(os.getenv("ENROLLMENT_IMPORT_MAX_ROWS", "100000"))
+
+    # Server-sent events feed of new records per session
+    LIVE_FEED_BUFFER = int(os.getenv("LIVE_FEED_BUFFER", "1000"))
+    LIVE_FEED_KEEPALIVE_SECONDS = float(os.getenv("LIVE_FEED_KEEPALIVE_SECONDS", "15"))
+    LIVE_FEED_SYNC_SECONDS = float(os.getenv("LIVE_FEED_SYNC_SECONDS", "5"))
+    LIVE_FEED_RETRY_MS = int(os.getenv("LIVE_FEED_RETRY_MS", "3000"))
+
+    # Weak ETags on polled GET endpoints; bounds staleness across processes
+    ETAG_MAX_AGE_SECONDS = int(os.getenv("ETAG_MAX_AGE_SECONDS", "10"))
+
+    # Password KDF; hashing runs in a process pool when workers > 0
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt")
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "0"))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", "5"))
+
+    # Cached users behind logged-in sessions; the TTL bounds how long a
+    # deactivation made elsewhere takes to apply
+    PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+    PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+
+    # Per-endpoint request/SQL metrics at GET /metrics (Prometheus format),
+    # served only with METRICS_TOKEN set; slow requests and statements are
+    # logged as JSON lines
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+    METRICS_SLOW_REQUEST_MS = float(os.getenv("METRICS_SLOW_REQUEST_MS", "500"))
+    METRICS_SLOW_QUERY_MS = float(os.getenv("METRICS_SLOW_QUERY_MS", "100"))
+
+    # Per-request profiling, on an X-Profile: <token> header or a sampled
+    # fraction of requests; mode "cprofile" (pstats) or "sample" (collapsed stacks)
+    PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_MODE = os.getenv("PROFILE_MODE", "sample")
+    PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+    PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "attendsure-profiles"))
+    PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "200"))
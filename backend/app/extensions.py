@@ -1,5 +1,52 @@
+import click
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 
-db = SQLAlchemy()
-migrate = Migrate()
+from app.replicas import RoutingSession
+
+
+class _MigrateCommands(click.Group):
+    """The ``flask db`` group, loading Flask-Migrate on first use."""
+
+    def __init__(self, app, db):
+        super().__init__("db", help="Perform database migrations.")
+        self.app = app
+        self.db = db
+        self.commands_group = None
+
+    def _load(self):
+        if self.commands_group is None:
+            from flask_migrate import Migrate
+            from flask_migrate.cli import db as commands_group
+
+            if "migrate" not in self.app.extensions:
+                Migrate(self.app, self.db)
+            # Take over the real group's options (--directory, -x) and callback.
+            self.params = list(commands_group.params)
+            self.callback = commands_group.callback
+            self.commands_group = commands_group
+        return self.commands_group
+
+    def parse_args(self, ctx, args):
+        self._load()
+        return super().parse_args(ctx, args)
+
+    def list_commands(self, ctx):
+        return self._load().list_commands(ctx)
+
+    def get_command(self, ctx, name):
+        return self._load().get_command(ctx, name)
+
+
+class LazyMigrate:
+    """Flask-Migrate, imported only when a ``flask db`` command runs.
+
+    Flask-Migrate pulls in Alembic, which is a large share of start-up time
+    for workers and test runs that never migrate.
+    """
+
+    def init_app(self, app, db):
+        app.cli.add_command(_MigrateCommands(app, db))
+
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+migrate = LazyMigrate()
@@ -0,0 +1,239 @@
+from bisect import bisect_left
+from collections import Counter, defaultdict
+import hmac
+import json
+import threading
+import time
+
+from flask import Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from app.extensions import db
+
+
+# Request latency histogram bounds, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Statements made outside a request (group commit, async workers, scheduler)
+BACKGROUND = "background"
+
+# Slowest statements kept per request for the slow-request log
+SLOW_SAMPLES = 3
+
+
+class _Endpoint:
+    __slots__ = ("buckets", "count", "seconds", "queries", "db_seconds", "slow_requests", "slow_queries", "statuses")
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.seconds = 0.0
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.slow_requests = 0
+        self.slow_queries = 0
+        self.statuses = Counter()
+
+
+class _Request:
+    __slots__ = ("started", "queries", "db_seconds", "slow")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.slow = []
+
+
+class Metrics:
+    """Per-endpoint request and SQL metrics, served in Prometheus text format.
+
+    Request hooks time every request and engine events count its statements
+    and the time spent in them, per blueprint endpoint; statements outside a
+    request are counted under ``background``. Per statement the cost is two
+    clock reads and a few additions; per request, one lock. Requests slower
+    than ``METRICS_SLOW_REQUEST_MS``, or with a statement slower than
+    ``METRICS_SLOW_QUERY_MS``, are logged as one JSON line with their
+    slowest statements (SQL text only, never parameters). Statements on
+    every bind count, read replicas included. ``GET /metrics`` also reports
+    each bind's connection pool. It requires ``Authorization: Bearer
+    <METRICS_TOKEN>``, and answers 404 while no token is set, so metrics are
+    never public by default.
+    """
+
+    def init_app(self, app):
+        if not app.config["METRICS_ENABLED"]:
+            return
+        app.extensions["metrics"] = {
+            "endpoints": defaultdict(_Endpoint),
+            "lock": threading.Lock(),
+            "slow_request": app.config["METRICS_SLOW_REQUEST_MS"] / 1000,
+            "slow_query": app.config["METRICS_SLOW_QUERY_MS"] / 1000,
+        }
+        with app.app_context():
+            # Every bind, so statements routed to a read replica are counted too.
+            for engine in db.engines.values():
+                self._listen(engine, app)
+        # Registered before the other extensions' hooks, so their work is timed too.
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.add_url_rule("/metrics", "metrics", self._view)
+
+    def _listen(self, engine, app):
+        state = app.extensions["metrics"]
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def before(conn, cursor, statement, parameters, context, executemany):
+            # On the execution context, so a failed statement leaves nothing behind.
+            context.metrics_started = time.perf_counter()
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - context.metrics_started
+            slow = elapsed >= state["slow_query"]
+            current = g.get("metrics_request") if has_request_context() else None
+            if current is not None:
+                current.queries += 1
+                current.db_seconds += elapsed
+                if slow:
+                    current.slow.append((elapsed, statement))
+                    current.slow.sort(reverse=True)
+                    del current.slow[SLOW_SAMPLES:]
+                return
+
+            with state["lock"]:
+                background = state["endpoints"][BACKGROUND]
+                background.queries += 1
+                background.db_seconds += elapsed
+                background.slow_queries += slow
+            if slow:
+                app.logger.warning(json.dumps({
+                    "event": "slow_query",
+                    "endpoint": BACKGROUND,
+                    "ms": round(elapsed * 1000, 1),
+                    "statement": statement[:300],
+                }))
+
+    def _state(self):
+        return current_app.extensions["metrics"]
+
+    def _before_request(self):
+        g.metrics_request = _Request()
+
+    def _after_request(self, response):
+        current = g.pop("metrics_request", None)
+        if current is None:
+            return response
+        elapsed = time.perf_counter() - current.started
+        endpoint = request.endpoint or "unmatched"
+
+        state = self._state()
+        slow = elapsed >= state["slow_request"]
+        with state["lock"]:
+            stats = state["endpoints"][endpoint]
+            stats.buckets[bisect_left(BUCKETS, elapsed)] += 1
+            stats.count += 1
+            stats.seconds += elapsed
+            stats.queries += current.queries
+            stats.db_seconds += current.db_seconds
+            stats.slow_requests += slow
+            stats.slow_queries += len(current.slow)
+            stats.statuses[response.status_code] += 1
+
+        if slow or current.slow:
+            current_app.logger.warning(json.dumps({
+                "event": "slow_request",
+                "endpoint": endpoint,
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                "ms": round(elapsed * 1000, 1),
+                "queries": current.queries,
+                "db_ms": round(current.db_seconds * 1000, 1),
+                "slow_queries": [
+                    {"ms": round(seconds * 1000, 1), "statement": statement[:300]}
+                    for seconds, statement in current.slow
+                ],
+            }))
+        return response
+
+    def _view(self):
+        token = current_app.config["METRICS_TOKEN"]
+        # Per-endpoint traffic and pool state are not for anonymous callers.
+        if not token:
+            return Response("not found\n", status=404, mimetype="text/plain")
+        if not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+            return Response("unauthorized\n", status=401, mimetype="text/plain")
+        return Response(self.render(), mimetype="text/plain; version=0.0.4")
+
+    def render(self):
+        """The current metrics in Prometheus text exposition format."""
+        state = self._state()
+        with state["lock"]:
+            endpoints = sorted(state["endpoints"].items())
+            lines = []
+
+            lines += _header("attendsure_request_duration_seconds", "histogram", "Request latency by endpoint.")
+            for name, stats in endpoints:
+                if name == BACKGROUND:
+                    continue
+                cumulative = 0
+                for bound, count in zip(BUCKETS + ("+Inf",), stats.buckets):
+                    cumulative += count
+                    lines.append(_sample("attendsure_request_duration_seconds_bucket", cumulative, endpoint=name, le=bound))
+                lines.append(_sample("attendsure_request_duration_seconds_sum", stats.seconds, endpoint=name))
+                lines.append(_sample("attendsure_request_duration_seconds_count", stats.count, endpoint=name))
+
+            lines += _header("attendsure_requests_total", "counter", "Requests by endpoint and status.")
+            for name, stats in endpoints:
+                for status, count in sorted(stats.statuses.items()):
+                    lines.append(_sample("attendsure_requests_total", count, endpoint=name, status=status))
+
+            for metric, attr, kind, text in (
+                ("attendsure_db_queries_total", "queries", "counter", "SQL statements by endpoint."),
+                ("attendsure_db_seconds_total", "db_seconds", "counter", "Time spent in SQL statements by endpoint."),
+                ("attendsure_slow_queries_total", "slow_queries", "counter", "Statements over METRICS_SLOW_QUERY_MS."),
+                ("attendsure_slow_requests_total", "slow_requests", "counter", "Requests over METRICS_SLOW_REQUEST_MS."),
+            ):
+                lines += _header(metric, kind, text)
+                for name, stats in endpoints:
+                    if name != BACKGROUND or attr != "slow_requests":
+                        lines.append(_sample(metric, getattr(stats, attr), endpoint=name))
+
+        pools = [(bind or "default", engine.pool) for bind, engine in sorted(
+            db.engines.items(), key=lambda item: item[0] or ""
+        )]
+        for metric, method, text in (
+            ("attendsure_db_pool_size", "size", "Configured pool size."),
+            ("attendsure_db_pool_checked_out", "checkedout", "Connections in use."),
+            ("attendsure_db_pool_checked_in", "checkedin", "Idle connections in the pool."),
+            ("attendsure_db_pool_overflow", "overflow", "Connections open beyond the pool size."),
+        ):
+            # Pools such as SQLite's StaticPool do not keep these numbers.
+            samples = [
+                _sample(metric, getattr(pool, method)(), bind=bind)
+                for bind, pool in pools if hasattr(pool, method)
+            ]
+            if samples:
+                lines += _header(metric, "gauge", text)
+                lines += samples
+
+        return "\n".join(lines) + "\n"
+
+
+def _header(metric, kind, text):
+    return [f"# HELP {metric} {text}", f"# TYPE {metric} {kind}"]
+
+
+def _sample(metric, value, **labels):
+    if labels:
+        pairs = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+        metric = f"{metric}{{{pairs}}}"
+    return f"{metric} {value}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = Metrics()
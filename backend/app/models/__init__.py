@@ -5,3 +5,4 @@ from .class_model import Class
 from .enrollment import Enrollment
 from .attendance_session import AttendanceSession
 from .attendance_record import AttendanceRecord
+from .attendance_rollup import AttendanceRollup
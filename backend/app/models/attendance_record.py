@@ -28,7 +28,20 @@ class AttendanceRecord(db.Model):
 
     ip_prefix = db.Column(db.String(50), nullable=True)
 
+    # Where the student said they were, kept so the geofence check can be
+    # re-run later (disputes, radius changes)
+    submitted_latitude = db.Column(db.Float, nullable=True)
+    submitted_longitude = db.Column(db.Float, nullable=True)
+    distance_meters = db.Column(db.Float, nullable=True)
+    location_verified = db.Column(db.Boolean, nullable=True)
+
     marked_at = db.Column(
         db.DateTime,
         server_default=db.func.now()
     )
+
+    __table_args__ = (
+        db.UniqueConstraint("session_id", "student_id", name="uq_session_student"),
+        db.Index("ix_attendance_records_session_marked", "session_id", "marked_at"),
+        db.Index("ix_attendance_records_session_signature", "session_id", "device_signature"),
+    )
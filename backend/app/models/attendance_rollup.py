@@ -0,0 +1,29 @@
+from app.extensions import db
+
+
+class AttendanceRollup(db.Model):
+    __tablename__ = "attendance_rollups"
+
+    student_id = db.Column(
+        db.Integer,
+        db.ForeignKey("users.id"),
+        primary_key=True
+    )
+
+    class_id = db.Column(
+        db.Integer,
+        db.ForeignKey("classes.id"),
+        primary_key=True
+    )
+
+    # Sessions of the class started so far, including any still active; a
+    # student who enrolls late is counted against the ones before too
+    sessions_held = db.Column(db.Integer, nullable=False, default=0)
+
+    sessions_attended = db.Column(db.Integer, nullable=False, default=0)
+
+    last_attended_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index("ix_attendance_rollups_class_id", "class_id"),
+    )
@@ -21,8 +21,12 @@ class AttendanceSession(db.Model):
     starts_at = db.Column(db.DateTime, nullable=False)
     ends_at = db.Column(db.DateTime, nullable=False)
 
-    attendance_code = db.Column(db.String(20), nullable=False)
-    
+    # Static code; NULL for sessions with rotating codes
+    attendance_code = db.Column(db.String(20), nullable=True)
+
+    # Set for sessions whose code rotates (see app.attendance.codes)
+    code_secret = db.Column(db.String(64), nullable=True)
+
 
     is_active = db.Column(db.Boolean, default=True)
 
@@ -30,3 +34,9 @@ class AttendanceSession(db.Model):
         db.DateTime,
         server_default=db.func.now()
     )
+
+    __table_args__ = (
+        db.Index("ix_attendance_sessions_class_active_created", "class_id", "is_active", "created_at"),
+        # Finding sessions past their end time (app.attendance.lifecycle)
+        db.Index("ix_attendance_sessions_active_ends", "is_active", "ends_at"),
+    )
@@ -25,3 +25,7 @@ class Class(db.Model):
         db.DateTime,
         server_default=db.func.now()
     )
+
+    __table_args__ = (
+        db.Index("ix_classes_teacher_id", "teacher_id"),
+    )
@@ -24,3 +24,8 @@ class Enrollment(db.Model):
         db.DateTime,
         server_default=db.func.now()
     )
+
+    __table_args__ = (
+        db.Index("ix_enrollments_student_class", "student_id", "class_id"),
+        db.Index("ix_enrollments_class_id", "class_id"),
+    )
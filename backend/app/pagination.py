@@ -0,0 +1,64 @@
+import base64
+import binascii
+import json
+
+from flask import current_app, request
+
+
+class InvalidPage(ValueError):
+    """Raised for a malformed ``limit`` or ``cursor`` query parameter."""
+
+
+def encode_cursor(*values):
+    """Opaque cursor for the sort key of the last row on a page."""
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(token, key_types):
+    """Decode a cursor whose values must have the types in ``key_types``."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidPage("Invalid cursor")
+    if (
+        not isinstance(values, list)
+        or len(values) != len(key_types)
+        or not all(type(v) is t for v, t in zip(values, key_types))
+    ):
+        raise InvalidPage("Invalid cursor")
+    return values
+
+
+def page_args(key_types):
+    """Read ``limit`` and ``cursor`` from the query string.
+
+    Returns (limit, after) where ``after`` is the decoded sort key to resume
+    from, or None for the first page. ``key_types`` are the types of the sort
+    key values, e.g. ``(str, int)``. ``limit`` defaults to PAGE_SIZE_DEFAULT
+    and is capped at PAGE_SIZE_MAX.
+    """
+    limit = request.args.get("limit", current_app.config["PAGE_SIZE_DEFAULT"])
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise InvalidPage("limit must be an integer")
+    if limit < 1:
+        raise InvalidPage("limit must be positive")
+    limit = min(limit, current_app.config["PAGE_SIZE_MAX"])
+
+    cursor = request.args.get("cursor")
+    after = decode_cursor(cursor, key_types) if cursor else None
+    return limit, after
+
+
+def split_page(rows, limit, key):
+    """Trim a ``limit + 1`` fetch to one page and build the next cursor.
+
+    ``key(row)`` returns the sort key values of a row. The cursor is None on
+    the last page.
+    """
+    page = rows[:limit]
+    next_cursor = encode_cursor(*key(page[-1])) if len(rows) > limit else None
+    return page, next_cursor
@@ -0,0 +1,158 @@
+from collections import Counter
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+
+from flask import current_app, g, request
+
+
+MODES = ("cprofile", "sample")
+
+
+class _Sampler:
+    """Samples one thread's stack every ``interval`` seconds into collapsed stacks."""
+
+    def __init__(self, interval):
+        self.ident = threading.get_ident()
+        self.interval = interval
+        self.stacks = Counter()
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while not self.done.wait(self.interval):
+            frame = sys._current_frames().get(self.ident)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self.done.set()
+        self.thread.join()
+
+    def write(self, path):
+        with open(path, "w") as fh:
+            for stack, count in self.stacks.most_common():
+                fh.write(f"{stack} {count}\n")
+
+
+class _CProfile:
+    def __init__(self):
+        import cProfile
+
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def write(self, path):
+        self.profile.dump_stats(path)
+
+
+class RequestProfiler:
+    """Opt-in profiling of single requests, written to ``PROFILE_DIR``.
+
+    A request is profiled when it carries ``X-Profile: <PROFILE_TOKEN>``, or
+    at random with probability ``PROFILE_SAMPLE_RATE``. ``PROFILE_MODE``
+    ``cprofile`` writes pstats files (``python -m pstats``, snakeviz);
+    ``sample`` reads the request thread's stack every
+    ``PROFILE_SAMPLE_INTERVAL_MS`` and writes collapsed stacks for
+    flamegraph.pl or speedscope, at a far lower cost to the request. Files
+    are named after the time, endpoint and duration; the oldest are deleted
+    past ``PROFILE_MAX_FILES``. With no token and a zero rate no hooks are
+    installed at all.
+    """
+
+    def init_app(self, app):
+        token = app.config["PROFILE_TOKEN"]
+        rate = app.config["PROFILE_SAMPLE_RATE"]
+        if not token and rate <= 0:
+            return
+        if app.config["PROFILE_MODE"] not in MODES:
+            raise ValueError(f"PROFILE_MODE must be one of {', '.join(MODES)}")
+        app.extensions["profiler"] = {
+            "token": token,
+            "rate": rate,
+            "mode": app.config["PROFILE_MODE"],
+            "interval": app.config["PROFILE_SAMPLE_INTERVAL_MS"] / 1000,
+            "dir": app.config["PROFILE_DIR"],
+            "max_files": app.config["PROFILE_MAX_FILES"],
+            # cProfile profiles one thread at a time per process.
+            "cprofile_lock": threading.Lock(),
+        }
+        os.makedirs(app.config["PROFILE_DIR"], exist_ok=True)
+        app.before_request(self._before_request)
+        app.teardown_request(self._teardown_request)
+        app.after_request(self._after_request)
+
+    def _state(self):
+        return current_app.extensions["profiler"]
+
+    def _wanted(self, state):
+        header = request.headers.get("X-Profile")
+        if header is not None and state["token"]:
+            return hmac.compare_digest(header, state["token"])
+        return state["rate"] > 0 and random.random() < state["rate"]
+
+    def _before_request(self):
+        state = self._state()
+        if not self._wanted(state):
+            return
+        if state["mode"] == "sample":
+            g.profiler = _Sampler(state["interval"])
+        elif state["cprofile_lock"].acquire(blocking=False):
+            g.profiler = _CProfile()
+        g.profiler_started = time.perf_counter()
+
+    def _after_request(self, response):
+        name = self._finish()
+        if name is not None and request.headers.get("X-Profile") is not None:
+            response.headers["X-Profile-File"] = name
+        return response
+
+    def _teardown_request(self, exc):
+        # Requests that failed before after_request still release the profiler.
+        self._finish()
+
+    def _finish(self):
+        profiler = g.pop("profiler", None)
+        if profiler is None:
+            return None
+        profiler.stop()
+        state = self._state()
+        if isinstance(profiler, _CProfile):
+            state["cprofile_lock"].release()
+
+        elapsed_ms = (time.perf_counter() - g.pop("profiler_started")) * 1000
+        endpoint = (request.endpoint or "unmatched").replace(".", "-")
+        extension = "prof" if isinstance(profiler, _CProfile) else "collapsed"
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{endpoint}-{elapsed_ms:.0f}ms-{os.getpid()}-{random.randrange(16 ** 4):04x}.{extension}"
+        try:
+            profiler.write(os.path.join(state["dir"], name))
+            self._prune(state)
+        except OSError:
+            current_app.logger.exception("writing request profile failed")
+            return None
+        return name
+
+    def _prune(self, state):
+        names = sorted(
+            entry for entry in os.listdir(state["dir"]) if entry.endswith((".prof", ".collapsed"))
+        )
+        for old in names[:max(0, len(names) - state["max_files"])]:
+            try:
+                os.remove(os.path.join(state["dir"], old))
+            except FileNotFoundError:
+                pass
+
+
+request_profiler = RequestProfiler()
@@ -0,0 +1,115 @@
+from functools import wraps
+import random
+import time
+
+from flask import current_app, g, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy.engine import make_url
+from sqlalchemy.sql import Select
+
+
+# Methods that never count as a write for read-your-writes stickiness
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class RoutingSession(Session):
+    """Sends the SELECTs of ``@read_replica`` views to the request's replica.
+
+    Everything else (flushes, Core writes, SELECT ... FOR UPDATE, and all
+    statements outside such views) goes to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and has_request_context()
+            and g.get("replica_bind")
+            and not self._flushing
+            and isinstance(clause, Select)
+            and clause._for_update_arg is None
+        ):
+            return self._db.engines[g.replica_bind]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class Replicas:
+    """Engine set-up: pool tuning for every engine, plus optional read replicas.
+
+    Must be initialised before ``db.init_app``, which reads the binds and
+    engine options it sets. Each URL in ``REPLICA_DATABASE_URLS`` becomes a
+    ``replica_<n>`` bind. Views marked ``@read_replica`` run their SELECTs on
+    one replica picked at random per request, except for a user who has made
+    a write of their own in the last ``REPLICA_STICKY_SECONDS`` (tracked in
+    the session cookie, so it holds across processes): their reads stay on
+    the primary so they see their own changes. Reads by other users can lag
+    by the replication delay.
+    """
+
+    def init_app(self, app):
+        urls = [url for url in app.config["REPLICA_DATABASE_URLS"] if url]
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+            **_pool_options(app.config, app.config["SQLALCHEMY_DATABASE_URI"]),
+            **app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}),
+        }
+        binds = dict(app.config.get("SQLALCHEMY_BINDS") or {})
+        for i, url in enumerate(urls):
+            binds[f"replica_{i}"] = {"url": url, **_pool_options(app.config, url)}
+        app.config["SQLALCHEMY_BINDS"] = binds
+
+        app.extensions["replicas"] = {
+            "binds": [f"replica_{i}" for i in range(len(urls))],
+            "sticky": app.config["REPLICA_STICKY_SECONDS"],
+        }
+        if urls:
+            app.after_request(self._after_request)
+
+    def _after_request(self, response):
+        if request.method not in SAFE_METHODS and response.status_code < 400 and session.get("user_id"):
+            session["primary_until"] = int(time.time()) + self._state()["sticky"]
+        return response
+
+    def _state(self):
+        return current_app.extensions["replicas"]
+
+    def choose(self):
+        """The replica bind for this request, or None to stay on the primary."""
+        state = self._state()
+        if not state["binds"]:
+            return None
+        if session.get("primary_until", 0) > time.time():
+            return None
+        return random.choice(state["binds"])
+
+
+def _pool_options(config, url):
+    options = {"pool_recycle": config["DB_POOL_RECYCLE"], "pool_pre_ping": config["DB_POOL_PRE_PING"]}
+    if not url:
+        return options
+    parsed = make_url(url)
+    # In-memory SQLite uses a single shared connection with no pool to size.
+    if parsed.get_backend_name() != "sqlite" or parsed.database not in (None, "", ":memory:"):
+        options.update(
+            pool_size=config["DB_POOL_SIZE"],
+            max_overflow=config["DB_MAX_OVERFLOW"],
+            pool_timeout=config["DB_POOL_TIMEOUT"],
+        )
+    return options
+
+
+replicas = Replicas()
+
+
+def read_replica(view):
+    """Run the view's reads on a replica when one is configured."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.replica_bind = replicas.choose()
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def read_engine():
+    """Engine for Core reads in this request: its replica, if routed to one."""
+    db = current_app.extensions["sqlalchemy"]
+    bind = g.get("replica_bind") if has_request_context() else None
+    return db.engines[bind] if bind else db.engine
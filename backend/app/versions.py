@@ -0,0 +1,74 @@
+from functools import wraps
+import hashlib
+import secrets
+import threading
+import time
+
+from flask import current_app, request, session
+
+
+class Versions:
+    """In-process version counters behind weak ETags on polled GET endpoints.
+
+    Write paths ``bump`` the keys whose responses they change (a class's
+    sessions, a teacher's or a student's class list). A tag hashes those
+    counters with the caller, the query string, a random per-process epoch
+    and an ``ETAG_MAX_AGE_SECONDS`` time bucket. Another process's writes are
+    invisible to this process's counters, so the bucket bounds how long a
+    tag can stay valid; within one process a change is seen immediately.
+    """
+
+    def init_app(self, app):
+        app.extensions["versions"] = {
+            "counters": {},
+            "lock": threading.Lock(),
+            "epoch": secrets.token_hex(8),
+        }
+
+    def _state(self):
+        return current_app.extensions["versions"]
+
+    def bump(self, *key):
+        state = self._state()
+        with state["lock"]:
+            state["counters"][key] = state["counters"].get(key, 0) + 1
+
+    def etag(self, keys):
+        state = self._state()
+        bucket = int(time.time() // current_app.config["ETAG_MAX_AGE_SECONDS"])
+        parts = [state["epoch"], str(bucket), str(session.get("user_id")), request.full_path]
+        parts.extend(f"{key}={state['counters'].get(key, 0)}" for key in keys)
+        return hashlib.sha256("|".join(map(str, parts)).encode()).hexdigest()[:32]
+
+
+versions = Versions()
+
+
+def conditional(scope):
+    """Answer matching If-None-Match requests with 304 before the view runs.
+
+    ``scope(*args, **kwargs)`` returns the version keys of the response from
+    the request alone (no database), or None to skip caching, e.g. when the
+    caller is not logged in and the view will reject it.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            keys = scope(*args, **kwargs)
+            if keys is None:
+                return view(*args, **kwargs)
+
+            tag = versions.etag(keys)
+            if request.if_none_match.contains_weak(tag):
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(tag, weak=True)
+            # Browsers revalidate on every poll instead of reusing silently.
+            response.headers["Cache-Control"] = "private, no-cache"
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,68 @@
+"""Steady-state dashboard polling with and without conditional GETs.
+
+    python benchmarks/bench_conditional.py --polls 2000
+
+Polls /attendance/active, /classes and /auth/me as an enrolled student, first
+plainly and then sending back the ETag of the previous response, and reports
+SQL statements, response bytes and latency per poll.
+"""
+import argparse
+import json
+import time
+
+from sqlalchemy import event
+
+from seed import database_url, logged_in_client, make_app, seed_class, seed_session, seed_users
+from app.config import Config
+from app.extensions import db
+
+
+ENDPOINTS = ["/attendance/active?class_id=1", "/classes", "/auth/me"]
+
+
+def poll(client, url, polls, conditional, statements):
+    etag = None
+    body_bytes = 0
+    before = statements[0]
+    started = time.perf_counter()
+    for _ in range(polls):
+        headers = {"If-None-Match": etag} if conditional and etag else {}
+        response = client.get(url, headers=headers)
+        etag = response.headers.get("ETag", etag)
+        body_bytes += len(response.data)
+    elapsed = time.perf_counter() - started
+    return {
+        "sql_per_poll": round((statements[0] - before) / polls, 2),
+        "bytes_per_poll": round(body_bytes / polls, 1),
+        "ms_per_poll": round(elapsed / polls * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--polls", type=int, default=2000)
+    args = parser.parse_args()
+
+    app = make_app(Config, database_url("conditional"))
+    with app.app_context():
+        with db.engine.begin() as conn:
+            teacher_id = seed_users(conn, 1, role="teacher")[0]
+            student_id = seed_users(conn, 1, start_id=teacher_id + 1)[0]
+            seed_class(conn, 1, teacher_id, [student_id])
+            seed_session(conn, 1, 1, teacher_id)
+
+        statements = [0]
+        event.listen(db.engine, "before_cursor_execute", lambda *a: statements.__setitem__(0, statements[0] + 1))
+
+    client = logged_in_client(app, student_id, "student")
+    results = {}
+    for url in ENDPOINTS:
+        results[url] = {
+            "plain": poll(client, url, args.polls, False, statements),
+            "if_none_match": poll(client, url, args.polls, True, statements),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
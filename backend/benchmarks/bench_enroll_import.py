@@ -0,0 +1,70 @@
+"""Bulk roster import against one enroll request per student.
+
+    python benchmarks/bench_enroll_import.py --students 50000 --sample 500
+
+Seeds --students students, imports all of them into one class with a single
+CSV upload to POST /classes/<id>/enrollments, and reports wall time and SQL
+statements. For comparison, --sample of them enroll in a second class one
+POST /classes/<id>/enroll at a time, extrapolated to the full roster.
+"""
+import argparse
+import json
+import time
+
+from sqlalchemy import event
+
+from seed import database_url, logged_in_client, make_app, seed_class, seed_users
+from app.config import Config
+from app.extensions import db
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=50000)
+    parser.add_argument("--sample", type=int, default=500)
+    args = parser.parse_args()
+
+    app = make_app(Config, database_url("enroll-import"))
+    with app.app_context():
+        with db.engine.begin() as conn:
+            teacher_id = seed_users(conn, 1, role="teacher")[0]
+            students = seed_users(conn, args.students, start_id=teacher_id + 1)
+            seed_class(conn, 1, teacher_id, [])
+            seed_class(conn, 2, teacher_id, [])
+
+        statements = [0]
+        event.listen(db.engine, "before_cursor_execute", lambda *a: statements.__setitem__(0, statements[0] + 1))
+
+    roster = "email\n" + "".join(f"student{sid}@bench.local\n" for sid in students)
+    teacher = logged_in_client(app, teacher_id, "teacher")
+    started = time.perf_counter()
+    response = teacher.post("/classes/1/enrollments", data=roster, content_type="text/csv")
+    bulk_seconds = time.perf_counter() - started
+    assert response.status_code == 200, response.json
+    bulk_statements = statements[0]
+
+    before = statements[0]
+    started = time.perf_counter()
+    for sid in students[:args.sample]:
+        logged_in_client(app, sid, "student").post("/classes/2/enroll")
+    single_seconds = (time.perf_counter() - started) / args.sample
+    single_statements = (statements[0] - before) / args.sample
+
+    print(json.dumps({
+        "students": args.students,
+        "bulk": {
+            "seconds": round(bulk_seconds, 2),
+            "statements": bulk_statements,
+            "counts": response.json["counts"],
+            "response_bytes": len(response.data),
+        },
+        "per_student_requests": {
+            "ms_each": round(single_seconds * 1000, 2),
+            "statements_each": round(single_statements, 1),
+            "extrapolated_seconds": round(single_seconds * args.students, 1),
+        },
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
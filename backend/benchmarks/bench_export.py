@@ -0,0 +1,84 @@
+"""Peak memory and throughput of GET /attendance/export as the export grows.
+
+    python benchmarks/bench_export.py --records 50 500000
+
+Seeds one class with one session per 1,000 records, then streams the whole
+class as CSV and NDJSON through the test client without buffering the body.
+Peak Python heap (tracemalloc) should stay flat across sizes.
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+from seed import database_url, insert_rows, logged_in_client, make_app, seed_class, seed_session, seed_users
+from app.config import Config
+from app.extensions import db
+from app.models.attendance_record import AttendanceRecord
+
+
+SESSION_SIZE = 1000
+
+
+def consume(client, url):
+    response = client.get(url, buffered=False)
+    size = sum(len(chunk) for chunk in response.response)
+    response.close()
+    return size
+
+
+def run(records):
+    app = make_app(Config, database_url(f"export-{records}"))
+    sessions = max(1, -(-records // SESSION_SIZE))
+    with app.app_context():
+        with db.engine.begin() as conn:
+            teacher_id = seed_users(conn, 1, role="teacher")[0]
+            students = seed_users(conn, min(records, SESSION_SIZE), start_id=teacher_id + 1)
+            seed_class(conn, 1, teacher_id, students)
+            for session_id in range(1, sessions + 1):
+                seed_session(conn, session_id, 1, teacher_id, active=False)
+            insert_rows(conn, AttendanceRecord.__table__, [
+                {
+                    "student_id": students[i % len(students)],
+                    "session_id": i // SESSION_SIZE + 1,
+                    "status": "present",
+                    "device_signature": f"{i:064x}",
+                    "ip_prefix": "10.0.0",
+                }
+                for i in range(records)
+            ])
+
+    client = logged_in_client(app, teacher_id, "teacher")
+    results = {"records": records}
+    for fmt in ("csv", "ndjson"):
+        url = f"/attendance/export?class_id=1&format={fmt}"
+
+        started = time.perf_counter()
+        size = consume(client, url)
+        elapsed = time.perf_counter() - started
+
+        # Separate pass: tracing slows every allocation down.
+        tracemalloc.start()
+        consume(client, url)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        results[fmt] = {
+            "bytes": size,
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(records / elapsed),
+            "peak_heap_mb": round(peak / 2**20, 2),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, nargs="+", default=[50, 500000])
+    args = parser.parse_args()
+
+    print(json.dumps([run(records) for records in args.records], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Commits per second for /attendance/submit with and without group commit.
+
+    python benchmarks/bench_group_commit.py --students 2000 --threads 64
+
+Every student of one class submits once from a pool of client threads. The
+script counts COMMITs on the engine and reports commits/s, submissions/s and
+the average number of rows per commit for both modes.
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import event
+
+from seed import (
+    database_url, logged_in_client, make_app, seed_class, seed_session,
+    seed_users, submit_payload,
+)
+from app.config import Config
+from app.extensions import db
+
+
+def run(mode, args):
+    class BenchConfig(Config):
+        ATTENDANCE_GROUP_COMMIT = mode == "group"
+        ATTENDANCE_FLUSH_SIZE = args.flush_size
+        ATTENDANCE_FLUSH_INTERVAL_MS = args.flush_interval_ms
+
+    app = make_app(BenchConfig, database_url(f"group_commit_{mode}"))
+    with app.app_context():
+        with db.engine.begin() as conn:
+            teacher_id = seed_users(conn, 1, role="teacher")[0]
+            students = seed_users(conn, args.students, start_id=teacher_id + 1)
+            seed_class(conn, 1, teacher_id, students)
+            seed_session(conn, 1, 1, teacher_id)
+
+        commits = [0]
+        lock = threading.Lock()
+
+        def on_commit(conn):
+            with lock:
+                commits[0] += 1
+
+        event.listen(db.engine, "commit", on_commit)
+
+    clients = [logged_in_client(app, sid, "student") for sid in students]
+
+    def submit(pair):
+        student_id, client = pair
+        return client.post("/attendance/submit", json=submit_payload(1, student_id)).status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        statuses = list(pool.map(submit, zip(students, clients)))
+    elapsed = time.perf_counter() - started
+
+    accepted = statuses.count(201)
+    return {
+        "mode": mode,
+        "submissions": len(statuses),
+        "accepted": accepted,
+        "seconds": round(elapsed, 3),
+        "commits": commits[0],
+        "commits_per_second": round(commits[0] / elapsed, 1),
+        "submissions_per_second": round(accepted / elapsed, 1),
+        "rows_per_commit": round(accepted / commits[0], 2) if commits[0] else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--flush-size", type=int, default=Config.ATTENDANCE_FLUSH_SIZE)
+    parser.add_argument("--flush-interval-ms", type=int, default=Config.ATTENDANCE_FLUSH_INTERVAL_MS)
+    args = parser.parse_args()
+
+    results = [run("direct", args), run("group", args)]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
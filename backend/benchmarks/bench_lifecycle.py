@@ -0,0 +1,131 @@
+"""Cost of sessions that were never ended, and of closing them in bulk.
+
+    python benchmarks/bench_lifecycle.py --classes 200 --sessions 50
+
+Seeds --classes classes, each with --sessions past sessions whose ends_at has
+passed but which are still is_active (nobody called /attendance/end), plus one
+running session. Times GET /attendance/active and the scheduler's sweep query
+with the backlog in place, then closes the backlog with close_expired() (bulk
+UPDATEs) and times the same requests again. For comparison, a copy of the
+backlog is closed one close_session() call at a time.
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, func, select
+
+from seed import SESSION_CODE, database_url, insert_rows, logged_in_client, make_app, seed_class, seed_users
+from app.attendance.lifecycle import close_expired
+from app.attendance.rollups import close_session
+from app.config import Config
+from app.extensions import db
+from app.models.attendance_session import AttendanceSession
+
+
+def seed_backlog(conn, classes, sessions, teacher_id, first_id):
+    now = datetime.now()
+    rows = []
+    session_id = first_id
+    for class_id in classes:
+        for i in range(sessions):
+            starts = now - timedelta(days=sessions - i, hours=1)
+            rows.append({
+                "id": session_id, "class_id": class_id, "created_by": teacher_id,
+                "starts_at": starts, "ends_at": starts + timedelta(hours=1),
+                "attendance_code": SESSION_CODE, "is_active": True,
+            })
+            session_id += 1
+        # The one that is actually running
+        rows.append({
+            "id": session_id, "class_id": class_id, "created_by": teacher_id,
+            "starts_at": now - timedelta(minutes=5), "ends_at": now + timedelta(hours=2),
+            "attendance_code": SESSION_CODE, "is_active": True,
+        })
+        session_id += 1
+    insert_rows(conn, AttendanceSession.__table__, rows)
+    return session_id
+
+
+def measure(app, teacher, class_ids, rounds=200):
+    started = time.perf_counter()
+    for i in range(rounds):
+        response = teacher.get(f"/attendance/active?class_id={class_ids[i % len(class_ids)]}")
+        assert response.status_code == 200
+    active_ms = (time.perf_counter() - started) / rounds * 1000
+
+    with app.app_context():
+        sweep = select(AttendanceSession.id).where(
+            AttendanceSession.is_active.is_(True), AttendanceSession.ends_at <= datetime.now()
+        )
+        with db.engine.connect() as conn:
+            active_rows = conn.execute(
+                select(func.count()).where(AttendanceSession.is_active.is_(True))
+            ).scalar()
+            started = time.perf_counter()
+            for _ in range(20):
+                conn.execute(sweep).all()
+            sweep_ms = (time.perf_counter() - started) / 20 * 1000
+    return {"active_rows": active_rows, "ms_per_active_request": round(active_ms, 3), "ms_per_sweep_query": round(sweep_ms, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--classes", type=int, default=200)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--students", type=int, default=30, help="Enrolled per class (rollup rows touched per close).")
+    args = parser.parse_args()
+
+    app = make_app(Config, database_url("lifecycle"))
+    class_ids = list(range(1, args.classes + 1))
+    with app.app_context():
+        with db.engine.begin() as conn:
+            teacher_id = seed_users(conn, 1, role="teacher")[0]
+            students = seed_users(conn, args.students, start_id=teacher_id + 1)
+            for class_id in class_ids:
+                seed_class(conn, class_id, teacher_id, students)
+            next_id = seed_backlog(conn, class_ids, args.sessions, teacher_id, 1)
+
+        statements = [0]
+        event.listen(db.engine, "before_cursor_execute", lambda *a: statements.__setitem__(0, statements[0] + 1))
+
+    teacher = logged_in_client(app, teacher_id, "teacher")
+    before = measure(app, teacher, class_ids)
+
+    with app.app_context():
+        statements[0] = 0
+        started = time.perf_counter()
+        closed = close_expired()
+        bulk = {"closed": len(closed), "seconds": round(time.perf_counter() - started, 3), "statements": statements[0]}
+
+    after = measure(app, teacher, class_ids)
+
+    # The same backlog again, closed the way /attendance/end does it, one by one.
+    with app.app_context():
+        with db.engine.begin() as conn:
+            first, last = next_id, seed_backlog(conn, class_ids, args.sessions, teacher_id, next_id)
+        ids = [row.id for row in db.session.execute(
+            select(AttendanceSession.id).where(
+                AttendanceSession.id >= first, AttendanceSession.id < last,
+                AttendanceSession.ends_at <= datetime.now()
+            )
+        )]
+        db.session.rollback()
+        statements[0] = 0
+        started = time.perf_counter()
+        with db.engine.begin() as conn:
+            for session_id in ids:
+                close_session(conn, session_id)
+        one_by_one = {"closed": len(ids), "seconds": round(time.perf_counter() - started, 3), "statements": statements[0]}
+
+    print(json.dumps({
+        "before_sweep": before,
+        "after_sweep": after,
+        "close_expired": bulk,
+        "close_session_each": one_by_one,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
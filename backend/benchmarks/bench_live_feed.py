@@ -0,0 +1,108 @@
+"""Fan-out of the live attendance feed to many watchers of one session.
+
+    python benchmarks/bench_live_feed.py --watchers 200 --students 500
+
+Opens --watchers SSE streams on one session, then submits --students
+attendances and measures, per event and watcher, the delay from the
+submission returning to the watcher receiving it. Also counts the SQL
+statements run while the streams are open, so per-watcher database work shows
+up as a number that grows with --watchers.
+"""
+import argparse
+import json
+import threading
+import time
+
+from sqlalchemy import event
+
+from seed import (
+    database_url, logged_in_client, make_app, seed_class, seed_session, seed_users, submit_payload,
+)
+from app.config import Config
+from app.extensions import db
+
+
+class BenchConfig(Config):
+    LIVE_FEED_BUFFER = 100000
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--watchers", type=int, default=200)
+    parser.add_argument("--students", type=int, default=500)
+    args = parser.parse_args()
+
+    app = make_app(BenchConfig, database_url("live_feed"))
+    with app.app_context():
+        with db.engine.begin() as conn:
+            teacher_id = seed_users(conn, 1, role="teacher")[0]
+            students = seed_users(conn, args.students, start_id=teacher_id + 1)
+            seed_class(conn, 1, teacher_id, students)
+            seed_session(conn, 1, 1, teacher_id)
+
+    submitted_at = {}
+    received = []
+    ready = threading.Barrier(args.watchers + 1)
+
+    def watch():
+        client = logged_in_client(app, teacher_id, "teacher")
+        response = client.get("/attendance/session/1/stream", buffered=False)
+        chunks = iter(response.response)
+        next(chunks)  # retry hint, sent once subscribed
+        ready.wait()
+        for chunk in chunks:
+            now = time.perf_counter()
+            for line in chunk.decode().splitlines():
+                if line.startswith("data:") and '"student_id"' in line:
+                    # Matched to the submit time afterwards: the event can
+                    # arrive before the submitting request has returned.
+                    received.append((json.loads(line[5:])["student_id"], now))
+            if b"event: ended" in chunk:
+                break
+        response.close()
+
+    threads = [threading.Thread(target=watch, daemon=True) for _ in range(args.watchers)]
+    for thread in threads:
+        thread.start()
+    ready.wait()
+
+    statements = [0]
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", lambda *a: statements.__setitem__(0, statements[0] + 1))
+
+    started = time.perf_counter()
+    for sid in students:
+        client = logged_in_client(app, sid, "student")
+        client.post("/attendance/submit", json=submit_payload(1, sid))
+        submitted_at[sid] = time.perf_counter()
+    elapsed = time.perf_counter() - started
+
+    teacher = logged_in_client(app, teacher_id, "teacher")
+    teacher.post("/attendance/end", json={"attendance_session_id": 1})
+    for thread in threads:
+        thread.join(30)
+
+    expected = args.watchers * args.students
+    received = [now - submitted_at[student_id] for student_id, now in received]
+    print(json.dumps({
+        "watchers": args.watchers,
+        "records": args.students,
+        "deliveries": len(received),
+        "missing": expected - len(received),
+        "submissions_per_second": round(args.students / elapsed),
+        "delivery_ms": {
+            "p50": round(percentile(received, 50) * 1000, 2),
+            "p99": round(percentile(received, 99) * 1000, 2),
+        },
+        "sql_statements": statements[0],
+        "sql_statements_per_record": round(statements[0] / args.students, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
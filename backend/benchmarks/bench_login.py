@@ -0,0 +1,103 @@
+"""Login storm with inline password hashing versus the bounded process pool.
+
+    python benchmarks/bench_login.py --threads 32 --seconds 10 --workers 4
+
+Runs --threads closed-loop clients against /auth/login for --seconds while one
+bystander thread polls /auth/me, once with hashing on the request threads and
+once with PASSWORD_HASH_WORKERS=--workers. Reports login throughput, login
+latency percentiles, 503s from admission control (clients wait Retry-After
+before trying again), and the bystander's latency, which is what the rest of
+the API sees during a storm.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+
+from werkzeug.security import generate_password_hash
+
+from seed import PASSWORD, database_url, logged_in_client, make_app, seed_users
+from app.config import Config
+from app.extensions import db
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * pct / 100))] * 1000, 1)
+
+
+def run(workers, threads, seconds, max_pending):
+    class BenchConfig(Config):
+        PASSWORD_HASH_WORKERS = workers
+        PASSWORD_HASH_MAX_PENDING = max_pending
+
+    app = make_app(BenchConfig, database_url(f"login-{workers}"))
+    with app.app_context():
+        with db.engine.begin() as conn:
+            # One hash for everyone: verifying costs the same and seeding stays fast.
+            students = seed_users(conn, threads, password_hash=generate_password_hash(PASSWORD))
+
+    # Warm the pool so process start-up is not part of the storm.
+    app.test_client().post("/auth/login", json={"email": f"student{students[0]}@bench.local", "password": PASSWORD})
+
+    logins, statuses, bystander = [], [], []
+    stop = time.perf_counter() + seconds
+
+    def storm(student_id):
+        client = app.test_client()
+        body = {"email": f"student{student_id}@bench.local", "password": PASSWORD}
+        while time.perf_counter() < stop:
+            started = time.perf_counter()
+            response = client.post("/auth/login", json=body)
+            statuses.append(response.status_code)
+            if response.status_code == 200:
+                logins.append(time.perf_counter() - started)
+            elif response.status_code == 503:
+                # Back off as told, like a browser retry would.
+                time.sleep(float(response.headers.get("Retry-After", 1)))
+
+    def watch():
+        client = logged_in_client(app, students[0], "student")
+        while time.perf_counter() < stop:
+            started = time.perf_counter()
+            client.get("/auth/me")
+            bystander.append(time.perf_counter() - started)
+            time.sleep(0.01)
+
+    pool = [threading.Thread(target=storm, args=(sid,)) for sid in students]
+    pool.append(threading.Thread(target=watch))
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+
+    return {
+        "hash_workers": workers,
+        "logins_per_second": round(len(logins) / seconds, 1),
+        "login_ms": {"p50": percentile(logins, 50), "p99": percentile(logins, 99)},
+        "rejected_503": statuses.count(503),
+        "bystander_ms": {"p50": percentile(bystander, 50), "p99": percentile(bystander, 99)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--max-pending", type=int, default=32)
+    args = parser.parse_args()
+
+    print(json.dumps({
+        "threads": args.threads,
+        "cpus": os.cpu_count(),
+        "inline": run(0, args.threads, args.seconds, args.max_pending),
+        "pool": run(args.workers, args.threads, args.seconds, args.max_pending),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Overhead of the request/SQL metrics, to check they can stay on in production.
+
+    python benchmarks/bench_metrics.py --requests 3000
+
+Runs the same mix (GET /attendance/active, the records listing and
+POST /attendance/submit) with METRICS_ENABLED off and on, alternating rounds so
+drift affects both alike, and reports the time per request, the difference,
+the cost added to each SQL statement (timed on SELECT 1 outside a request, the
+cheapest statement there is), and how long one scrape of /metrics takes.
+"""
+import argparse
+import json
+import time
+
+from seed import database_url, logged_in_client, make_app, seed_class, seed_session, seed_users, submit_payload
+from app.config import Config
+from app.extensions import db
+
+
+def build(enabled):
+    class BenchConfig(Config):
+        METRICS_ENABLED = enabled
+        METRICS_TOKEN = "benchmark-token"
+
+    app = make_app(BenchConfig, database_url(f"metrics-{enabled}"))
+    with app.app_context():
+        with db.engine.begin() as conn:
+            teacher_id = seed_users(conn, 1, role="teacher")[0]
+            students = seed_users(conn, 20000, start_id=teacher_id + 1)
+            seed_class(conn, 1, teacher_id, students)
+            seed_session(conn, 1, 1, teacher_id)
+    return app, logged_in_client(app, teacher_id, "teacher"), students
+
+
+def run_round(app, teacher, students, count):
+    started = time.perf_counter()
+    for i in range(count):
+        kind = i % 3
+        if kind == 0:
+            teacher.get("/attendance/active?class_id=1")
+        elif kind == 1:
+            teacher.get("/attendance/session/1/records")
+        else:
+            student_id = students.pop()
+            response = logged_in_client(app, student_id, "student").post(
+                "/attendance/submit", json=submit_payload(1, student_id)
+            )
+            assert response.status_code == 201, response.json
+    return time.perf_counter() - started
+
+
+def statement_us(app, count=20000):
+    with app.app_context(), db.engine.connect() as conn:
+        started = time.perf_counter()
+        for _ in range(count):
+            conn.exec_driver_sql("SELECT 1")
+        return (time.perf_counter() - started) / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    setups = {enabled: build(enabled) for enabled in (False, True)}
+    totals = {False: 0.0, True: 0.0}
+    per_round = args.requests // args.rounds
+    for _ in range(args.rounds):
+        for enabled, (app, teacher, students) in setups.items():
+            totals[enabled] += run_round(app, teacher, students, per_round)
+
+    statement = {enabled: statement_us(app) for enabled, (app, _, _) in setups.items()}
+
+    app, teacher, _ = setups[True]
+    started = time.perf_counter()
+    for _ in range(100):
+        body = app.test_client().get("/metrics", headers={"Authorization": "Bearer benchmark-token"}).get_data()
+    scrape_ms = (time.perf_counter() - started) / 100 * 1000
+
+    off, on = (totals[flag] / (per_round * args.rounds) * 1e6 for flag in (False, True))
+    print(json.dumps({
+        "requests": per_round * args.rounds,
+        "us_per_request_off": round(off, 1),
+        "us_per_request_on": round(on, 1),
+        "overhead_us": round(on - off, 1),
+        "overhead_pct": round((on - off) / off * 100, 1),
+        "us_per_statement_off": round(statement[False], 2),
+        "us_per_statement_on": round(statement[True], 2),
+        "scrape_ms": round(scrape_ms, 2),
+        "scrape_bytes": len(body),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Per-page latency of the keyset-paged records listing at increasing depth.
+
+    python benchmarks/bench_pagination.py --records 200000 --limit 100
+
+Seeds one session with --records records and walks every page of
+GET /attendance/session/<id>/records through the test client. Reports the
+median page latency at the start, middle and end of the walk, next to the same
+pages fetched with LIMIT/OFFSET, and the bare keyset query, for comparison.
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_, select
+
+from seed import database_url, insert_rows, logged_in_client, make_app, seed_class, seed_session, seed_users
+from app.config import Config
+from app.extensions import db
+from app.models.attendance_record import AttendanceRecord
+
+
+def median_ms(samples):
+    return round(statistics.median(samples) * 1000, 3)
+
+
+def timed(conn, stmt, repeat=5):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        conn.execute(stmt).all()
+        samples.append(time.perf_counter() - started)
+    return median_ms(samples)
+
+
+def after(stmt, record_id):
+    # Same predicate as the records route
+    if record_id is None:
+        return stmt
+    anchor = select(AttendanceRecord.marked_at).where(AttendanceRecord.id == record_id).scalar_subquery()
+    return stmt.where(
+        AttendanceRecord.marked_at >= anchor,
+        or_(AttendanceRecord.marked_at > anchor, AttendanceRecord.id > record_id)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=200000)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    app = make_app(Config, database_url("pagination"))
+    start = datetime(2026, 1, 5, 9, 0)
+    with app.app_context():
+        with db.engine.begin() as conn:
+            teacher_id = seed_users(conn, 1, role="teacher")[0]
+            students = seed_users(conn, args.records, start_id=teacher_id + 1)
+            seed_class(conn, 1, teacher_id, [])
+            seed_session(conn, 1, 1, teacher_id)
+            insert_rows(conn, AttendanceRecord.__table__, [
+                {
+                    "student_id": sid,
+                    "session_id": 1,
+                    "status": "present",
+                    "device_signature": f"{sid:064x}",
+                    # Several records per second, so the id tie-break is exercised
+                    "marked_at": start + timedelta(seconds=i // 4),
+                }
+                for i, sid in enumerate(students)
+            ])
+
+    client = logged_in_client(app, teacher_id, "teacher")
+    keyset = []
+    cursors = [None]
+    cursor = None
+    while True:
+        url = f"/attendance/session/1/records?limit={args.limit}" + (f"&cursor={cursor}" if cursor else "")
+        started = time.perf_counter()
+        body = client.get(url).get_json()
+        keyset.append(time.perf_counter() - started)
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+        cursors.append(body["records"][-1]["id"])
+
+    pages = len(keyset)
+    probes = {"first": 0, "middle": pages // 2, "last": pages - 1}
+    offset, keyset_query = {}, {}
+    with app.app_context():
+        with db.engine.connect() as conn:
+            for name, page in probes.items():
+                base = (
+                    select(AttendanceRecord)
+                    .where(AttendanceRecord.session_id == 1)
+                    .order_by(AttendanceRecord.marked_at, AttendanceRecord.id)
+                    .limit(args.limit)
+                )
+                offset[name] = timed(conn, base.offset(page * args.limit))
+                keyset_query[name] = timed(conn, after(base, cursors[page]))
+
+    window = max(1, min(10, pages // 10))
+    print(json.dumps({
+        "records": args.records,
+        "pages": pages,
+        "keyset_page_ms": {
+            "first": median_ms(keyset[:window]),
+            "middle": median_ms(keyset[pages // 2:pages // 2 + window]),
+            "last": median_ms(keyset[-window:]),
+        },
+        "keyset_query_ms": keyset_query,
+        "offset_query_ms": offset,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
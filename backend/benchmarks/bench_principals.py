@@ -0,0 +1,67 @@
+"""Per-request cost of resolving the logged-in user, with and without the cache.
+
+    python benchmarks/bench_principals.py --polls 2000
+
+Polls /auth/me, /classes and /attendance/active as an enrolled student with
+PRINCIPAL_CACHE_SIZE=0 (every request loads the user) and with the default
+cache, and reports SQL statements and latency per request. No ETags are sent,
+so every request runs its view.
+"""
+import argparse
+import json
+import time
+
+from sqlalchemy import event
+
+from seed import database_url, logged_in_client, make_app, seed_class, seed_session, seed_users
+from app.config import Config
+from app.extensions import db
+
+
+ENDPOINTS = ["/auth/me", "/classes", "/attendance/active?class_id=1"]
+
+
+def run(cache_size, polls):
+    class BenchConfig(Config):
+        PRINCIPAL_CACHE_SIZE = cache_size
+
+    app = make_app(BenchConfig, database_url(f"principals-{cache_size}"))
+    with app.app_context():
+        with db.engine.begin() as conn:
+            teacher_id = seed_users(conn, 1, role="teacher")[0]
+            student_id = seed_users(conn, 1, start_id=teacher_id + 1)[0]
+            seed_class(conn, 1, teacher_id, [student_id])
+            seed_session(conn, 1, 1, teacher_id)
+
+        statements = [0]
+        event.listen(db.engine, "before_cursor_execute", lambda *a: statements.__setitem__(0, statements[0] + 1))
+
+    client = logged_in_client(app, student_id, "student")
+    results = {}
+    for url in ENDPOINTS:
+        client.get(url)
+        before = statements[0]
+        started = time.perf_counter()
+        for _ in range(polls):
+            client.get(url)
+        elapsed = time.perf_counter() - started
+        results[url] = {
+            "sql_per_request": round((statements[0] - before) / polls, 2),
+            "ms_per_request": round(elapsed / polls * 1000, 3),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--polls", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(json.dumps({
+        "uncached": run(0, args.polls),
+        "cached": run(Config.PRINCIPAL_CACHE_SIZE, args.polls),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Cost of the request profiler when it is off, armed, and profiling.
+
+    python benchmarks/bench_profiler.py --requests 2000
+
+Times GET /attendance/session/<id>/records (a listing over a few hundred
+records) with no profiler configured, with PROFILE_TOKEN set but no X-Profile
+header (the path every production request takes), and with every request
+profiled in "sample" and in "cprofile" mode.
+"""
+import argparse
+import json
+import tempfile
+import time
+
+from seed import database_url, logged_in_client, make_app, seed_class, seed_session, seed_users, submit_payload
+from app.config import Config
+from app.extensions import db
+
+
+def run(label, count, headers=None, **settings):
+    class BenchConfig(Config):
+        PROFILE_DIR = tempfile.mkdtemp(prefix="attendsure-profiles-")
+
+    for key, value in settings.items():
+        setattr(BenchConfig, key, value)
+
+    app = make_app(BenchConfig, database_url(f"profiler-{label}"))
+    with app.app_context():
+        with db.engine.begin() as conn:
+            teacher_id = seed_users(conn, 1, role="teacher")[0]
+            students = seed_users(conn, 300, start_id=teacher_id + 1)
+            seed_class(conn, 1, teacher_id, students)
+            seed_session(conn, 1, 1, teacher_id)
+    for student_id in students:
+        logged_in_client(app, student_id, "student").post("/attendance/submit", json=submit_payload(1, student_id))
+
+    teacher = logged_in_client(app, teacher_id, "teacher")
+    teacher.get("/attendance/session/1/records")
+    started = time.perf_counter()
+    for _ in range(count):
+        teacher.get("/attendance/session/1/records", headers=headers or {})
+    return round((time.perf_counter() - started) / count * 1e6, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    n = args.requests
+    print(json.dumps({"us_per_request": {
+        "not_configured": run("off", n),
+        "armed_no_header": run("armed", n, PROFILE_TOKEN="secret"),
+        "sample_every_request": run("sample", n // 10, {"X-Profile": "secret"}, PROFILE_TOKEN="secret", PROFILE_MODE="sample"),
+        "cprofile_every_request": run("cprofile", n // 10, {"X-Profile": "secret"}, PROFILE_TOKEN="secret", PROFILE_MODE="cprofile"),
+    }}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
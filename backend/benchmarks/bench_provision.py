@@ -0,0 +1,81 @@
+"""Bulk user provisioning against one /auth/signup request per user.
+
+    python benchmarks/bench_provision.py --users 400 --workers 4
+
+Provisions --users accounts from CSV rows with the configured
+PASSWORD_HASH_METHOD across --workers hashing processes, then signs up a
+--sample of other users one request at a time. Reports users per second,
+the extrapolated time for a 20k-student intake, and the most database
+connections checked out at once.
+"""
+import argparse
+import json
+import os
+import time
+
+from sqlalchemy import event
+
+from seed import database_url, make_app
+from app.auth.provisioning import provision
+from app.config import Config
+from app.extensions import db
+
+
+INTAKE = 20000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=400)
+    parser.add_argument("--sample", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    app = make_app(Config, database_url("provision"))
+    with app.app_context():
+        checked_out = [0, 0]
+
+        def checkout(*_):
+            checked_out[0] += 1
+            checked_out[1] = max(checked_out[1], checked_out[0])
+
+        def checkin(*_):
+            checked_out[0] -= 1
+
+        event.listen(db.engine, "checkout", checkout)
+        event.listen(db.engine, "checkin", checkin)
+
+        rows = [
+            (i + 2, {"name": f"Student {i}", "email": f"bulk{i}@bench.local", "password": f"pw-{i}", "role": "student"})
+            for i in range(args.users)
+        ]
+        started = time.perf_counter()
+        created, errors = provision(rows, app.config["PASSWORD_HASH_METHOD"], args.workers)
+        bulk_seconds = time.perf_counter() - started
+        assert created == args.users and not errors, errors
+
+    client = app.test_client()
+    started = time.perf_counter()
+    for i in range(args.sample):
+        response = client.post("/auth/signup", json={"name": f"Single {i}", "email": f"single{i}@bench.local", "password": f"pw-{i}"})
+        assert response.status_code == 201
+    single_seconds = (time.perf_counter() - started) / args.sample
+
+    print(json.dumps({
+        "cpus": os.cpu_count(),
+        "hash_method": app.config["PASSWORD_HASH_METHOD"],
+        "provision": {
+            "workers": args.workers,
+            "users_per_second": round(args.users / bulk_seconds, 1),
+            "intake_minutes": round(INTAKE * bulk_seconds / args.users / 60, 1),
+            "max_connections_checked_out": checked_out[1],
+        },
+        "signup_requests": {
+            "users_per_second": round(1 / single_seconds, 1),
+            "intake_minutes": round(INTAKE * single_seconds / 60, 1),
+        },
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""Check that the queries behind each route use an index, on a realistic dataset.
+
+    python benchmarks/bench_query_plans.py            # 10k students, 500 classes, ~1M records
+    python benchmarks/bench_query_plans.py --scale 0.1
+
+Seeds the database, then runs EXPLAIN (EXPLAIN QUERY PLAN on SQLite) for the
+query each route issues and times it. Exits non-zero when any of them falls
+back to a full table scan or a sort, so it can be used as a regression check.
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_, select, text
+
+from seed import database_url, insert_rows, make_app, seed_users
+from app.attendance.rollups import rebuild
+from app.config import Config
+from app.extensions import db
+from app.models.attendance_record import AttendanceRecord
+from app.models.attendance_session import AttendanceSession
+from app.models.class_model import Class
+from app.models.enrollment import Enrollment
+from app.models.attendance_rollup import AttendanceRollup
+
+
+PAGE = 100
+
+
+def seed(conn, students, classes, records, rng):
+    teachers = max(1, classes // 5)
+    student_ids = seed_users(conn, students)
+    teacher_ids = seed_users(conn, teachers, role="teacher", start_id=students + 1)
+
+    insert_rows(conn, Class.__table__, [
+        {
+            "id": c,
+            "name": f"Class {c}",
+            "teacher_id": teacher_ids[c % teachers],
+            "latitude": 28.5 + rng.random() / 10,
+            "longitude": 77.1 + rng.random() / 10,
+            "radius_meters": 60,
+            "is_active": True,
+        }
+        for c in range(1, classes + 1)
+    ])
+
+    # Every student takes a few classes; class sizes come out around
+    # students * per_student / classes.
+    per_student = 3
+    roster = {c: [] for c in range(1, classes + 1)}
+    enrollments = []
+    for sid in student_ids:
+        for c in rng.sample(range(1, classes + 1), per_student):
+            roster[c].append(sid)
+            enrollments.append({"student_id": sid, "class_id": c, "is_active": True})
+    insert_rows(conn, Enrollment.__table__, enrollments)
+
+    avg_class = max(1, len(enrollments) // classes)
+    sessions_per_class = max(1, records // (classes * avg_class))
+    start = datetime(2026, 1, 5, 9, 0)
+
+    sessions = []
+    rows = []
+    session_id = 0
+    for c in range(1, classes + 1):
+        teacher = teacher_ids[c % teachers]
+        for n in range(sessions_per_class):
+            session_id += 1
+            starts_at = start + timedelta(days=n, hours=c % 8)
+            sessions.append({
+                "id": session_id,
+                "class_id": c,
+                "created_by": teacher,
+                "starts_at": starts_at,
+                "ends_at": starts_at + timedelta(minutes=10),
+                "attendance_code": "CODE",
+                "is_active": n == sessions_per_class - 1,
+                "created_at": starts_at,
+            })
+            for sid in roster[c]:
+                rows.append({
+                    "student_id": sid,
+                    "session_id": session_id,
+                    "status": "present",
+                    "device_signature": f"{sid:064x}",
+                    "ip_prefix": "10.0.0",
+                    "marked_at": starts_at + timedelta(seconds=rng.randint(0, 600)),
+                })
+            if len(rows) >= 50000:
+                insert_rows(conn, AttendanceRecord.__table__, rows)
+                rows = []
+    insert_rows(conn, AttendanceSession.__table__, sessions)
+    insert_rows(conn, AttendanceRecord.__table__, rows)
+    rebuild(conn)
+
+    return {
+        "students": len(student_ids),
+        "teachers": len(teacher_ids),
+        "classes": classes,
+        "enrollments": len(enrollments),
+        "sessions": len(sessions),
+        "records": conn.execute(text("SELECT COUNT(*) FROM attendance_records")).scalar(),
+    }
+
+
+def route_queries(sample):
+    after_marked_at = select(AttendanceRecord.marked_at).where(
+        AttendanceRecord.id == sample["record_id"]
+    ).scalar_subquery()
+    return {
+        "attendance.submit / classes.enroll (enrollment lookup)": select(Enrollment).filter_by(
+            student_id=sample["student_id"], class_id=sample["class_id"]
+        ).limit(1),
+        "attendance.active (latest active session)": select(AttendanceSession).filter_by(
+            class_id=sample["class_id"], is_active=True
+        ).order_by(AttendanceSession.created_at.desc()).limit(1),
+        "classes.list (teacher page)": select(Class).where(
+            Class.teacher_id == sample["teacher_id"], Class.id > 0
+        ).order_by(Class.id).limit(PAGE),
+        "classes.list (student page)": select(Enrollment.class_id).where(
+            Enrollment.student_id == sample["student_id"], Enrollment.class_id > 0
+        ).distinct().order_by(Enrollment.class_id).limit(PAGE),
+        "classes.enrollments (class page)": select(Enrollment).where(
+            Enrollment.class_id == sample["class_id"], Enrollment.id > 0
+        ).order_by(Enrollment.id).limit(PAGE),
+        "classes.attendance_summary (class rollups)": select(AttendanceRollup).filter_by(
+            class_id=sample["class_id"]
+        ),
+        "attendance.records (session page)": select(AttendanceRecord).filter_by(
+            session_id=sample["session_id"]
+        ).where(
+            AttendanceRecord.marked_at >= after_marked_at,
+            or_(AttendanceRecord.marked_at > after_marked_at, AttendanceRecord.id > sample["record_id"])
+        ).order_by(AttendanceRecord.marked_at, AttendanceRecord.id).limit(PAGE),
+    }
+
+
+def explain(conn, stmt):
+    sql = str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "sqlite":
+        plan = [row[3] for row in conn.execute(text("EXPLAIN QUERY PLAN " + sql))]
+        bad = [
+            step for step in plan
+            if (step.startswith("SCAN") and "CONSTANT ROW" not in step) or "TEMP B-TREE" in step
+        ]
+    else:
+        plan = [dict(row._mapping) for row in conn.execute(text("EXPLAIN " + sql))]
+        bad = [
+            step for step in plan
+            if step.get("type") == "ALL" or "filesort" in (step.get("Extra") or "")
+        ]
+    return plan, bad
+
+
+def timed(conn, stmt, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        conn.execute(stmt).all()
+        samples.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(samples), 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    app = make_app(Config, database_url("query_plans"))
+
+    with app.app_context():
+        started = time.perf_counter()
+        with db.engine.begin() as conn:
+            dataset = seed(
+                conn,
+                students=int(10000 * args.scale),
+                classes=max(1, int(500 * args.scale)),
+                records=int(1000000 * args.scale),
+                rng=rng,
+            )
+        dataset["seed_seconds"] = round(time.perf_counter() - started, 1)
+
+        with db.engine.connect() as conn:
+            if conn.dialect.name == "sqlite":
+                conn.execute(text("ANALYZE"))
+            enrollment = conn.execute(select(Enrollment).limit(1)).first()
+            sample = {
+                "student_id": enrollment.student_id,
+                "class_id": enrollment.class_id,
+                "teacher_id": conn.execute(
+                    select(Class.teacher_id).where(Class.id == enrollment.class_id)
+                ).scalar(),
+                "session_id": conn.execute(
+                    select(AttendanceSession.id).where(AttendanceSession.class_id == enrollment.class_id)
+                ).scalar(),
+            }
+            # Resume from the middle of the session, as a deep page would
+            record_ids = conn.execute(
+                select(AttendanceRecord.id).where(AttendanceRecord.session_id == sample["session_id"])
+            ).scalars().all()
+            sample["record_id"] = record_ids[len(record_ids) // 2]
+
+            results = []
+            for name, stmt in route_queries(sample).items():
+                plan, bad = explain(conn, stmt)
+                results.append({
+                    "query": name,
+                    "uses_index": not bad,
+                    "median_ms": timed(conn, stmt, args.repeat),
+                    "plan": plan,
+                })
+
+    print(json.dumps({"dataset": dataset, "queries": results}, indent=2, default=str))
+    if not all(r["uses_index"] for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
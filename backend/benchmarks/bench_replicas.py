@@ -0,0 +1,118 @@
+"""Dashboard polling during a submit burst, on the primary and on a read replica.
+
+    python benchmarks/bench_replicas.py --students 3000 --threads 16 --pollers 8
+
+Seeds a primary SQLite file and copies it to a second file standing in for the
+replica (nothing replicates between them, which is fine for timing). Then runs
+--threads students submitting as fast as they can while --pollers teachers
+poll the records listing, once with every read on the primary and once with
+REPLICA_DATABASE_URLS pointing at the copy. Reports submits/s and the
+pollers' latency percentiles. Set BENCH_DATABASE_URL and REPLICA_URL to use
+real servers instead (the replica must already hold the same seed data).
+"""
+import argparse
+import json
+import os
+import shutil
+import threading
+import time
+
+from seed import database_url, logged_in_client, make_app, seed_class, seed_session, seed_users, submit_payload
+from app import create_app
+from app.config import Config
+from app.extensions import db
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * pct / 100))] * 1000, 2)
+
+
+def seed(students):
+    app = make_app(Config, database_url("replicas-primary"))
+    with app.app_context():
+        with db.engine.begin() as conn:
+            teacher_id = seed_users(conn, 1, role="teacher")[0]
+            ids = seed_users(conn, students, start_id=teacher_id + 1)
+            seed_class(conn, 1, teacher_id, ids)
+            seed_session(conn, 1, 1, teacher_id)
+        # Some records to list
+        for student_id in ids[:300]:
+            logged_in_client(app, student_id, "student").post("/attendance/submit", json=submit_payload(1, student_id))
+        url = str(db.engine.url)
+        db.engine.dispose()
+    return url, teacher_id, ids[300:]
+
+
+def run(primary, replica, teacher_id, students, threads, pollers, seconds):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = primary
+        REPLICA_DATABASE_URLS = [replica] if replica else []
+
+    app = create_app(BenchConfig)
+    stop = time.perf_counter() + seconds
+    submitted, polls = [], []
+    queue = list(students)
+    lock = threading.Lock()
+
+    def student():
+        while time.perf_counter() < stop:
+            with lock:
+                if not queue:
+                    return
+                student_id = queue.pop()
+            response = logged_in_client(app, student_id, "student").post(
+                "/attendance/submit", json=submit_payload(1, student_id)
+            )
+            if response.status_code == 201:
+                submitted.append(student_id)
+
+    def teacher():
+        client = logged_in_client(app, teacher_id, "teacher")
+        while time.perf_counter() < stop:
+            started = time.perf_counter()
+            client.get("/attendance/session/1/records")
+            polls.append(time.perf_counter() - started)
+            time.sleep(0.05)
+
+    workers = [threading.Thread(target=student) for _ in range(threads)]
+    workers += [threading.Thread(target=teacher) for _ in range(pollers)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    del students[:len(students) - len(queue)]
+
+    return {
+        "submits_per_second": round(len(submitted) / seconds, 1),
+        "polls": len(polls),
+        "poll_ms": {"p50": percentile(polls, 50), "p95": percentile(polls, 95), "p99": percentile(polls, 99)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=3000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--pollers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    primary, teacher_id, students = seed(args.students)
+    replica = os.getenv("REPLICA_URL")
+    if not replica:
+        path = primary[len("sqlite:///"):]
+        shutil.copy(path, path.replace(".db", "-replica.db"))
+        replica = "sqlite:///" + path.replace(".db", "-replica.db")
+
+    half = len(students) // 2
+    print(json.dumps({
+        "primary_only": run(primary, None, teacher_id, students[:half], args.threads, args.pollers, args.seconds),
+        "with_replica": run(primary, replica, teacher_id, students[half:], args.threads, args.pollers, args.seconds),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Batch geofence re-verification versus a Python loop over distance_meters.
+
+    python benchmarks/bench_reverify.py --points 1000000 --records 200000
+
+Part one times the bare distance computation on random points around one
+campus. Part two seeds one class with --records stored submissions and
+compares geofence.reverify() (streamed rows, one array pass per chunk, no
+writes) with loading the records through the ORM and looping in Python.
+"""
+import argparse
+import json
+import random
+import time
+
+import numpy as np
+
+from seed import CAMPUS, database_url, insert_rows, make_app, seed_class, seed_session, seed_users
+from app.attendance.geofence import distance_meters, distances_meters, reverify
+from app.config import Config
+from app.extensions import db
+from app.models.attendance_record import AttendanceRecord
+from app.models.class_model import Class
+
+
+def compute(points, rng):
+    lat = [CAMPUS[0] + rng.uniform(-0.002, 0.002) for _ in range(points)]
+    lon = [CAMPUS[1] + rng.uniform(-0.002, 0.002) for _ in range(points)]
+
+    started = time.perf_counter()
+    loop = [distance_meters(a, b, CAMPUS[0], CAMPUS[1]) for a, b in zip(lat, lon)]
+    loop_seconds = time.perf_counter() - started
+
+    lat_arr, lon_arr = np.asarray(lat), np.asarray(lon)
+    lat_center, lon_center = np.full(points, CAMPUS[0]), np.full(points, CAMPUS[1])
+    distances_meters(lat_arr[:10], lon_arr[:10], lat_center[:10], lon_center[:10])
+    started = time.perf_counter()
+    vector = distances_meters(lat_arr, lon_arr, lat_center, lon_center)
+    vector_seconds = time.perf_counter() - started
+
+    assert np.allclose(loop, vector)
+    return {
+        "points": points,
+        "python_loop_seconds": round(loop_seconds, 4),
+        "vectorized_seconds": round(vector_seconds, 4),
+        "speedup": round(loop_seconds / vector_seconds, 1),
+    }
+
+
+def end_to_end(records, rng):
+    app = make_app(Config, database_url("reverify"))
+    with app.app_context():
+        with db.engine.begin() as conn:
+            teacher_id = seed_users(conn, 1, role="teacher")[0]
+            students = seed_users(conn, records, start_id=teacher_id + 1)
+            seed_class(conn, 1, teacher_id, [])
+            seed_session(conn, 1, 1, teacher_id)
+            insert_rows(conn, AttendanceRecord.__table__, [
+                {
+                    "student_id": sid,
+                    "session_id": 1,
+                    "status": "present",
+                    "submitted_latitude": CAMPUS[0] + rng.uniform(-0.001, 0.001),
+                    "submitted_longitude": CAMPUS[1] + rng.uniform(-0.001, 0.001),
+                    "location_verified": True,
+                }
+                for sid in students
+            ])
+
+        # What re-checking looks like without the batch engine: load the
+        # records through the ORM and call distance_meters once per row.
+        started = time.perf_counter()
+        class_obj = db.session.get(Class, 1)
+        loop_outside = sum(
+            1
+            for r in AttendanceRecord.query.filter_by(session_id=1).all()
+            if distance_meters(
+                r.submitted_latitude, r.submitted_longitude, class_obj.latitude, class_obj.longitude
+            ) > class_obj.radius_meters
+        )
+        loop_seconds = time.perf_counter() - started
+        db.session.remove()
+
+        with db.engine.connect() as conn:
+            started = time.perf_counter()
+            summary = reverify(conn, class_id=1)
+            elapsed = time.perf_counter() - started
+
+    assert summary["outside"] == loop_outside
+    return {
+        "records": summary["checked"],
+        "outside": summary["outside"],
+        "orm_loop_seconds": round(loop_seconds, 3),
+        "reverify_seconds": round(elapsed, 3),
+        "speedup": round(loop_seconds / elapsed, 1),
+        "records_per_second": round(summary["checked"] / elapsed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=1000000)
+    parser.add_argument("--records", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(json.dumps({
+        "distance": compute(args.points, rng),
+        "reverify": end_to_end(args.records, rng),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Roster membership checks and absentee lists against per-request SQL.
+
+    python benchmarks/bench_rosters.py --students 2000 --present 0.8
+
+Seeds one class with --students enrollments and a session where a --present
+fraction has marked attendance. Times a membership check through the roster
+cache against the Enrollment lookup the routes used to run, and the absentee
+list as a difference of the cached arrays against a NOT EXISTS query. Also reports the
+roster's size against a Python set of the same ids.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+from sqlalchemy import select
+
+from seed import database_url, make_app, seed_class, seed_session, seed_users
+from app.attendance.rosters import difference, rosters
+from app.config import Config
+from app.extensions import db
+from app.models.attendance_record import AttendanceRecord
+from app.models.enrollment import Enrollment
+
+
+def timed(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return round((time.perf_counter() - started) / repeat * 1e6, 1), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--present", type=float, default=0.8)
+    parser.add_argument("--checks", type=int, default=2000)
+    args = parser.parse_args()
+
+    app = make_app(Config, database_url("rosters"))
+    with app.app_context():
+        with db.engine.begin() as conn:
+            teacher_id = seed_users(conn, 1, role="teacher")[0]
+            students = seed_users(conn, args.students, start_id=teacher_id + 1)
+            seed_class(conn, 1, teacher_id, students)
+            seed_session(conn, 1, 1, teacher_id)
+            present = random.Random(1).sample(students, int(len(students) * args.present))
+            conn.execute(AttendanceRecord.__table__.insert(), [
+                {"session_id": 1, "student_id": sid, "status": "present"} for sid in present
+            ])
+
+        probes = random.Random(2).choices(students, k=args.checks)
+        it = iter(probes * 2)
+
+        def sql_check():
+            return Enrollment.query.filter_by(student_id=next(it), class_id=1).first() is not None
+
+        def roster_check():
+            return rosters.is_enrolled(1, next(it))
+
+        def sql_absentees():
+            marked = select(AttendanceRecord.id).where(
+                AttendanceRecord.session_id == 1,
+                AttendanceRecord.student_id == Enrollment.student_id
+            ).exists()
+            return db.session.execute(
+                select(Enrollment.student_id).where(Enrollment.class_id == 1, ~marked).order_by(Enrollment.student_id)
+            ).scalars().all()
+
+        def roster_absentees():
+            return difference(rosters.members(1), rosters.marked(1)).tolist()
+
+        # First request after start-up: both arrays are loaded from the database.
+        cold_us, _ = timed(roster_absentees, 1)
+        sql_us, _ = timed(sql_check, args.checks)
+        roster_us, _ = timed(roster_check, args.checks)
+        sql_abs_us, expected = timed(sql_absentees, 20)
+        roster_abs_us, absent = timed(roster_absentees, 20)
+        assert absent == expected
+
+        roster = rosters.members(1)
+        print(json.dumps({
+            "students": args.students,
+            "absent": len(absent),
+            "membership_check_us": {"sql": sql_us, "roster": roster_us},
+            "absentees_us": {"sql_not_exists": sql_abs_us, "roster_cold": cold_us, "roster_difference": roster_abs_us},
+            "roster_bytes": {
+                "array": sys.getsizeof(roster),
+                "python_set": sys.getsizeof(set(roster)) + sum(sys.getsizeof(i) for i in roster),
+            },
+        }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Cost of rotating attendance codes against static ones.
+
+    python benchmarks/bench_rotating_codes.py --students 1000
+
+Times codes.verify() with the default drift, then submits --students check-ins
+to a static-code session and to a rotating-code session, reporting submit
+latency and SQL statements per submission, and the statements spent on code
+rotation (the teacher polling the current code) over the run.
+"""
+import argparse
+import json
+import time
+
+from sqlalchemy import event
+
+from seed import SESSION_CODE, database_url, logged_in_client, make_app, seed_class, seed_session, seed_users, submit_payload
+from app.attendance import codes
+from app.config import Config
+from app.extensions import db
+from app.models.attendance_session import AttendanceSession
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=1000)
+    args = parser.parse_args()
+
+    secret = codes.new_secret()
+    step, drift = Config.ATTENDANCE_CODE_STEP_SECONDS, Config.ATTENDANCE_CODE_DRIFT_STEPS
+    code, _ = codes.current_code(secret, step)
+    started = time.perf_counter()
+    for _ in range(10000):
+        codes.verify(secret, "000000" if code != "000000" else "111111", step, drift)
+    verify_us = (time.perf_counter() - started) / 10000 * 1e6
+
+    app = make_app(Config, database_url("rotating-codes"))
+    with app.app_context():
+        with db.engine.begin() as conn:
+            teacher_id = seed_users(conn, 1, role="teacher")[0]
+            students = seed_users(conn, args.students * 2, start_id=teacher_id + 1)
+            seed_class(conn, 1, teacher_id, students)
+            seed_session(conn, 1, 1, teacher_id)
+            seed_session(conn, 2, 1, teacher_id)
+            conn.execute(
+                AttendanceSession.__table__.update()
+                .where(AttendanceSession.id == 2)
+                .values(attendance_code=None, code_secret=secret)
+            )
+
+        statements = [0]
+        event.listen(db.engine, "before_cursor_execute", lambda *a: statements.__setitem__(0, statements[0] + 1))
+
+    teacher = logged_in_client(app, teacher_id, "teacher")
+    results = {}
+    for label, session_id, group in (("static", 1, students[:args.students]), ("rotating", 2, students[args.students:])):
+        teacher.get(f"/attendance/session/{session_id}/code")
+        before = statements[0]
+        polls = 0
+        started = time.perf_counter()
+        for sid in group:
+            payload = submit_payload(session_id, sid)
+            if label == "rotating":
+                # What the projector shows; the teacher page re-reads it as it rotates
+                payload["attendance_code"] = teacher.get(f"/attendance/session/{session_id}/code").json["code"]
+                polls += 1
+            else:
+                payload["attendance_code"] = SESSION_CODE
+            response = logged_in_client(app, sid, "student").post("/attendance/submit", json=payload)
+            assert response.status_code == 201, response.json
+        elapsed = time.perf_counter() - started
+        results[label] = {
+            "ms_per_submit": round(elapsed / len(group) * 1000, 2),
+            "sql_per_submit": round((statements[0] - before) / len(group), 2),
+            "code_reads": polls,
+        }
+
+    print(json.dumps({"verify_us": round(verify_us, 1), "submits": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Cold start: import and create_app() time, modules loaded and peak RSS.
+
+    python benchmarks/bench_startup.py --runs 15 --history startup.jsonl
+
+Starts --runs fresh interpreters. Each one imports the app package, calls
+create_app() and reports both times, the number of modules loaded, whether
+Alembic was imported, and its peak RSS. Prints the medians. --history
+appends them as one JSON line, tagged with the commit, so start-up can be
+tracked over time.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+create_app()
+created = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "create_app_ms": (created - imported) * 1000,
+    "modules": len(sys.modules),
+    "alembic": "alembic" in sys.modules,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}))
+"""
+
+
+def git_commit(cwd):
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=cwd, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--history", help="Append the result as a JSON line to this file.")
+    args = parser.parse_args()
+
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, DATABASE_URL=os.getenv("BENCH_DATABASE_URL", "sqlite://"), SECRET_KEY="benchmark-secret")
+    runs = []
+    for _ in range(args.runs + 1):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE], cwd=backend, env=env, capture_output=True, text=True, check=True
+        ).stdout
+        runs.append(json.loads(out.strip().splitlines()[-1]))
+    # The first run warms the OS file cache and writes .pyc files.
+    runs = runs[1:]
+
+    result = {
+        "commit": git_commit(backend),
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+        "import_ms": round(statistics.median(r["import_ms"] for r in runs), 1),
+        "create_app_ms": round(statistics.median(r["create_app_ms"] for r in runs), 1),
+        "total_ms": round(statistics.median(r["import_ms"] + r["create_app_ms"] for r in runs), 1),
+        "modules": runs[-1]["modules"],
+        "alembic_imported": runs[-1]["alembic"],
+        "rss_mb": round(statistics.median(r["rss_mb"] for r in runs), 1),
+    }
+    print(json.dumps(result, indent=2))
+    if args.history:
+        with open(args.history, "a") as fh:
+            fh.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""Closed-loop load test of the attendance rush, saved as JSON for comparison.
+
+    python benchmarks/loadtest.py --classes 10 --students 60 --window 60 --out before.json
+    python benchmarks/loadtest.py ... --out after.json --compare before.json
+
+Seeds --classes classes, each with a teacher, --students enrolled students and a
+running session, then drives create_app() through two phases with --threads
+closed-loop virtual users (each sends its next request when the previous one
+has answered):
+
+  login  every student and teacher logs in once, as fast as the users allow.
+  rush   every student submits attendance once. Arrival times are spread at
+         random (--seed) over --window seconds; a user that falls behind sends
+         straight away. Meanwhile each teacher polls /attendance/active, the
+         records listing and /classes every --poll-interval seconds, sending
+         If-None-Match like a browser cache would.
+
+For every endpoint it reports requests, throughput, p50/p95/p99 latency and SQL
+statements per request (statements issued on the request's own thread;
+statements from background writers are reported separately). Set
+BENCH_DATABASE_URL to run against a scratch MySQL database, and the usual
+environment variables (for example ATTENDANCE_GROUP_COMMIT=true) to load-test
+other configurations.
+"""
+import argparse
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import platform
+import random
+import subprocess
+import threading
+import time
+
+from sqlalchemy import event
+from werkzeug.security import generate_password_hash
+
+from seed import PASSWORD, database_url, make_app, seed_class, seed_session, seed_users, submit_payload
+from app.config import Config
+from app.extensions import db
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * pct / 100))] * 1000, 2)
+
+
+class Recorder:
+    """Latency, status and SQL statements per endpoint."""
+
+    def __init__(self, engine):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.queries = Counter()
+        self.per_thread = Counter()
+        self.total = 0
+        event.listen(engine, "before_cursor_execute", self._statement)
+
+    def _statement(self, *args):
+        # Fired on request threads and background writers alike.
+        with self.lock:
+            self.per_thread[threading.get_ident()] += 1
+            self.total += 1
+
+    def call(self, endpoint, send):
+        ident = threading.get_ident()
+        with self.lock:
+            before = self.per_thread[ident]
+        started = time.perf_counter()
+        response = send()
+        elapsed = time.perf_counter() - started
+        with self.lock:
+            self.latencies[endpoint].append(elapsed)
+            self.statuses[endpoint][response.status_code] += 1
+            self.queries[endpoint] += self.per_thread[ident] - before
+        return response
+
+    def reset(self):
+        with self.lock:
+            self.latencies.clear()
+            self.statuses.clear()
+            self.queries.clear()
+
+    def attributed(self):
+        return sum(self.queries.values())
+
+    def report(self, seconds):
+        out = {}
+        for endpoint, latencies in sorted(self.latencies.items()):
+            out[endpoint] = {
+                "requests": len(latencies),
+                "per_second": round(len(latencies) / seconds, 1),
+                "p50_ms": percentile(latencies, 50),
+                "p95_ms": percentile(latencies, 95),
+                "p99_ms": percentile(latencies, 99),
+                "max_ms": round(max(latencies) * 1000, 2),
+                "queries_per_request": round(self.queries[endpoint] / len(latencies), 2),
+                "statuses": {str(code): n for code, n in sorted(self.statuses[endpoint].items())},
+            }
+        return out
+
+
+def run_phase(recorder, threads, tasks):
+    """Run ``tasks`` on ``threads`` closed-loop users; returns (seconds, background statements)."""
+    with recorder.lock:
+        total_before, attributed_before = recorder.total, recorder.attributed()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        for future in [pool.submit(task) for task in tasks]:
+            future.result()
+    seconds = time.perf_counter() - started
+    with recorder.lock:
+        background = (recorder.total - total_before) - (recorder.attributed() - attributed_before)
+    return seconds, background
+
+
+def login_task(recorder, client, email):
+    def task():
+        recorder.call(
+            "POST /auth/login", lambda: client.post("/auth/login", json={"email": email, "password": PASSWORD})
+        )
+    return task
+
+
+def submit_task(recorder, client, session_id, student_id, at):
+    def task():
+        delay = at - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        # Failures (503 from a full write queue, say) show up in the statuses.
+        recorder.call(
+            "POST /attendance/submit",
+            lambda: client.post("/attendance/submit", json=submit_payload(session_id, student_id))
+        )
+    return task
+
+
+def poll_task(recorder, client, class_id, session_id, until, interval):
+    def task():
+        etags = {}
+
+        def get(endpoint, url):
+            headers = {"If-None-Match": etags[url]} if url in etags else {}
+            response = recorder.call(endpoint, lambda: client.get(url, headers=headers))
+            if response.headers.get("ETag"):
+                etags[url] = response.headers["ETag"]
+
+        while time.perf_counter() < until:
+            started = time.perf_counter()
+            get("GET /attendance/active", f"/attendance/active?class_id={class_id}")
+            get("GET /attendance/session/<id>/records", f"/attendance/session/{session_id}/records")
+            get("GET /classes", "/classes")
+            time.sleep(max(0.0, interval - (time.perf_counter() - started)))
+    return task
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, previous):
+    """Print p95 and throughput changes per endpoint against an earlier result file."""
+    for phase in ("login", "rush"):
+        for endpoint, now in current[phase]["endpoints"].items():
+            then = previous.get(phase, {}).get("endpoints", {}).get(endpoint)
+            if then is None:
+                continue
+            p95 = (now["p95_ms"] - then["p95_ms"]) / then["p95_ms"] * 100 if then["p95_ms"] else 0.0
+            print(
+                f"{phase:5} {endpoint:40} p95 {then['p95_ms']:>8} -> {now['p95_ms']:>8} ms ({p95:+.0f}%)  "
+                f"queries {then['queries_per_request']} -> {now['queries_per_request']}  "
+                f"req/s {then['per_second']} -> {now['per_second']}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--classes", type=int, default=10)
+    parser.add_argument("--students", type=int, default=60, help="Students per class.")
+    parser.add_argument("--threads", type=int, default=16, help="Concurrent virtual users.")
+    parser.add_argument("--window", type=float, default=60, help="Seconds over which the submissions arrive.")
+    parser.add_argument("--poll-interval", type=float, default=2)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="Write the results to this JSON file.")
+    parser.add_argument("--compare", help="Earlier results file to compare against.")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    app = make_app(Config, database_url("loadtest"))
+    with app.app_context():
+        with db.engine.begin() as conn:
+            password_hash = generate_password_hash(PASSWORD, method=Config.PASSWORD_HASH_METHOD)
+            teachers = seed_users(conn, args.classes, role="teacher", password_hash=password_hash)
+            students = seed_users(
+                conn, args.classes * args.students, start_id=teachers[-1] + 1, password_hash=password_hash
+            )
+            rosters = {}
+            for i, teacher_id in enumerate(teachers):
+                class_id = session_id = i + 1
+                rosters[class_id] = students[i * args.students:(i + 1) * args.students]
+                seed_class(conn, class_id, teacher_id, rosters[class_id])
+                seed_session(conn, session_id, class_id, teacher_id)
+        recorder = Recorder(db.engine)
+        dialect = db.engine.dialect.name
+
+    clients = {user_id: app.test_client() for user_id in teachers + students}
+    logins = [login_task(recorder, clients[t], f"teacher{t}@bench.local") for t in teachers]
+    logins += [login_task(recorder, clients[s], f"student{s}@bench.local") for s in students]
+    rng.shuffle(logins)
+    login_seconds, login_background = run_phase(recorder, args.threads, logins)
+    login_report = recorder.report(login_seconds)
+
+    recorder.reset()
+    start = time.perf_counter() + 0.5
+    arrivals = sorted(
+        (start + rng.random() * args.window, class_id, student_id)
+        for class_id, roster in rosters.items() for student_id in roster
+    )
+    tasks = [
+        poll_task(recorder, clients[teacher_id], i + 1, i + 1, start + args.window, args.poll_interval)
+        for i, teacher_id in enumerate(teachers)
+    ]
+    tasks += [submit_task(recorder, clients[s], class_id, s, at) for at, class_id, s in arrivals]
+    # Pollers hold a user each for the whole window; the rest share the other users.
+    rush_seconds, rush_background = run_phase(recorder, args.threads + len(teachers), tasks)
+
+    results = {
+        "commit": git_commit(),
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "database": dialect,
+        "options": vars(args),
+        "login": {
+            "seconds": round(login_seconds, 2),
+            "background_queries": login_background,
+            "endpoints": login_report,
+        },
+        "rush": {
+            "seconds": round(rush_seconds, 2),
+            "background_queries": rush_background,
+            "endpoints": recorder.report(rush_seconds),
+        },
+    }
+    print(json.dumps(results, indent=2))
+    if args.out:
+        with open(args.out, "w") as fh:
+            json.dump(results, fh, indent=2)
+    if args.compare:
+        with open(args.compare) as fh:
+            compare(results, json.load(fh))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Shared helpers for the scripts in this directory.
+
+Benchmarks run against a throwaway SQLite file unless BENCH_DATABASE_URL is
+set, and seed rows with Core inserts so that seeding does not dominate the run.
+Every run drops and recreates all tables, so BENCH_DATABASE_URL must name a
+scratch database. DATABASE_URL is deliberately ignored.
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.security import generate_password_hash
+
+
+PASSWORD = "benchmark-password"
+SESSION_CODE = "BENCH1"
+CAMPUS = (28.6139, 77.2090)
+
+
+def database_url(name):
+    url = os.getenv("BENCH_DATABASE_URL")
+    if url:
+        return url
+    path = os.path.join(tempfile.mkdtemp(prefix="attendsure-bench-"), name + ".db")
+    return "sqlite:///" + path
+
+
+def make_app(config_class, url):
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    config_class.SQLALCHEMY_DATABASE_URI = url
+
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app(config_class)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    return app
+
+
+def insert_rows(conn, table, rows, chunk=5000):
+    for start in range(0, len(rows), chunk):
+        conn.execute(table.insert(), rows[start:start + chunk])
+
+
+def seed_users(conn, count, role="student", start_id=1, password_hash=None):
+    from app.models.user import User
+
+    password_hash = password_hash or generate_password_hash(PASSWORD)
+    rows = [
+        {
+            "id": start_id + i,
+            "name": f"{role} {start_id + i}",
+            "email": f"{role}{start_id + i}@bench.local",
+            "password_hash": password_hash,
+            "role": role,
+            "is_active": True,
+        }
+        for i in range(count)
+    ]
+    insert_rows(conn, User.__table__, rows)
+    return [row["id"] for row in rows]
+
+
+def seed_class(conn, class_id, teacher_id, student_ids, lat=CAMPUS[0], lon=CAMPUS[1], radius=100):
+    from app.attendance.rollups import add_enrollments
+    from app.models.class_model import Class
+    from app.models.enrollment import Enrollment
+
+    conn.execute(Class.__table__.insert(), [{
+        "id": class_id,
+        "name": f"Class {class_id}",
+        "teacher_id": teacher_id,
+        "latitude": lat,
+        "longitude": lon,
+        "radius_meters": radius,
+        "is_active": True,
+    }])
+    insert_rows(conn, Enrollment.__table__, [
+        {"student_id": sid, "class_id": class_id, "is_active": True}
+        for sid in student_ids
+    ])
+    # As /classes/<id>/enroll does, so submits take the normal rollup path.
+    add_enrollments(conn, class_id, student_ids)
+
+
+def seed_session(conn, session_id, class_id, teacher_id, active=True):
+    from app.attendance.rollups import session_started
+    from app.models.attendance_session import AttendanceSession
+
+    now = datetime.now()
+    conn.execute(AttendanceSession.__table__.insert(), [{
+        "id": session_id,
+        "class_id": class_id,
+        "created_by": teacher_id,
+        "starts_at": now - timedelta(minutes=5),
+        "ends_at": now + timedelta(hours=2),
+        "attendance_code": SESSION_CODE,
+        "is_active": active,
+    }])
+    session_started(conn, class_id)
+
+
+def logged_in_client(app, user_id, role):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess["user_id"] = user_id
+        sess["role"] = role
+    return client
+
+
+def submit_payload(session_id, student_id):
+    return {
+        "attendance_session_id": session_id,
+        "attendance_code": SESSION_CODE,
+        "latitude": CAMPUS[0],
+        "longitude": CAMPUS[1],
+        "device_info": {
+            "user_agent": f"bench-agent-{student_id}",
+            "screen_size": "1080x2400",
+            "timezone": "Asia/Kolkata",
+            "language": "en-IN",
+            "ip_subnet": "10.0.0",
+        },
+    }
@@ -0,0 +1,26 @@
+"""index active sessions by end time
+
+Revision ID: 3e8f1b6a2c07
+Revises: 9a3d51c7e2b4
+Create Date: 2026-10-18 15:11:37.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3e8f1b6a2c07'
+down_revision = '9a3d51c7e2b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Active sessions past their ends_at, for the session scheduler's sweep
+    op.create_index('ix_attendance_sessions_active_ends', 'attendance_sessions',
+                    ['is_active', 'ends_at'])
+
+
+def downgrade():
+    op.drop_index('ix_attendance_sessions_active_ends', table_name='attendance_sessions')
@@ -0,0 +1,40 @@
+"""unique attendance record per session and student
+
+Revision ID: 4f9cdff06523
+Revises: 5b6cc513fb15
+Create Date: 2026-10-18 09:12:41.503217
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4f9cdff06523'
+down_revision = '5b6cc513fb15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Drop duplicates left behind by the old check-then-insert path, keeping
+    # the earliest record. The derived table is needed for MySQL, which does
+    # not allow selecting from the table being deleted from.
+    op.execute(
+        "DELETE FROM attendance_records WHERE id NOT IN ("
+        "SELECT id FROM (SELECT MIN(id) AS id FROM attendance_records "
+        "GROUP BY session_id, student_id) AS keep)"
+    )
+
+    with op.batch_alter_table('attendance_records', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_session_student', ['session_id', 'student_id'])
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'mysql':
+        # uq_session_student may be the only index left behind the session_id
+        # foreign key on MySQL.
+        op.create_index('ix_attendance_records_session_id', 'attendance_records', ['session_id'])
+
+    with op.batch_alter_table('attendance_records', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_session_student', type_='unique')
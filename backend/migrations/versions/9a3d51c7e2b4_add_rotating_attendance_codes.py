@@ -0,0 +1,38 @@
+"""add rotating attendance codes
+
+Revision ID: 9a3d51c7e2b4
+Revises: c2e34960d4de
+Create Date: 2026-10-18 14:02:11.480215
+
+"""
+import secrets
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a3d51c7e2b4'
+down_revision = 'c2e34960d4de'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('attendance_sessions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('code_secret', sa.String(length=64), nullable=True))
+        batch_op.alter_column('attendance_code', existing_type=sa.String(length=20), nullable=True)
+
+
+def downgrade():
+    # Rotating sessions have no static code; give them random ones.
+    bind = op.get_bind()
+    sessions = sa.table('attendance_sessions', sa.column('id', sa.Integer), sa.column('attendance_code', sa.String))
+    for (session_id,) in bind.execute(sa.select(sessions.c.id).where(sessions.c.attendance_code.is_(None))).all():
+        bind.execute(
+            sessions.update().where(sessions.c.id == session_id).values(attendance_code=secrets.token_hex(8))
+        )
+
+    with op.batch_alter_table('attendance_sessions', schema=None) as batch_op:
+        batch_op.alter_column('attendance_code', existing_type=sa.String(length=20), nullable=False)
+        batch_op.drop_column('code_secret')
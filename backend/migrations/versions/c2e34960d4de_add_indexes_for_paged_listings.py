@@ -0,0 +1,33 @@
+"""add indexes for paged listings
+
+Revision ID: c2e34960d4de
+Revises: f06bbaf00f05
+Create Date: 2026-10-18 12:20:44.617093
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2e34960d4de'
+down_revision = 'f06bbaf00f05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Enrollment listing of a class, paged on enrollments.id
+    op.create_index('ix_enrollments_class_id', 'enrollments', ['class_id'])
+    # Collision flags for one page of records, and flagging a shared signature
+    op.create_index('ix_attendance_records_session_signature', 'attendance_records',
+                    ['session_id', 'device_signature'])
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'mysql':
+        # The class_id foreign key needs an index to remain on MySQL.
+        op.create_index('ix_enrollments_class_id_fk', 'enrollments', ['class_id'])
+
+    op.drop_index('ix_attendance_records_session_signature', table_name='attendance_records')
+    op.drop_index('ix_enrollments_class_id', table_name='enrollments')
@@ -0,0 +1,44 @@
+"""add composite indexes for route queries
+
+Revision ID: c66195e5eef3
+Revises: 4f9cdff06523
+Create Date: 2026-10-18 10:02:17.114871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c66195e5eef3'
+down_revision = '4f9cdff06523'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Enrollment.query.filter_by(student_id=..., class_id=...)
+    op.create_index('ix_enrollments_student_class', 'enrollments', ['student_id', 'class_id'])
+    # AttendanceSession.query.filter_by(class_id=..., is_active=True).order_by(created_at desc)
+    op.create_index('ix_attendance_sessions_class_active_created', 'attendance_sessions',
+                    ['class_id', 'is_active', 'created_at'])
+    # Class.query.filter_by(teacher_id=...)
+    op.create_index('ix_classes_teacher_id', 'classes', ['teacher_id'])
+    # AttendanceRecord.query.filter_by(session_id=...).order_by(marked_at)
+    op.create_index('ix_attendance_records_session_marked', 'attendance_records',
+                    ['session_id', 'marked_at'])
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'mysql':
+        # MySQL silently drops the implicit index behind a foreign key once
+        # another index covers the column; put plain ones back first so the
+        # composite indexes can be removed.
+        op.create_index('ix_enrollments_student_id', 'enrollments', ['student_id'])
+        op.create_index('ix_attendance_sessions_class_id', 'attendance_sessions', ['class_id'])
+        op.create_index('ix_classes_teacher_id_fk', 'classes', ['teacher_id'])
+
+    op.drop_index('ix_attendance_records_session_marked', table_name='attendance_records')
+    op.drop_index('ix_classes_teacher_id', table_name='classes')
+    op.drop_index('ix_attendance_sessions_class_active_created', table_name='attendance_sessions')
+    op.drop_index('ix_enrollments_student_class', table_name='enrollments')
@@ -0,0 +1,32 @@
+"""store submitted location on attendance records
+
+Revision ID: ed07c702da98
+Revises: c66195e5eef3
+Create Date: 2026-10-18 10:41:55.208342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ed07c702da98'
+down_revision = 'c66195e5eef3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('attendance_records', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('submitted_latitude', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('submitted_longitude', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('distance_meters', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('location_verified', sa.Boolean(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('attendance_records', schema=None) as batch_op:
+        batch_op.drop_column('location_verified')
+        batch_op.drop_column('distance_meters')
+        batch_op.drop_column('submitted_longitude')
+        batch_op.drop_column('submitted_latitude')
@@ -0,0 +1,52 @@
+"""add attendance rollups
+
+Revision ID: f06bbaf00f05
+Revises: ed07c702da98
+Create Date: 2026-10-18 11:36:08.912475
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f06bbaf00f05'
+down_revision = 'ed07c702da98'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('attendance_rollups',
+    sa.Column('student_id', sa.Integer(), nullable=False),
+    sa.Column('class_id', sa.Integer(), nullable=False),
+    sa.Column('sessions_held', sa.Integer(), nullable=False),
+    sa.Column('sessions_attended', sa.Integer(), nullable=False),
+    sa.Column('last_attended_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['class_id'], ['classes.id'], ),
+    sa.ForeignKeyConstraint(['student_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('student_id', 'class_id')
+    )
+    # Class summaries and the sessions_held increment filter on class_id
+    op.create_index('ix_attendance_rollups_class_id', 'attendance_rollups', ['class_id'])
+
+    # Same computation as "flask attendance rebuild-rollups".
+    op.execute(
+        "INSERT INTO attendance_rollups "
+        "(student_id, class_id, sessions_held, sessions_attended, last_attended_at) "
+        "SELECT e.student_id, e.class_id, "
+        "(SELECT COUNT(s.id) FROM attendance_sessions s "
+        "WHERE s.class_id = e.class_id), "
+        "(SELECT COUNT(r.id) FROM attendance_records r "
+        "JOIN attendance_sessions s ON s.id = r.session_id "
+        "WHERE s.class_id = e.class_id AND r.student_id = e.student_id), "
+        "(SELECT MAX(r.marked_at) FROM attendance_records r "
+        "JOIN attendance_sessions s ON s.id = r.session_id "
+        "WHERE s.class_id = e.class_id AND r.student_id = e.student_id) "
+        "FROM (SELECT DISTINCT student_id, class_id FROM enrollments) e"
+    )
+
+
+def downgrade():
+    op.drop_index('ix_attendance_rollups_class_id', table_name='attendance_rollups')
+    op.drop_table('attendance_rollups')
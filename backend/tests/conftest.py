@@ -0,0 +1,78 @@
+import pytest
+
+from app import create_app
+from app.config import Config
+from app.extensions import db
+
+
+PASSWORD = "test-password"
+CAMPUS = (28.6139, 77.2090)
+SESSION_CODE = "ABC123"
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """Build an app on a fresh SQLite file, with config overrides as keywords."""
+    def make(**overrides):
+        class TestConfig(Config):
+            SQLALCHEMY_DATABASE_URI = "sqlite:///" + str(tmp_path / "test.db")
+            # Fast hashes; the KDF cost is not what these tests are about
+            PASSWORD_HASH_METHOD = "pbkdf2:sha256:1000"
+
+        for key, value in overrides.items():
+            setattr(TestConfig, key, value)
+
+        app = create_app(TestConfig)
+        app.config["SECRET_KEY"] = "test-secret"
+        with app.app_context():
+            db.create_all()
+        return app
+
+    return make
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+def signup(app, name, role="student"):
+    """A test client logged in as a new user, and that user's id."""
+    client = app.test_client()
+    email = name + "@example.com"
+    response = client.post("/auth/signup", json={"name": name, "email": email, "password": PASSWORD, "role": role})
+    assert response.status_code == 201, response.get_json()
+    response = client.post("/auth/login", json={"email": email, "password": PASSWORD})
+    assert response.status_code == 200, response.get_json()
+    return client, response.get_json()["user"]["id"]
+
+
+def create_class(teacher, name="Physics"):
+    response = teacher.post("/classes", json={
+        "name": name, "latitude": CAMPUS[0], "longitude": CAMPUS[1], "radius_meters": 100,
+    })
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()["class_id"]
+
+
+def start_session(teacher, class_id, **fields):
+    body = {
+        "class_id": class_id,
+        "attendance_code": SESSION_CODE,
+        "starts_at": "2020-01-01T00:00:00",
+        "ends_at": "2099-01-01T00:00:00",
+        **fields,
+    }
+    response = teacher.post("/attendance/start", json=body)
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()["attendance_session_id"]
+
+
+def submit_payload(session_id, student_id, code=SESSION_CODE):
+    return {
+        "attendance_session_id": session_id,
+        "attendance_code": code,
+        "latitude": CAMPUS[0],
+        "longitude": CAMPUS[1],
+        "device_info": {"user_agent": f"test-device-{student_id}", "ip_subnet": "10.0.0"},
+    }
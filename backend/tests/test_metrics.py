@@ -0,0 +1,33 @@
+import pytest
+
+from app import create_app
+from app.config import Config
+
+
+def make_app(token):
+    class TestConfig(Config):
+        SQLALCHEMY_DATABASE_URI = "sqlite://"
+        METRICS_ENABLED = True
+        METRICS_TOKEN = token
+
+    return create_app(TestConfig)
+
+
+def test_metrics_not_served_without_a_token():
+    client = make_app("").test_client()
+    assert client.get("/metrics").status_code == 404
+    assert client.get("/metrics", headers={"Authorization": "Bearer "}).status_code == 404
+
+
+@pytest.mark.parametrize("header", [None, "Bearer wrong", "secret"])
+def test_metrics_require_the_token(header):
+    client = make_app("secret").test_client()
+    headers = {"Authorization": header} if header else {}
+    assert client.get("/metrics", headers=headers).status_code == 401
+
+
+def test_metrics_served_with_the_token():
+    client = make_app("secret").test_client()
+    response = client.get("/metrics", headers={"Authorization": "Bearer secret"})
+    assert response.status_code == 200
+    assert "attendsure_requests_total" in response.get_data(as_text=True)
@@ -0,0 +1,85 @@
+import pytest
+
+from app.pagination import encode_cursor
+from tests.conftest import create_class, signup, start_session, submit_payload
+
+
+def walk(client, url, key, limit):
+    """Every item of a paged listing, following next_cursor to the end."""
+    items, cursor = [], None
+    while True:
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(url, query_string=params)
+        assert response.status_code == 200, response.get_json()
+        body = response.get_json()
+        assert len(body[key]) <= limit
+        items += body[key]
+        cursor = body["next_cursor"]
+        if not cursor:
+            return items
+
+
+@pytest.fixture
+def course(app):
+    teacher, _ = signup(app, "teacher", role="teacher")
+    class_id = create_class(teacher)
+    students = []
+    for i in range(7):
+        client, student_id = signup(app, f"student{i}")
+        assert client.post(f"/classes/{class_id}/enroll").status_code == 201
+        students.append((client, student_id))
+    session_id = start_session(teacher, class_id)
+    return teacher, class_id, session_id, students
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 7, 100])
+def test_records_pages_have_no_gaps_or_duplicates(course, limit):
+    teacher, _, session_id, students = course
+    # Submitted within the same second, so pages split inside marked_at ties
+    for client, student_id in students:
+        assert client.post("/attendance/submit", json=submit_payload(session_id, student_id)).status_code == 201
+
+    records = walk(teacher, f"/attendance/session/{session_id}/records", "records", limit)
+    assert sorted(record["student_id"] for record in records) == sorted(student_id for _, student_id in students)
+    assert len({record["id"] for record in records}) == len(students)
+
+
+def test_records_added_mid_walk_appear_once(course):
+    teacher, _, session_id, students = course
+    for client, student_id in students[:4]:
+        client.post("/attendance/submit", json=submit_payload(session_id, student_id))
+
+    url = f"/attendance/session/{session_id}/records"
+    first = teacher.get(url, query_string={"limit": 2}).get_json()
+    for client, student_id in students[4:]:
+        client.post("/attendance/submit", json=submit_payload(session_id, student_id))
+    rest = teacher.get(url, query_string={"limit": 100, "cursor": first["next_cursor"]}).get_json()
+
+    seen = [record["student_id"] for record in first["records"] + rest["records"]]
+    assert sorted(seen) == sorted(student_id for _, student_id in students)
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 8])
+def test_enrollments_and_classes_pages(course, limit):
+    teacher, class_id, _, students = course
+    enrollments = walk(teacher, f"/classes/{class_id}/enrollments", "enrollments", limit)
+    assert [e["student_id"] for e in enrollments] == [student_id for _, student_id in students]
+
+    class_ids = [class_id] + [create_class(teacher, name=f"Extra {i}") for i in range(4)]
+    classes = walk(teacher, "/classes", "classes", limit)
+    assert [c["id"] for c in classes] == class_ids
+
+
+@pytest.mark.parametrize("query, error", [
+    ({"cursor": "not-a-cursor"}, "Invalid cursor"),
+    ({"cursor": encode_cursor("a")}, "Invalid cursor"),
+    ({"limit": 0}, "limit must be positive"),
+    ({"limit": "x"}, "limit must be an integer"),
+])
+def test_bad_page_arguments_are_rejected(course, query, error):
+    teacher = course[0]
+    response = teacher.get("/classes", query_string=query)
+    assert response.status_code == 400
+    assert response.get_json() == {"error": error}
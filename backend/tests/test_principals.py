@@ -0,0 +1,70 @@
+import time
+
+from sqlalchemy import event, update
+
+from app.extensions import db
+from app.models.user import User
+from tests.conftest import signup
+
+
+def test_logged_in_requests_hit_the_cache(app):
+    client, _ = signup(app, "student")
+    statements = []
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    for _ in range(3):
+        assert client.get("/auth/me").status_code == 200
+    assert statements == []
+
+
+def test_orm_update_invalidates_the_cached_user(app):
+    client, user_id = signup(app, "student")
+    assert client.get("/auth/me").get_json()["name"] == "student"
+
+    with app.app_context():
+        db.session.get(User, user_id).name = "renamed"
+        db.session.commit()
+    assert client.get("/auth/me").get_json()["name"] == "renamed"
+
+    with app.app_context():
+        db.session.get(User, user_id).is_active = False
+        db.session.commit()
+    assert client.get("/auth/me").status_code == 401
+    # The session was cleared, so the browser stays logged out
+    with app.app_context():
+        db.session.get(User, user_id).is_active = True
+        db.session.commit()
+    assert client.get("/auth/me").status_code == 401
+
+
+def test_orm_delete_invalidates_the_cached_user(app):
+    client, user_id = signup(app, "student")
+    assert client.get("/auth/me").status_code == 200
+    with app.app_context():
+        db.session.delete(db.session.get(User, user_id))
+        db.session.commit()
+    assert client.get("/auth/me").status_code == 401
+
+
+def test_rolled_back_update_keeps_the_user(app):
+    client, user_id = signup(app, "student")
+    with app.app_context():
+        db.session.get(User, user_id).is_active = False
+        db.session.flush()
+        db.session.rollback()
+    assert client.get("/auth/me").status_code == 200
+
+
+def test_core_updates_apply_once_the_entry_expires(make_app):
+    app = make_app(PRINCIPAL_CACHE_TTL_SECONDS=0.2)
+    client, user_id = signup(app, "student")
+    assert client.get("/auth/me").status_code == 200
+
+    with app.app_context():
+        db.session.execute(update(User).where(User.id == user_id).values(is_active=False))
+        db.session.commit()
+    assert client.get("/auth/me").status_code == 200
+    time.sleep(0.3)
+    assert client.get("/auth/me").status_code == 401
@@ -0,0 +1,96 @@
+import importlib.util
+import os
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+from app.attendance.rollups import rebuild
+from app.extensions import db
+from tests.conftest import create_class, signup, start_session, submit_payload
+
+
+ROLLUP_MIGRATION = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "migrations", "versions", "f06bbaf00f05_add_attendance_rollups.py",
+)
+
+
+def counts(teacher, class_id):
+    summary = teacher.get(f"/classes/{class_id}/attendance-summary").get_json()
+    return {
+        row["student_id"]: (row["sessions_held"], row["sessions_attended"])
+        for row in summary["students"]
+    }
+
+
+def enrolled_class(app, students=2):
+    teacher, _ = signup(app, "teacher", role="teacher")
+    class_id = create_class(teacher)
+    clients = {}
+    for i in range(students):
+        client, student_id = signup(app, f"student{i}")
+        assert client.post(f"/classes/{class_id}/enroll").status_code == 201
+        clients[student_id] = client
+    return teacher, class_id, clients
+
+
+def test_session_is_held_from_its_start(app):
+    teacher, class_id, students = enrolled_class(app)
+    start_session(teacher, class_id)
+    assert counts(teacher, class_id) == {student_id: (1, 0) for student_id in students}
+
+
+def test_records_and_ends_update_counts(app):
+    teacher, class_id, students = enrolled_class(app)
+    present, absent = students
+    session_id = start_session(teacher, class_id)
+    assert students[present].post("/attendance/submit", json=submit_payload(session_id, present)).status_code == 201
+
+    # Ending twice must not count the session twice
+    for _ in range(2):
+        assert teacher.post("/attendance/end", json={"attendance_session_id": session_id}).status_code == 200
+    assert counts(teacher, class_id) == {present: (1, 1), absent: (1, 0)}
+
+    start_session(teacher, class_id)
+    assert counts(teacher, class_id) == {present: (2, 1), absent: (2, 0)}
+
+    summary = students[present].get("/attendance/summary").get_json()
+    assert [(row["class_id"], row["percentage"]) for row in summary["classes"]] == [(class_id, 50.0)]
+
+
+def test_late_enrollment_counts_sessions_already_held(app):
+    teacher, class_id, _ = enrolled_class(app, students=1)
+    start_session(teacher, class_id)
+    late, late_id = signup(app, "late")
+    assert late.post(f"/classes/{class_id}/enroll").status_code == 201
+    assert counts(teacher, class_id)[late_id] == (1, 0)
+
+
+def test_rebuild_and_migration_match_live_counts(app):
+    teacher, class_id, students = enrolled_class(app, students=3)
+    first = start_session(teacher, class_id)
+    for student_id, client in list(students.items())[:2]:
+        client.post("/attendance/submit", json=submit_payload(first, student_id))
+    teacher.post("/attendance/end", json={"attendance_session_id": first})
+    second = start_session(teacher, class_id)
+    student_id, client = next(iter(students.items()))
+    client.post("/attendance/submit", json=submit_payload(second, student_id))
+
+    live = counts(teacher, class_id)
+    assert live == dict(zip(students, [(2, 2), (2, 1), (2, 0)]))
+
+    with app.app_context():
+        with db.engine.begin() as conn:
+            assert rebuild(conn) == 3
+    assert counts(teacher, class_id) == live
+
+    # The migration's backfill agrees with the live counts too
+    spec = importlib.util.spec_from_file_location("rollup_migration", ROLLUP_MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql("DROP TABLE attendance_rollups")
+            with Operations.context(MigrationContext.configure(conn)):
+                migration.upgrade()
+    assert counts(teacher, class_id) == live
@@ -0,0 +1,76 @@
+import pytest
+
+from app.models.attendance_rollup import AttendanceRollup
+from tests.conftest import create_class, signup, start_session, submit_payload
+
+
+@pytest.fixture
+def course(app):
+    teacher, teacher_id = signup(app, "teacher", role="teacher")
+    class_id = create_class(teacher)
+    students = {}
+    for name in ("enrolled", "alice", "bob", "carol"):
+        client, student_id = signup(app, name)
+        students[name] = (client, student_id)
+    assert students["enrolled"][0].post(f"/classes/{class_id}/enroll").status_code == 201
+    return app, teacher, teacher_id, class_id, students
+
+
+def test_json_import_reports_a_status_per_row(course):
+    _, teacher, teacher_id, class_id, students = course
+    enrolled_id = students["enrolled"][1]
+    alice_id, bob_id = students["alice"][1], students["bob"][1]
+    rows = [enrolled_id, "alice@example.com", bob_id, str(bob_id), "nobody@example.com", "junk", teacher_id, -3, True]
+
+    response = teacher.post(f"/classes/{class_id}/enrollments", json={"students": rows})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [(r["row"], r["status"], r["student_id"]) for r in body["results"]] == [
+        (1, "already_enrolled", enrolled_id),
+        (2, "enrolled", alice_id),
+        (3, "enrolled", bob_id),
+        (4, "duplicate", bob_id),
+        (5, "not_found", None),
+        (6, "invalid", None),
+        (7, "not_a_student", teacher_id),
+        (8, "invalid", None),
+        (9, "invalid", None),
+    ]
+    assert body["counts"] == {
+        "already_enrolled": 1, "duplicate": 1, "enrolled": 2, "invalid": 3, "not_a_student": 1, "not_found": 1,
+    }
+
+
+def test_csv_import(course):
+    _, teacher, _, class_id, _ = course
+    csv = "email\ncarol@example.com\nenrolled@example.com\n\n"
+    response = teacher.post(f"/classes/{class_id}/enrollments", data=csv, content_type="text/csv")
+    assert response.status_code == 200
+    assert response.get_json()["counts"] == {"already_enrolled": 1, "enrolled": 1}
+
+
+def test_imported_students_can_attend(course):
+    app, teacher, _, class_id, students = course
+    session_id = start_session(teacher, class_id)
+    teacher.post(f"/classes/{class_id}/enrollments", json=["carol@example.com"])
+    client, carol_id = students["carol"]
+
+    assert client.post("/attendance/submit", json=submit_payload(session_id, carol_id)).status_code == 201
+    absentees = teacher.get(f"/attendance/session/{session_id}/absentees").get_json()
+    assert absentees["absentees"] == [students["enrolled"][1]]
+    with app.app_context():
+        rollup = AttendanceRollup.query.filter_by(student_id=carol_id, class_id=class_id).one()
+        assert (rollup.sessions_held, rollup.sessions_attended) == (1, 1)
+
+
+def test_import_is_for_the_owning_teacher(course):
+    app, _, _, class_id, students = course
+    other, _ = signup(app, "other", role="teacher")
+    assert other.post(f"/classes/{class_id}/enrollments", json=["carol@example.com"]).status_code == 403
+    assert students["carol"][0].post(f"/classes/{class_id}/enrollments", json=["carol@example.com"]).status_code == 403
+
+
+def test_unreadable_body_is_rejected(course):
+    _, teacher, _, class_id, _ = course
+    response = teacher.post(f"/classes/{class_id}/enrollments", data="nope", content_type="application/json")
+    assert response.status_code == 400
@@ -0,0 +1,75 @@
+import time
+
+import pytest
+
+from app.attendance import codes
+from app.extensions import db
+from app.models.attendance_session import AttendanceSession
+from tests.conftest import SESSION_CODE, create_class, signup, start_session, submit_payload
+
+
+SECRET = "00112233445566778899aabbccddeeff00112233"
+STEP = 30
+NOW = 1_699_999_995.0  # halfway through a step
+COUNTER = int(NOW // STEP)
+
+
+@pytest.mark.parametrize("delta, accepted", [(-2, False), (-1, True), (0, True), (1, True), (2, False)])
+def test_codes_within_the_drift_window_are_accepted(delta, accepted):
+    code = codes.code_at(SECRET, COUNTER + delta)
+    assert codes.verify(SECRET, code, STEP, 1, now=NOW) is accepted
+
+
+def test_window_follows_the_drift_setting():
+    code = codes.code_at(SECRET, COUNTER - 2)
+    assert not codes.verify(SECRET, code, STEP, 1, now=NOW)
+    assert codes.verify(SECRET, code, STEP, 2, now=NOW)
+    assert not codes.verify(SECRET, codes.code_at(SECRET, COUNTER - 1), STEP, 0, now=NOW)
+
+
+@pytest.mark.parametrize("code", [None, 123456, "12345", "1234567"])
+def test_malformed_codes_are_rejected(code):
+    assert not codes.verify(SECRET, code, STEP, 1, now=NOW)
+
+
+def test_current_code_reports_time_to_rotation():
+    assert codes.current_code(SECRET, STEP, now=NOW) == (codes.code_at(SECRET, COUNTER), 15.0)
+
+
+@pytest.fixture
+def rotating(make_app):
+    # Hour-long steps, so the step cannot roll over mid-test
+    app = make_app(ATTENDANCE_CODE_STEP_SECONDS=3600, ATTENDANCE_CODE_DRIFT_STEPS=1)
+    teacher, _ = signup(app, "teacher", role="teacher")
+    class_id = create_class(teacher)
+    students = []
+    for i in range(3):
+        client, student_id = signup(app, f"student{i}")
+        client.post(f"/classes/{class_id}/enroll")
+        students.append((client, student_id))
+    session_id = start_session(teacher, class_id, attendance_code=None, rotating_code=True)
+    with app.app_context():
+        secret = db.session.get(AttendanceSession, session_id).code_secret
+    return teacher, session_id, secret, students
+
+
+def test_submit_accepts_the_displayed_and_previous_code(rotating):
+    teacher, session_id, secret, students = rotating
+    response = teacher.get(f"/attendance/session/{session_id}/code")
+    assert response.headers["Cache-Control"] == "no-store"
+    shown = response.get_json()["code"]
+    previous = codes.code_at(secret, int(time.time() // 3600) - 1)
+
+    (first, first_id), (second, second_id), _ = students
+    assert first.post("/attendance/submit", json=submit_payload(session_id, first_id, shown)).status_code == 201
+    assert second.post("/attendance/submit", json=submit_payload(session_id, second_id, previous)).status_code == 201
+
+
+@pytest.mark.parametrize("code", ["stale", SESSION_CODE, None])
+def test_submit_rejects_codes_outside_the_window(rotating, code):
+    _, session_id, secret, students = rotating
+    if code == "stale":
+        code = codes.code_at(secret, int(time.time() // 3600) - 2)
+    client, student_id = students[0]
+    response = client.post("/attendance/submit", json=submit_payload(session_id, student_id, code))
+    assert response.status_code == 400
@@ -0,0 +1,100 @@
+import threading
+import time
+
+import pytest
+
+from tests.conftest import create_class, signup, start_session, submit_payload
+
+
+MODES = {
+    "direct": {},
+    "group_commit": {"ATTENDANCE_GROUP_COMMIT": True, "ATTENDANCE_FLUSH_INTERVAL_MS": 5},
+    "async": {"ATTENDANCE_ASYNC_WORKERS": 2},
+}
+
+
+def submit(client, mode, body):
+    """(status, body) of a submit, waiting for the ticket on the async path."""
+    if mode != "async":
+        response = client.post("/attendance/submit", json=body)
+        return response.status_code, response.get_json()
+
+    response = client.post("/attendance/submit", json=body, headers={"Prefer": "respond-async"})
+    assert response.status_code == 202, response.get_json()
+    status_url = response.get_json()["status_url"]
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        result = client.get(status_url).get_json()
+        if result["status"] == "done":
+            return result["http_status"], result["result"]
+        time.sleep(0.01)
+    pytest.fail("async submission did not finish")
+
+
+@pytest.fixture(params=list(MODES))
+def mode(request):
+    return request.param
+
+
+@pytest.fixture
+def course(make_app, mode):
+    """An app in ``mode`` with a teacher, an active session and one enrolled student."""
+    app = make_app(**MODES[mode])
+    teacher, _ = signup(app, "teacher", role="teacher")
+    class_id = create_class(teacher)
+    student, student_id = signup(app, "student")
+    assert student.post(f"/classes/{class_id}/enroll").status_code == 201
+    session_id = start_session(teacher, class_id)
+    return app, teacher, student, student_id, session_id
+
+
+def test_first_submit_is_recorded(course, mode):
+    _, _, student, student_id, session_id = course
+    assert submit(student, mode, submit_payload(session_id, student_id)) == (
+        201, {"message": "Attendance recorded successfully"}
+    )
+
+
+def test_second_submit_is_a_duplicate(course, mode):
+    _, _, student, student_id, session_id = course
+    body = submit_payload(session_id, student_id)
+    assert submit(student, mode, body)[0] == 201
+    assert submit(student, mode, body) == (400, {"error": "Attendance already submitted"})
+
+
+def test_concurrent_submits_record_once(course, mode):
+    app, teacher, student, student_id, session_id = course
+    cookie = student.get_cookie("session").value
+    body = submit_payload(session_id, student_id)
+    statuses = []
+
+    def go():
+        client = app.test_client()
+        client.set_cookie("session", cookie)
+        statuses.append(submit(client, mode, body)[0])
+
+    threads = [threading.Thread(target=go) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(statuses) == [201] + [400] * 7
+    records = teacher.get(f"/attendance/session/{session_id}/records").get_json()["records"]
+    assert [record["student_id"] for record in records] == [student_id]
+
+
+def test_student_outside_the_class_is_not_enrolled(course, mode):
+    app, _, _, _, session_id = course
+    outsider, outsider_id = signup(app, "outsider")
+    assert submit(outsider, mode, submit_payload(session_id, outsider_id)) == (
+        403, {"error": "Student not enrolled in this class"}
+    )
+
+
+def test_ended_session_is_inactive(course, mode):
+    _, teacher, student, student_id, session_id = course
+    assert teacher.post("/attendance/end", json={"attendance_session_id": session_id}).status_code == 200
+    assert submit(student, mode, submit_payload(session_id, student_id)) == (
+        404, {"error": "Attendance session not found or inactive"}
+    )
@@ -21,6 +21,7 @@ export default function StudentDashboard() {
   const navigate = useNavigate();
 
   const [classes, setClasses] = useState([]);
+  const [classesCursor, setClassesCursor] = useState(null);
   const [selectedClassId, setSelectedClassId] = useState(null);
 
   // enroll
@@ -43,13 +44,32 @@ export default function StudentDashboard() {
     navigate("/login");
   };
 
-  const loadClasses = async () => {
-    const res = await fetch("/classes", { credentials: "include" });
+  // The list is paged: without a cursor this loads the first page, with one
+  // it appends the next ("Load more classes").
+  const loadClasses = async (cursor = null) => {
+    const url = cursor ? `/classes?cursor=${encodeURIComponent(cursor)}` : "/classes";
+    const res = await fetch(url, { credentials: "include" });
     const data = await res.json();
     if (!res.ok) throw new Error(data.error || "Failed to load classes");
-    setClasses(data.classes || []);
-    if ((data.classes || []).length > 0 && !selectedClassId) {
-      setSelectedClassId(data.classes[0].id);
+
+    const page = data.classes || [];
+    setClasses((prev) => {
+      if (!cursor) return page;
+      const known = new Set(prev.map((c) => c.id));
+      return [...prev, ...page.filter((c) => !known.has(c.id))];
+    });
+    setClassesCursor(data.next_cursor);
+    if (page.length > 0 && !selectedClassId) {
+      setSelectedClassId(page[0].id);
+    }
+  };
+
+  const loadMoreClasses = async () => {
+    try {
+      setError(null);
+      await loadClasses(classesCursor);
+    } catch (e) {
+      setError(e.message);
     }
   };
 
@@ -244,6 +264,11 @@ export default function StudentDashboard() {
           onChange={(val) => setSelectedClassId(val ? parseInt(val) : null)}
           searchable
         />
+        {classesCursor && (
+          <Button variant="subtle" size="xs" mt="xs" onClick={loadMoreClasses}>
+            Load more classes
+          </Button>
+        )}
 
         <Group mt="md">
           <Button variant="light" onClick={() => checkActiveSession(selectedClassId)} disabled={!selectedClassId}>
@@ -15,6 +15,7 @@ import {
   Card,
   Badge,
   Table,
+  Switch,
 } from "@mantine/core";
 import { useNavigate } from "react-router-dom";
 
@@ -22,6 +23,7 @@ export default function TeacherDashboard() {
   const navigate = useNavigate();
 
   const [classes, setClasses] = useState([]);
+  const [classesCursor, setClassesCursor] = useState(null);
   const [selectedClassId, setSelectedClassId] = useState(null);
 
   // Create class
@@ -32,6 +34,8 @@ export default function TeacherDashboard() {
 
   // Attendance
   const [attendanceCode, setAttendanceCode] = useState("ABC123");
+  const [rotatingCode, setRotatingCode] = useState(false);
+  const [currentCode, setCurrentCode] = useState(null);
   const [startsAt, setStartsAt] = useState("");
   const [endsAt, setEndsAt] = useState("");
   const [activeSession, setActiveSession] = useState(null);
@@ -46,13 +50,32 @@ export default function TeacherDashboard() {
     navigate("/login");
   };
 
-  const loadClasses = async () => {
-    const res = await fetch("/classes", { credentials: "include" });
+  // The list is paged: without a cursor this loads the first page, with one
+  // it appends the next ("Load more classes").
+  const loadClasses = async (cursor = null) => {
+    const url = cursor ? `/classes?cursor=${encodeURIComponent(cursor)}` : "/classes";
+    const res = await fetch(url, { credentials: "include" });
     const data = await res.json();
     if (!res.ok) throw new Error(data.error || "Failed to load classes");
-    setClasses(data.classes || []);
-    if ((data.classes || []).length > 0 && !selectedClassId) {
-      setSelectedClassId(data.classes[0].id);
+
+    const page = data.classes || [];
+    setClasses((prev) => {
+      if (!cursor) return page;
+      const known = new Set(prev.map((c) => c.id));
+      return [...prev, ...page.filter((c) => !known.has(c.id))];
+    });
+    setClassesCursor(data.next_cursor);
+    if (page.length > 0 && !selectedClassId) {
+      setSelectedClassId(page[0].id);
+    }
+  };
+
+  const loadMoreClasses = async () => {
+    try {
+      setError(null);
+      await loadClasses(classesCursor);
+    } catch (e) {
+      setError(e.message);
     }
   };
 
@@ -91,6 +114,64 @@ export default function TeacherDashboard() {
     })();
   }, [selectedClassId]);
 
+  // Show the active session's code; rotating codes are re-read as each expires.
+  const activeSessionId = activeSession ? activeSession.attendance_session_id : null;
+  useEffect(() => {
+    setCurrentCode(null);
+    if (!activeSessionId) return;
+    let timer = null;
+    let cancelled = false;
+    const loadCode = async () => {
+      const res = await fetch(`/attendance/session/${activeSessionId}/code`, {
+        credentials: "include",
+      });
+      if (!res.ok || cancelled) return;
+      const data = await res.json();
+      setCurrentCode(data);
+      if (data.rotating) {
+        timer = setTimeout(loadCode, Math.max(1, data.expires_in) * 1000);
+      }
+    };
+    loadCode();
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [activeSessionId]);
+
+  // Once records are loaded, append new check-ins as the server pushes them
+  // instead of re-fetching the whole list.
+  const streamSessionId = records ? records.attendance_session_id : null;
+  useEffect(() => {
+    if (!streamSessionId) return;
+    // Resuming after the loaded records would replay every page not loaded
+    // yet, so that is only done once the list is complete.
+    const lastId = Math.max(0, ...records.records.map((r) => r.id));
+    const resume = records.next_cursor ? "" : `?last_event_id=${lastId}`;
+    const source = new EventSource(`/attendance/session/${streamSessionId}/stream${resume}`, {
+      withCredentials: true,
+    });
+    source.addEventListener("record", (e) => {
+      const record = JSON.parse(e.data);
+      setRecords((prev) => {
+        // New records sort last; while pages remain, paging reaches them.
+        if (!prev || prev.next_cursor || prev.records.some((r) => r.id === record.id)) return prev;
+        return { ...prev, records: [...prev.records, record] };
+      });
+    });
+    // A record already listed changed (flagged, re-verified): replace it.
+    source.addEventListener("update", (e) => {
+      const record = JSON.parse(e.data);
+      setRecords((prev) => {
+        if (!prev || !prev.records.some((r) => r.id === record.id)) return prev;
+        return { ...prev, records: prev.records.map((r) => (r.id === record.id ? record : r)) };
+      });
+    });
+    source.addEventListener("ended", () => source.close());
+    return () => source.close();
+    // eslint-disable-next-line
+  }, [streamSessionId]);
+
   const useMyLocation = () => {
     setError(null);
     setMsg(null);
@@ -133,6 +214,10 @@ export default function TeacherDashboard() {
       setMsg(`Class created (id: ${data.class_id}).`);
       setName("");
       await loadClasses();
+      // The new class sorts last, so it may be on a page not loaded yet.
+      setClasses((prev) =>
+        prev.some((c) => c.id === data.class_id) ? prev : [...prev, { id: data.class_id, name: payload.name }]
+      );
     } catch (e) {
       setError(e.message);
     } finally {
@@ -153,7 +238,8 @@ export default function TeacherDashboard() {
 
       const payload = {
         class_id: selectedClassId,
-        attendance_code: attendanceCode,
+        attendance_code: rotatingCode ? null : attendanceCode,
+        rotating_code: rotatingCode,
         starts_at: s,
         ends_at: e,
       };
@@ -213,15 +299,45 @@ export default function TeacherDashboard() {
     try {
       if (!activeSession) throw new Error("No active session to view records.");
 
-      const res = await fetch(
-        `/attendance/session/${activeSession.attendance_session_id}/records`,
-        { credentials: "include" }
-      );
-      const data = await res.json();
-      if (!res.ok) throw new Error(data.error || "Failed to load records");
+      // First page only; "Load more" fetches the rest on demand.
+      const data = await fetchRecordsPage(activeSession.attendance_session_id, null);
+      setRecords({
+        attendance_session_id: activeSession.attendance_session_id,
+        records: data.records,
+        next_cursor: data.next_cursor,
+      });
+      setMsg(`Loaded ${data.records.length} record(s)${data.next_cursor ? ", more available" : ""}.`);
+    } catch (e) {
+      setError(e.message);
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  const fetchRecordsPage = async (sessionId, cursor) => {
+    const base = `/attendance/session/${sessionId}/records`;
+    const url = cursor ? `${base}?cursor=${encodeURIComponent(cursor)}` : base;
+    const res = await fetch(url, { credentials: "include" });
+    const data = await res.json();
+    if (!res.ok) throw new Error(data.error || "Failed to load records");
+    return data;
+  };
 
-      setRecords(data);
-      setMsg(`Loaded ${data.count} record(s).`);
+  const loadMoreRecords = async () => {
+    setError(null);
+    setLoading(true);
+
+    try {
+      const data = await fetchRecordsPage(records.attendance_session_id, records.next_cursor);
+      setRecords((prev) => {
+        if (!prev || prev.attendance_session_id !== records.attendance_session_id) return prev;
+        const known = new Set(prev.records.map((r) => r.id));
+        return {
+          ...prev,
+          records: [...prev.records, ...data.records.filter((r) => !known.has(r.id))],
+          next_cursor: data.next_cursor,
+        };
+      });
     } catch (e) {
       setError(e.message);
     } finally {
@@ -298,6 +414,11 @@ export default function TeacherDashboard() {
           onChange={(val) => setSelectedClassId(val ? parseInt(val) : null)}
           searchable
         />
+        {classesCursor && (
+          <Button variant="subtle" size="xs" mt="xs" onClick={loadMoreClasses}>
+            Load more classes
+          </Button>
+        )}
 
         <Divider my="sm" />
 
@@ -306,6 +427,7 @@ export default function TeacherDashboard() {
             label="Attendance code"
             value={attendanceCode}
             onChange={(e) => setAttendanceCode(e.target.value)}
+            disabled={rotatingCode}
           />
           <TextInput
             label="Starts at (optional)"
@@ -321,6 +443,20 @@ export default function TeacherDashboard() {
           />
         </Group>
 
+        <Switch
+          mt="sm"
+          label="Rotating code (changes every few seconds)"
+          checked={rotatingCode}
+          onChange={(e) => setRotatingCode(e.currentTarget.checked)}
+        />
+
+        {currentCode && (
+          <Text mt="sm">
+            Current code: <b>{currentCode.code}</b>
+            {currentCode.rotating && ` (rotates every ${currentCode.step_seconds}s)`}
+          </Text>
+        )}
+
         <Group mt="md">
           <Button onClick={startAttendance} loading={loading}>
             Start Attendance
@@ -339,7 +475,8 @@ export default function TeacherDashboard() {
             <Card withBorder radius="md">
               <Title order={5}>Records</Title>
               <Text c="dimmed" mb="sm">
-                Session #{records.attendance_session_id} — Total: {records.count}
+                Session #{records.attendance_session_id} — Loaded: {records.records.length}
+                {records.next_cursor ? " (more available)" : ""}
               </Text>
 
               <Table striped highlightOnHover withTableBorder withColumnBorders>
@@ -360,6 +497,12 @@ export default function TeacherDashboard() {
                   ))}
                 </Table.Tbody>
               </Table>
+
+              {records.next_cursor && (
+                <Button variant="light" mt="sm" onClick={loadMoreRecords} loading={loading}>
+                  Load more
+                </Button>
+              )}
             </Card>
           </>
         )}